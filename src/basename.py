@@ -9,76 +9,77 @@ import os
 import sys 
 from pathlib import Path
 
+from pathutil import (HAS_DRIVES, base_name, has_drive, open_files0_from, read_names0,
+                      strip_trailing_slashes, write_names)
+
+# Leading characters of a base name that is a root ("/", "//", "C:\\").
+ROOT_STARTS = ('/', '\\', b'/', b'\\') if HAS_DRIVES else ('/', b'/')
+
 def remove_suffix(name, suffix):
     """
     Remove Suffix from the end of name if it is there, unless name consists entirely of suffix.
+    Works on both str and bytes.
     """
     if not suffix or len(name) <= len(suffix):
         return name
 
     if name.endswith(suffix):
-        if len(name) == len(suffix):
-            return name 
         return name[:-len(suffix)]
     
     return name
 
-def strip_trailing_slashes(path):
-    """
-    Strip trailing slashes from path, but preserve root indicators.
-    """
-    if path in ('/', '\\') or (len(path) == 3 and path[1:] == ':\\'):
-        return path 
-
-    return path.rstrip('/\\')
-
 def is_absolute_path(path):
     """
     Check if path is absolute or a drive letter.
     """
-    return os.path.isabs(path) or (len(path) == 2 and path[1] == ':')
+    return os.path.isabs(path) or (len(path) == 2 and has_drive(path))
 
 def get_file_system_prefix_len(path):
     """"
     Get length of file system prefix (drive letter on Windows)
     """
-    if len(path) >= 2 and path[1] == ':':
+    if has_drive(path):
         return 2 
     
     return 0
 
-def base_name(path):
+def strip_name(name, suffix=None):
     """
-    Extract the base name from a path, similar to C basename().
+    Return the basename of name with an optional trailing suffix removed,
+    without printing anything. name and suffix must be of the same type.
     """
-    if not path:
-        return '.'
-    if path == '/':
-        return '/'
-    if path == '//':
-        return '//'
+    base = base_name(name)
     
-    path = strip_trailing_slashes(path)
+    # A base name is only absolute when it is a root, so leading-character
+    # checks stand in for is_absolute_path() and get_file_system_prefix_len();
+    # this runs once per name in bulk mode. Without drives, "a:b" and "\\x"
+    # are ordinary names.
+    if (suffix and len(base) > len(suffix) and base.endswith(suffix)
+            and base[:1] not in ROOT_STARTS
+            and not (HAS_DRIVES and base[1:2] in (':', b':'))):
+        base = base[:-len(suffix)]
 
-    if len(path) == 2 and path[1] == ':':
-        return path
-    
-    return os.path.basename(path)
+    return base
 
 def perform_basename(string, suffix, use_nuls):
     """
     Perform the basename operation on string. If suffix is non-null, remove
     the trailing suffix. Finally, output the result string.
     """
-    name = base_name(string)
-    
-    if suffix and not is_absolute_path(string) and not get_file_system_prefix_len(name):
-        name = remove_suffix(name, suffix)
+    name = strip_name(os.fsencode(string), os.fsencode(suffix) if suffix else None)
+
+    sys.stdout.buffer.write(name + (b'\0' if use_nuls else b'\n'))
 
-    if use_nuls:
-        sys.stdout.write(name + '\0')
+def perform_basename_bulk(batches, suffix, use_nuls, out):
+    """
+    Strip every name in an iterable of name batches (lists of bytes) and write
+    the results to the binary stream out, one write per batch.
+    """
+    if suffix:
+        suffix = os.fsencode(suffix)
+        write_names(batches, lambda name: strip_name(name, suffix), use_nuls, out)
     else:
-        print(name)
+        write_names(batches, base_name, use_nuls, out)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -94,6 +95,9 @@ def main():
                        help='remove a trailing SUFFIX; implies -a')
     parser.add_argument('-z', '--zero', action='store_true',
                        help='end each output line with NUL, not newline')
+    parser.add_argument('--files0-from', metavar='F',
+                       help='read NAMEs from NUL-terminated names in file F; '
+                            'if F is - then read names from standard input')
     parser.add_argument('--help', action='store_true',
                        help='display this help and exit')
     parser.add_argument('--version', action='store_true',
@@ -115,6 +119,9 @@ If specified, also remove a trailing SUFFIX.
   -a, --multiple       support multiple arguments and treat each as a NAME
   -s, --suffix=SUFFIX  remove a trailing SUFFIX; implies -a
   -z, --zero           end each output line with NUL, not newline
+      --files0-from=F  read NAMEs from NUL-terminated names in file F;
+                         If F is - then read names from standard input;
+                         implies -a
       --help           display this help and exit
       --version        output version information and exit
 
@@ -123,6 +130,7 @@ Examples:
   {parser.prog} include/stdio.h .h     -> "stdio"
   {parser.prog} -s .h include/stdio.h  -> "stdio"
   {parser.prog} -a any/str1 any/str2   -> "str1" followed by "str2"
+  find . -print0 | {parser.prog} --files0-from=-
 """)
         return 0
     
@@ -138,6 +146,30 @@ Examples:
     suffix = args.suffix
     use_nuls = args.zero
     
+    if args.files0_from is not None:
+        if args.names:
+            print(f"basename: extra operand '{args.names[0]}'", file=sys.stderr)
+            print("file operands cannot be combined with --files0-from", file=sys.stderr)
+            print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+            return 1
+        try:
+            source = open_files0_from(args.files0_from)
+        except OSError as e:
+            print(f"basename: cannot open '{args.files0_from}' for reading: {e.strerror}", file=sys.stderr)
+            return 1
+        try:
+            with source:
+                perform_basename_bulk(read_names0(source), suffix, use_nuls, sys.stdout.buffer)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head); exit without a traceback.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        except OSError as e:
+            print(f"basename: {args.files0_from}: read error: {e.strerror}", file=sys.stderr)
+            return 1
+        return 0
+    
     if not args.names:
         print("basename: missing operand", file=sys.stderr)
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
@@ -149,8 +181,8 @@ Examples:
         return 1
     
     if multiple_names:
-        for name in args.names:
-            perform_basename(name, suffix, use_nuls)
+        names = [os.fsencode(name) for name in args.names]
+        perform_basename_bulk([names], suffix, use_nuls, sys.stdout.buffer)
     else:
         name = args.names[0]
         single_suffix = args.names[1] if len(args.names) == 2 else None
@@ -158,6 +190,5 @@ Examples:
     
     return 0
 
-
 if __name__ == '__main__':
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+cat - concatenate files and print on the standard output
+Python port of GNU coreutils cat
+
+Without options the data never passes through Python: each input is
+copied by the kernel with the cheapest call that works for the pair of
+file descriptors, copy_file_range() between regular files (which may
+share extents instead of copying on filesystems that support it),
+sendfile() from a regular file to anything else, and splice() when either
+side is a pipe. Where none applies, or the kernel refuses, one reusable
+buffer is filled with readv() and written out. Options that change the
+output (-n, -b, -s, -v, -E, -T) work on 1 MiB blocks with bytes methods
+such as split(), replace() and translate(), never byte by byte.
+"""
+
+import argparse
+import errno
+import os
+import re
+import stat
+import sys
+from itertools import chain
+
+# Bytes moved per zero-copy call; the kernel caps copy_file_range() and
+# sendfile() at just under 2 GiB anyway.
+CHUNK_SIZE = 1 << 30
+# Buffer for the read/write fallback and for transformed output.
+BLOCK_SIZE = 1 << 20
+
+# Errors with which the zero-copy calls refuse a pair of descriptors
+# (other filesystems, O_APPEND output, old kernels, ...) before copying
+# anything; the next method is tried instead.
+_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.EOPNOTSUPP, errno.EBADF, errno.EPERM}
+# Errors of a zero-copy call that concern the output side.
+_WRITE_ERRORS = {errno.ENOSPC, errno.EDQUOT, errno.EFBIG}
+
+
+def _nonprinting(byte, show_tabs):
+    """The -v notation for one byte."""
+    if byte == 10 or (byte == 9 and not show_tabs):
+        return bytes([byte])
+    prefix = b''
+    if byte >= 128:
+        prefix, byte = b'M-', byte - 128
+    if byte < 32:
+        return prefix + b'^' + bytes([byte + 64])
+    if byte == 127:
+        return prefix + b'^?'
+    return prefix + bytes([byte])
+
+
+class Formatter:
+    """
+    Applies the output options to a stream of blocks. The state (line
+    number, whether the last block ended a line, how many newlines it
+    ended with) carries over from one block and one file to the next, as
+    GNU cat numbers and squeezes across file boundaries.
+    """
+
+    def __init__(self, number=False, number_nonblank=False, squeeze_blank=False,
+                 show_ends=False, show_tabs=False, show_nonprinting=False):
+        self.number = number or number_nonblank
+        self.number_nonblank = number_nonblank
+        self.squeeze_blank = squeeze_blank
+        self.show_ends = show_ends
+        self.newline = b'$\n' if show_ends else b'\n'
+        self.numbered = b'%6d\t%s' + self.newline
+        # A CR ending a block, held back in case a LF follows.
+        self.pending = b''
+        self.line = 0
+        self.at_line_start = True
+        # Newlines just written, at most 2; the start counts as one.
+        self.trailing_newlines = 1
+        self.show_tabs = show_tabs
+        self.show_nonprinting = show_nonprinting
+        if show_nonprinting:
+            # Every byte shows as 1 to 4 bytes; padded with NULs (which -v
+            # never outputs) to 4, the forms make four translate() tables.
+            forms = [_nonprinting(byte, show_tabs).ljust(4, b'\0') for byte in range(256)]
+            self.tables = [bytes(form[i] for form in forms) for i in range(4)]
+            self.plain = bytes(byte for byte in range(256) if forms[byte][1] == 0)
+
+    def _show_nonprinting(self, block):
+        if not block.translate(None, self.plain):
+            return block
+        spread = bytearray(4 * len(block))
+        for i, table in enumerate(self.tables):
+            spread[i::4] = block.translate(table)
+        return spread.translate(None, b'\0')
+
+    def _squeeze(self, block):
+        body = block.lstrip(b'\n')
+        leading = min(len(block) - len(body), max(2 - self.trailing_newlines, 0))
+        if not body:
+            self.trailing_newlines += leading
+            return b'\n' * leading
+        body = re.sub(rb'\n\n\n+', b'\n\n', body)
+        self.trailing_newlines = min(len(body) - len(body.rstrip(b'\n')), 2)
+        return b'\n' * leading + body
+
+    def format(self, block, final=False):
+        """Return block with the options applied; final flushes the state."""
+        if self.squeeze_blank:
+            block = self._squeeze(block)
+        if self.show_nonprinting:
+            block = self._show_nonprinting(block)
+        elif self.show_tabs:
+            block = block.replace(b'\t', b'^I')
+        if self.show_ends:
+            # As in GNU cat 9, -E shows the CR of a CRLF line end as ^M.
+            if self.pending:
+                block, self.pending = self.pending + block, b''
+            if block.endswith(b'\r') and not final:
+                block, self.pending = block[:-1], b'\r'
+            block = block.replace(b'\r\n', b'^M\n')
+        if not self.number:
+            if self.newline != b'\n':
+                block = block.replace(b'\n', self.newline)
+            if block:
+                self.at_line_start = block.endswith(b'\n')
+            return block
+        lines = block.split(b'\n')
+        # The last piece is the start of a line not ended yet, maybe empty.
+        last = lines.pop()
+        out = []
+        first = 0
+        if lines and not self.at_line_start:
+            # The first piece ends a line begun in an earlier block.
+            out.append(lines[0] + self.newline)
+            first = 1
+        number = self.line
+        body = lines[first:] if first else lines
+        # One % operation per block, with a format piece per line, is
+        # much faster than formatting the lines one by one.
+        if self.number_nonblank:
+            numbered = [line for line in body if line]
+            template = b''.join([self.numbered if line else self.newline for line in body])
+        else:
+            numbered = body
+            template = self.numbered * len(body)
+        out.append(template % tuple(chain.from_iterable(
+            zip(range(number + 1, number + 1 + len(numbered)), numbered))))
+        number += len(numbered)
+        if lines:
+            self.at_line_start = True
+        if last:
+            if self.at_line_start:
+                number += 1
+                out.append(b'%6d\t%s' % (number, last))
+            else:
+                out.append(last)
+            self.at_line_start = False
+        self.line = number
+        return b''.join(out)
+
+    def finish(self):
+        """Return what format() still holds back at the end of the input."""
+        return self.format(b'', final=True) if self.pending else b''
+
+
+class OutputError(OSError):
+    """Writing the output failed."""
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    except BrokenPipeError:
+        raise
+    except OSError as e:
+        raise OutputError(e.errno, e.strerror) from None
+
+
+def _zero_copy(call, in_fd, out_fd):
+    """
+    Repeat call(in_fd, out_fd) until it returns 0 at end of input. Returns
+    False, having copied nothing, if the kernel does not support it for
+    this pair of descriptors.
+    """
+    try:
+        copied = call(in_fd, out_fd)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            return False
+        raise
+    while copied:
+        copied = call(in_fd, out_fd)
+    return True
+
+
+def _copy_file_range(in_fd, out_fd):
+    return os.copy_file_range(in_fd, out_fd, CHUNK_SIZE)
+
+
+def _sendfile(in_fd, out_fd):
+    return os.sendfile(out_fd, in_fd, None, CHUNK_SIZE)
+
+
+def _splice(in_fd, out_fd):
+    return os.splice(in_fd, out_fd, CHUNK_SIZE)
+
+
+def copy_methods(in_stat, out_stat):
+    """
+    The zero-copy calls that can apply to descriptors with these stats,
+    cheapest first.
+    """
+    methods = []
+    in_mode, out_mode = in_stat.st_mode, out_stat.st_mode
+    # Files in /proc and /sys claim to be empty regular files; they must
+    # be read.
+    from_file = stat.S_ISREG(in_mode) and in_stat.st_size > 0
+    if from_file and stat.S_ISREG(out_mode) and hasattr(os, 'copy_file_range'):
+        methods.append(_copy_file_range)
+    if from_file and hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        methods.append(_sendfile)
+    if (stat.S_ISFIFO(in_mode) or stat.S_ISFIFO(out_mode)) and hasattr(os, 'splice'):
+        methods.append(_splice)
+    return methods
+
+
+class Cat:
+    """Writes inputs to one output descriptor, keeping state between them."""
+
+    def __init__(self, out_fd, formatter=None):
+        self.out_fd = out_fd
+        self.out_stat = os.fstat(out_fd)
+        self.formatter = formatter
+        self.buffer = bytearray(BLOCK_SIZE)
+
+    def _read_blocks(self, fd):
+        view = memoryview(self.buffer)
+        while True:
+            n = os.readv(fd, [view])
+            if not n:
+                return
+            yield view[:n]
+
+    def copy(self, fd, in_stat):
+        if self.formatter is not None:
+            for block in self._read_blocks(fd):
+                _write_all(self.out_fd, self.formatter.format(block.tobytes()))
+            return
+        for method in copy_methods(in_stat, self.out_stat):
+            if _zero_copy(method, fd, self.out_fd):
+                break
+        # Also after a zero-copy method, in case it stopped early.
+        for block in self._read_blocks(fd):
+            _write_all(self.out_fd, block)
+
+    def is_output(self, fd, in_stat):
+        """Whether fd reads the output file at a point it has not reached."""
+        if not stat.S_ISREG(self.out_stat.st_mode):
+            return False
+        if (in_stat.st_dev, in_stat.st_ino) != (self.out_stat.st_dev, self.out_stat.st_ino):
+            return False
+        return os.lseek(fd, 0, os.SEEK_CUR) < in_stat.st_size
+
+
+def cat_files(names, out_fd, formatter=None):
+    """
+    Write the named files ('-' is standard input) to out_fd, reporting
+    errors per file. Returns 0 on success, 1 if any file failed.
+    """
+    cat = Cat(out_fd, formatter)
+    status = 0
+    for name in names:
+        try:
+            if name == '-':
+                fd, opened = sys.stdin.fileno(), False
+            else:
+                fd, opened = os.open(name, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0)), True
+        except OSError as e:
+            print(f"cat: {name}: {e.strerror}", file=sys.stderr)
+            status = 1
+            continue
+        try:
+            in_stat = os.fstat(fd)
+            if cat.is_output(fd, in_stat):
+                print(f"cat: {name}: input file is output file", file=sys.stderr)
+                status = 1
+                continue
+            cat.copy(fd, in_stat)
+        except OutputError as e:
+            print(f"cat: write error: {e.strerror}", file=sys.stderr)
+            return 1
+        except OSError as e:
+            # The zero-copy calls fail for either side.
+            if e.errno == errno.EPIPE:
+                raise BrokenPipeError(*e.args) from None
+            if e.errno in _WRITE_ERRORS:
+                print(f"cat: write error: {e.strerror}", file=sys.stderr)
+                return 1
+            print(f"cat: {name}: {e.strerror}", file=sys.stderr)
+            status = 1
+        finally:
+            if opened:
+                os.close(fd)
+    if formatter is not None:
+        try:
+            _write_all(out_fd, formatter.finish())
+        except OutputError as e:
+            print(f"cat: write error: {e.strerror}", file=sys.stderr)
+            return 1
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='cat',
+        description='Concatenate FILE(s) to standard output.',
+        add_help=False
+    )
+
+    parser.add_argument('-A', '--show-all', action='store_true', help='equivalent to -vET')
+    parser.add_argument('-b', '--number-nonblank', action='store_true',
+                        help='number nonempty output lines, overrides -n')
+    parser.add_argument('-e', dest='e', action='store_true', help='equivalent to -vE')
+    parser.add_argument('-E', '--show-ends', action='store_true', help='display $ at end of each line')
+    parser.add_argument('-n', '--number', action='store_true', help='number all output lines')
+    parser.add_argument('-s', '--squeeze-blank', action='store_true',
+                        help='suppress repeated empty output lines')
+    parser.add_argument('-t', dest='t', action='store_true', help='equivalent to -vT')
+    parser.add_argument('-T', '--show-tabs', action='store_true', help='display TAB characters as ^I')
+    parser.add_argument('-u', action='store_true', help='(ignored)')
+    parser.add_argument('-v', '--show-nonprinting', action='store_true',
+                        help='use ^ and M- notation, except for LFD and TAB')
+    parser.add_argument('--help', action='store_true', help='display this help and exit')
+    parser.add_argument('--version', action='store_true', help='output version information and exit')
+    parser.add_argument('files', nargs='*', metavar='FILE')
+
+    try:
+        args = parser.parse_args()
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"""Usage: {parser.prog} [OPTION]... [FILE]...
+Concatenate FILE(s) to standard output.
+
+With no FILE, or when FILE is -, read standard input.
+
+  -A, --show-all           equivalent to -vET
+  -b, --number-nonblank    number nonempty output lines, overrides -n
+  -e                       equivalent to -vE
+  -E, --show-ends          display $ at end of each line
+  -n, --number             number all output lines
+  -s, --squeeze-blank      suppress repeated empty output lines
+  -t                       equivalent to -vT
+  -T, --show-tabs          display TAB characters as ^I
+  -u                       (ignored)
+  -v, --show-nonprinting   use ^ and M- notation, except for LFD and TAB
+      --help        display this help and exit
+      --version     output version information and exit
+
+Examples:
+  {parser.prog} f - g  Output f's contents, then standard input, then g's contents.
+  {parser.prog}        Copy standard input to standard output.
+""")
+        return 0
+
+    if args.version:
+        print("cat (Python port of GNU coreutils) 1.0")
+        print("This is free software: you are free to change and redistribute it.")
+        print("There is NO WARRANTY, to the extent permitted by law.")
+        print("")
+        print("Written by Junaid Rahman.")
+        return 0
+
+    show_nonprinting = args.show_nonprinting or args.show_all or args.e or args.t
+    show_ends = args.show_ends or args.show_all or args.e
+    show_tabs = args.show_tabs or args.show_all or args.t
+    formatter = None
+    if args.number or args.number_nonblank or args.squeeze_blank or show_nonprinting or show_ends or show_tabs:
+        formatter = Formatter(number=args.number, number_nonblank=args.number_nonblank,
+                              squeeze_blank=args.squeeze_blank, show_ends=show_ends,
+                              show_tabs=show_tabs, show_nonprinting=show_nonprinting)
+
+    sys.stdout.flush()
+    try:
+        return cat_files(args.files or ['-'], sys.stdout.fileno(), formatter)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); exit without a traceback.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
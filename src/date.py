@@ -17,6 +17,12 @@ except ImportError:
     dateutil_parser = None
 
 def parse_date_string(s):
+    if s.startswith('@'):
+        # Seconds since the Epoch, as accepted by GNU date.
+        try:
+            return datetime.fromtimestamp(float(s[1:]), timezone.utc).astimezone()
+        except (ValueError, OverflowError, OSError):
+            return None
     if dateutil_parser:
         try:
             return dateutil_parser.parse(s)
@@ -0,0 +1,44 @@
+"""
+deadline - run blocking lookups with an upper bound on how long they take
+Part of the Python port of GNU coreutils
+
+Used by hostid, hostname and who for calls that may go through the resolver
+and hang on an unreachable name server. Each call runs in its own daemon
+thread; one still stuck when the deadline passes is simply abandoned, and
+being a daemon thread it can't delay exit.
+"""
+
+import threading
+import time
+
+
+def call_all_with_deadline(calls, timeout):
+    """
+    Run every (func, args) pair in calls concurrently and wait at most
+    timeout seconds in total. Returns a list with each call's result, or
+    None where the call raised or did not finish in time.
+    """
+    results = [None] * len(calls)
+
+    def run(index, func, args):
+        try:
+            results[index] = func(*args)
+        except Exception:
+            pass
+
+    threads = [threading.Thread(target=run, args=(i, func, args), daemon=True)
+               for i, (func, args) in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return list(results)
+
+
+def call_with_deadline(func, timeout, *args):
+    """
+    Return func(*args), or None if it raised or did not finish within
+    timeout seconds.
+    """
+    return call_all_with_deadline([(func, args)], timeout)[0]
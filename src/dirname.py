@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+dirname - strip last component from file name
+Python port of GNU coreutils dirname
+"""
+
+import argparse
+import os
+import sys
+
+from pathutil import dir_name, open_files0_from, read_names0, write_names
+
+def perform_dirname_bulk(batches, use_nuls, out):
+    """
+    Print the directory part of every name in an iterable of name batches
+    (lists of bytes), one write per batch.
+    """
+    write_names(batches, dir_name, use_nuls, out)
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='dirname',
+        description='Output each NAME with its last non-slash component and trailing slashes removed.',
+        add_help=False
+    )
+
+    parser.add_argument('-z', '--zero', action='store_true',
+                       help='end each output line with NUL, not newline')
+    parser.add_argument('--files0-from', metavar='F',
+                       help='read NAMEs from NUL-terminated names in file F; '
+                            'if F is - then read names from standard input')
+    parser.add_argument('--help', action='store_true',
+                       help='display this help and exit')
+    parser.add_argument('--version', action='store_true',
+                       help='output version information and exit')
+    parser.add_argument('names', nargs='*', help='NAME')
+
+    try:
+        args = parser.parse_args()
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"""Usage: {parser.prog} [OPTION] NAME...
+Output each NAME with its last non-slash component and trailing slashes
+removed; if NAME contains no /'s, output '.' (meaning the current directory).
+
+  -z, --zero           end each output line with NUL, not newline
+      --files0-from=F  read NAMEs from NUL-terminated names in file F;
+                         If F is - then read names from standard input
+      --help           display this help and exit
+      --version        output version information and exit
+
+Examples:
+  {parser.prog} /usr/bin/          -> "/usr"
+  {parser.prog} dir1/str dir2/str  -> "dir1" followed by "dir2"
+  {parser.prog} stdio.h            -> "."
+  find . -print0 | {parser.prog} --files0-from=-
+""")
+        return 0
+
+    if args.version:
+        print("dirname (Python port of GNU coreutils) 1.0")
+        print("This is free software: you are free to change and redistribute it.")
+        print("There is NO WARRANTY, to the extent permitted by law.")
+        print("")
+        print("Written by Junaid Rahman.")
+        return 0
+
+    use_nuls = args.zero
+
+    if args.files0_from is not None:
+        if args.names:
+            print(f"dirname: extra operand '{args.names[0]}'", file=sys.stderr)
+            print("file operands cannot be combined with --files0-from", file=sys.stderr)
+            print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+            return 1
+        try:
+            source = open_files0_from(args.files0_from)
+        except OSError as e:
+            print(f"dirname: cannot open '{args.files0_from}' for reading: {e.strerror}", file=sys.stderr)
+            return 1
+        try:
+            with source:
+                perform_dirname_bulk(read_names0(source), use_nuls, sys.stdout.buffer)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head); exit without a traceback.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        except OSError as e:
+            print(f"dirname: {args.files0_from}: read error: {e.strerror}", file=sys.stderr)
+            return 1
+        return 0
+
+    if not args.names:
+        print("dirname: missing operand", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    names = [os.fsencode(name) for name in args.names]
+    perform_dirname_bulk([names], use_nuls, sys.stdout.buffer)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
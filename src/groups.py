@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+groups - print the groups a user is in
+Python port of GNU coreutils groups
+"""
+
+import argparse
+import os
+import sys
+
+import id as id_util
+import nsscache
+
+def print_user_groups(username):
+    """
+    Print the "USER : group..." line for one user. Returns False if the user
+    does not exist or one of the group names could not be resolved.
+    """
+    try:
+        user_info = nsscache.getpwnam(username)
+    except KeyError:
+        print(f"groups: '{username}': no such user", file=sys.stderr)
+        return False
+    print(f"{username} : ", end='')
+    success = id_util.print_group_list(username, True, ' ', user_info.pw_gid, user_info.pw_gid,
+                                       prog='groups')
+    print()
+    return success
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='groups',
+        description='Print group memberships for each USERNAME or, if no USERNAME is specified, for the current process.',
+        add_help=False
+    )
+    parser.add_argument('--users-from', metavar='FILE', help='also read USERNAMEs, one per line, from FILE')
+    parser.add_argument('--help', action='store_true', help='display this help and exit')
+    parser.add_argument('--version', action='store_true', help='output version information and exit')
+    parser.add_argument('users', nargs='*', metavar='USERNAME', help='user to inspect')
+
+    try:
+        args = parser.parse_args()
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"Usage: {parser.prog} [OPTION]... [USERNAME]...")
+        print("Print group memberships for each USERNAME or, if no USERNAME is specified, for")
+        print("the current process (which may differ if the groups database has changed).")
+        print("      --users-from=FILE  also read USERNAMEs, one per line, from FILE (- for stdin);")
+        print("                   many users are resolved from one pass over the passwd")
+        print("                   and group databases")
+        print("      --help     display this help and exit\n      --version  output version information and exit")
+        return 0
+
+    if args.version:
+        print("groups (Python port of GNU coreutils) 1.0\nThis is free software: you are free to change and redistribute it.\nThere is NO WARRANTY, to the extent permitted by law.\n\nWritten by Junaid Rahman.")
+        return 0
+
+    if args.users_from is not None:
+        try:
+            args.users += id_util.read_user_list(args.users_from)
+        except OSError as e:
+            print(f"groups: cannot read '{args.users_from}': {e.strerror}", file=sys.stderr)
+            return 1
+        # As in id, only on request: the snapshot can miss group memberships
+        # that getgrouplist() would find.
+        try:
+            nsscache.load_databases()
+        except OSError:
+            pass
+
+    if not args.users:
+        try:
+            rgid = os.getgid()
+            egid = os.getegid()
+        except OSError as e:
+            print(f"groups: cannot get IDs: {e}", file=sys.stderr)
+            return 1
+        success = id_util.print_group_list(None, True, ' ', rgid, egid, prog='groups')
+        print()
+        return 0 if success else 1
+
+    ok = True
+    for username in args.users:
+        if not print_user_groups(username):
+            ok = False
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
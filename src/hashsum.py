@@ -0,0 +1,437 @@
+"""
+hashsum - the engine shared by md5sum, sha1sum, sha224sum, sha256sum,
+sha384sum and sha512sum
+Part of the Python port of GNU coreutils
+
+Files are hashed with hashlib from one reused buffer per thread, filled
+by readinto(). hashlib releases the GIL while it digests a large block,
+so several files are hashed at once on a thread pool, for printing sums
+and for --check alike. Results are written in input order.
+"""
+
+import argparse
+import errno
+import hashlib
+import os
+import re
+import sys
+import threading
+
+# Read size; hashing speed does not depend on it beyond this.
+BLOCK_SIZE = 1 << 18
+
+# Per program: the hashlib name, the tag of --tag output, the digest size
+# in bits and the standard the help text cites.
+ALGORITHMS = {
+    'md5sum': ('md5', 'MD5', 128, 'RFC 1321'),
+    'sha1sum': ('sha1', 'SHA1', 160, 'FIPS-180-1'),
+    'sha224sum': ('sha224', 'SHA224', 224, 'RFC 3874'),
+    'sha256sum': ('sha256', 'SHA256', 256, 'FIPS-180-2'),
+    'sha384sum': ('sha384', 'SHA384', 384, 'FIPS-180-2'),
+    'sha512sum': ('sha512', 'SHA512', 512, 'FIPS-180-2'),
+}
+
+# Characters that let a name be printed in messages without quotes.
+_PLAIN_NAME = re.compile(r'[\w.,:/@%+=-]+\Z')
+_ESCAPES = {b'\\\\': b'\\', b'\\n': b'\n', b'\\r': b'\r'}
+_ESCAPE = re.compile(rb'\\.?', re.DOTALL)
+
+
+def quote(name):
+    """name for a message, in single quotes unless it needs none."""
+    name = os.fsdecode(name)
+    if _PLAIN_NAME.match(name):
+        return name
+    return "'" + name.replace("'", "'\\''") + "'"
+
+
+def escape_name(name):
+    """
+    Escape backslashes, newlines and carriage returns in the bytes name.
+    Returns the name and whether anything was escaped; such a line
+    starts with a backslash.
+    """
+    if b'\\' not in name and b'\n' not in name and b'\r' not in name:
+        return name, False
+    return name.replace(b'\\', b'\\\\').replace(b'\n', b'\\n').replace(b'\r', b'\\r'), True
+
+
+def unescape_name(name):
+    """Undo escape_name(); returns None for an escape it does not produce."""
+    try:
+        return _ESCAPE.sub(lambda match: _ESCAPES[match.group()], name)
+    except KeyError:
+        return None
+
+
+def is_stdin(name):
+    return name in ('-', b'-')
+
+
+class Hasher:
+    """
+    Hashes files with one algorithm. It can be shared by threads: each
+    thread reads into a buffer of its own.
+    """
+
+    def __init__(self, algorithm, prog):
+        self.algorithm = algorithm
+        self.prog = prog
+        self.local = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            buffer = self.local.buffer = bytearray(BLOCK_SIZE)
+        return buffer
+
+    def digest_stream(self, stream):
+        """The hex digest of what is left in the unbuffered binary stream."""
+        digest = hashlib.new(self.algorithm)
+        buffer = self._buffer()
+        view = memoryview(buffer)
+        while True:
+            n = stream.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+        return digest.hexdigest()
+
+    def digest_file(self, name):
+        """
+        Hash one file, '-' being standard input. Returns the hex digest,
+        or None, and the OSError that prevented it, or None.
+        """
+        try:
+            if is_stdin(name):
+                with open(sys.stdin.fileno(), 'rb', buffering=0, closefd=False) as stream:
+                    return self.digest_stream(stream), None
+            with open(name, 'rb', buffering=0) as stream:
+                return self.digest_stream(stream), None
+        except OSError as e:
+            return None, e
+
+
+def _map_in_order(func, names, jobs):
+    """
+    map(func, names) on a pool of jobs threads when there is more than one
+    name. Standard input can only be read once, by one thread, so a list
+    naming it twice is done in turn.
+    """
+    if jobs > 1 and len(names) > 1 and sum(is_stdin(name) for name in names) < 2:
+        # Imported here so that single files don't pay for it.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(jobs, len(names))) as pool:
+            yield from pool.map(func, names)
+    else:
+        yield from map(func, names)
+
+
+def sum_files(names, hasher, tag, jobs, binary=False, zero=False, out=None):
+    """
+    Print a checksum line for every file in names, in order.
+
+    Returns:
+        0 on success, 1 if any file could not be read
+    """
+    out = out or sys.stdout.buffer
+    end = b'\0' if zero else b'\n'
+    mode = b' *' if binary else b'  '
+    tag = tag.encode() if tag else None
+    status = 0
+    for name, (digest, error) in zip(names, _map_in_order(hasher.digest_file, names, jobs)):
+        if error is not None:
+            out.flush()
+            print(f"{hasher.prog}: {quote(name)}: {error.strerror}", file=sys.stderr)
+            status = 1
+            continue
+        shown, escaped = os.fsencode(name), False
+        if not zero:
+            shown, escaped = escape_name(shown)
+        prefix = b'\\' if escaped else b''
+        if tag:
+            out.write(b'%s%s (%s) = %s%s' % (prefix, tag, shown, digest.encode(), end))
+        else:
+            out.write(b'%s%s%s%s%s' % (prefix, digest.encode(), mode, shown, end))
+    out.flush()
+    return status
+
+
+class ChecksumParser:
+    """
+    Splits the lines of a checksum list into digest and file name. Lines
+    may be this program's output, with or without --tag, or the "DIGEST
+    NAME" form of BSD's -r. As in GNU, the -r form is only accepted if the
+    first line of the list has it.
+    """
+
+    def __init__(self, tag, digest_length):
+        self.tag = tag.encode()
+        self.digest_length = digest_length
+        self.hex = re.compile(rb'[0-9a-fA-F]{%d}\Z' % digest_length)
+        self.reversed = None
+
+    def _tagged(self, line):
+        rest = line[len(self.tag):]
+        if rest.startswith(b' '):
+            rest = rest[1:]
+        if not rest.startswith(b'('):
+            return None
+        name, sep, digest = rest[1:].rpartition(b') = ')
+        if not sep or not self.hex.match(digest):
+            return None
+        return digest, name
+
+    def parse(self, line):
+        """Return (digest, name) for a line without its line end, or None."""
+        line = line.lstrip(b' \t')
+        escaped = line.startswith(b'\\')
+        if escaped:
+            line = line[1:]
+        if line.startswith(self.tag):
+            parsed = self._tagged(line)
+        else:
+            parsed = None
+            digest, separator = line[:self.digest_length], line[self.digest_length:self.digest_length + 1]
+            if self.hex.match(digest) and separator in (b' ', b'\t'):
+                name = line[self.digest_length + 1:]
+                if len(name) > 1 and name[:1] in (b' ', b'*') and self.reversed is not True:
+                    self.reversed = False
+                    parsed = digest, name[1:]
+                elif self.reversed is not False:
+                    self.reversed = True
+                    parsed = digest, name
+        if parsed is None or not parsed[1]:
+            return None
+        digest, name = parsed
+        if escaped:
+            name = unescape_name(name)
+            if not name:
+                return None
+        return digest.lower(), name
+
+
+def check_list(list_name, hasher, tag, digest_length, jobs, quiet=False, status_only=False,
+               strict=False, warn=False, ignore_missing=False, out=None):
+    """
+    Verify the files named in the checksum list list_name ('-' being
+    standard input), hashing them concurrently and reporting in order.
+
+    Returns:
+        True if every listed file was read and matched
+    """
+    out = out or sys.stdout.buffer
+    prog = hasher.prog
+    shown_list = 'standard input' if is_stdin(list_name) else list_name
+    try:
+        if is_stdin(list_name):
+            lines = sys.stdin.buffer.readlines()
+        else:
+            with open(list_name, 'rb') as source:
+                lines = source.readlines()
+    except OSError as e:
+        print(f"{prog}: {quote(list_name)}: {e.strerror}", file=sys.stderr)
+        return False
+
+    parser = ChecksumParser(tag, digest_length)
+    entries = []
+    for number, line in enumerate(lines, 1):
+        if line.startswith(b'#'):
+            continue
+        line = line[:-1] if line.endswith(b'\n') else line
+        line = line[:-1] if line.endswith(b'\r') else line
+        if line:
+            entries.append((number, parser.parse(line)))
+
+    def verify(name):
+        return hasher.digest_file(name) if name is not None else (None, None)
+
+    misformatted = read_failures = mismatches = matches = 0
+    names = [parsed[1] if parsed is not None else None for _, parsed in entries]
+    for (number, parsed), (digest, error) in zip(entries, _map_in_order(verify, names, jobs)):
+        if parsed is None:
+            misformatted += 1
+            if warn:
+                out.flush()
+                print(f"{prog}: {quote(shown_list)}: {number}: improperly formatted {tag} checksum line",
+                      file=sys.stderr)
+            continue
+        expected, name = parsed
+        shown = name
+        if b'\n' in name or b'\r' in name:
+            # Unlike when printing sums, only names that would break the
+            # line are escaped, as in GNU.
+            shown = b'\\' + escape_name(name)[0]
+        if error is not None:
+            if ignore_missing and error.errno == errno.ENOENT:
+                continue
+            read_failures += 1
+            out.flush()
+            print(f"{prog}: {quote(name)}: {error.strerror}", file=sys.stderr)
+            if not status_only:
+                out.write(shown + b': FAILED open or read\n')
+        elif digest == expected.decode():
+            matches += 1
+            if not (quiet or status_only):
+                out.write(shown + b': OK\n')
+        else:
+            mismatches += 1
+            if not status_only:
+                out.write(shown + b': FAILED\n')
+    out.flush()
+
+    properly_formatted = len(entries) > misformatted
+    if not properly_formatted:
+        print(f"{prog}: {quote(shown_list)}: no properly formatted checksum lines found", file=sys.stderr)
+    elif not status_only:
+        if misformatted:
+            print(f"{prog}: WARNING: {misformatted} "
+                  f"{'line is' if misformatted == 1 else 'lines are'} improperly formatted", file=sys.stderr)
+        if read_failures:
+            print(f"{prog}: WARNING: {read_failures} listed "
+                  f"{'file' if read_failures == 1 else 'files'} could not be read", file=sys.stderr)
+        if mismatches:
+            print(f"{prog}: WARNING: {mismatches} computed "
+                  f"{'checksum' if mismatches == 1 else 'checksums'} did NOT match", file=sys.stderr)
+        if ignore_missing and not matches:
+            print(f"{prog}: {quote(shown_list)}: no file was verified", file=sys.stderr)
+    return (properly_formatted and matches > 0 and not mismatches and not read_failures
+            and not (strict and misformatted))
+
+
+def main(prog, argv=None):
+    """Run the *sum program prog (a key of ALGORITHMS) with argv."""
+    algorithm, tag, bits, standard = ALGORITHMS[prog]
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=f'Print or check {tag} ({bits}-bit) checksums.',
+        add_help=False
+    )
+
+    parser.add_argument('-b', '--binary', action='store_true', help='read in binary mode')
+    parser.add_argument('-c', '--check', action='store_true',
+                        help='read checksums from the FILEs and check them')
+    parser.add_argument('--tag', action='store_true', help='create a BSD-style checksum')
+    parser.add_argument('-t', '--text', action='store_true', help='read in text mode (default)')
+    parser.add_argument('-z', '--zero', action='store_true',
+                        help='end each output line with NUL, not newline')
+    parser.add_argument('--ignore-missing', action='store_true',
+                        help="don't fail or report status for missing files")
+    # As in GNU, the last of --quiet, --status and --warn wins.
+    parser.add_argument('--quiet', dest='report', action='store_const', const='quiet',
+                        help="don't print OK for each successfully verified file")
+    parser.add_argument('--status', dest='report', action='store_const', const='status',
+                        help="don't output anything, status code shows success")
+    parser.add_argument('--strict', action='store_true',
+                        help='exit non-zero for improperly formatted checksum lines')
+    parser.add_argument('-w', '--warn', dest='report', action='store_const', const='warn',
+                        help='warn about improperly formatted checksum lines')
+    parser.add_argument('-j', '--jobs', metavar='N', help='hash up to N files at once')
+    parser.add_argument('--help', action='store_true', help='display this help and exit')
+    parser.add_argument('--version', action='store_true', help='output version information and exit')
+    parser.add_argument('files', nargs='*', metavar='FILE')
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"""Usage: {parser.prog} [OPTION]... [FILE]...
+Print or check {tag} ({bits}-bit) checksums.
+
+With no FILE, or when FILE is -, read standard input.
+  -b, --binary          read in binary mode
+  -c, --check           read checksums from the FILEs and check them
+      --tag             create a BSD-style checksum
+  -t, --text            read in text mode (default)
+  -z, --zero            end each output line with NUL, not newline,
+                          and disable file name escaping
+  -j, --jobs=N          hash up to N files at once
+                          (default: the number of usable CPUs)
+
+The following five options are useful only when verifying checksums:
+      --ignore-missing  don't fail or report status for missing files
+      --quiet           don't print OK for each successfully verified file
+      --status          don't output anything, status code shows success
+      --strict          exit non-zero for improperly formatted checksum lines
+  -w, --warn            warn about improperly formatted checksum lines
+
+      --help        display this help and exit
+      --version     output version information and exit
+
+The sums are computed as described in {standard}.
+When checking, the input should be a former output of this program.
+The default mode is to print a line with: checksum, a space,
+a character indicating input mode ('*' for binary, ' ' for text
+or where binary is insignificant), and name for each FILE.
+
+Note: There is no difference between binary mode and text mode on GNU systems.
+
+Examples:
+  {parser.prog} *.iso > SUMS            Record the checksums of the images
+  {parser.prog} -c --quiet SUMS         Verify them, reporting only failures
+""")
+        return 0
+
+    if args.version:
+        print(f"{prog} (Python port of GNU coreutils) 1.0")
+        print("This is free software: you are free to change and redistribute it.")
+        print("There is NO WARRANTY, to the extent permitted by law.")
+        print("")
+        print("Written by Junaid Rahman.")
+        return 0
+
+    problem = None
+    if args.check:
+        if args.tag:
+            problem = "the --tag option is meaningless when verifying checksums"
+        elif args.binary or args.text:
+            problem = "the --binary and --text options are meaningless when verifying checksums"
+    else:
+        given = [option for option, value in (('ignore-missing', args.ignore_missing),
+                                              ('strict', args.strict), (args.report, args.report))
+                 if value]
+        if given:
+            problem = f"the --{given[0]} option is meaningful only when verifying checksums"
+    if problem is not None:
+        print(f"{prog}: {problem}", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    jobs = None
+    if args.jobs is not None:
+        try:
+            jobs = int(args.jobs)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            print(f"{prog}: invalid number of jobs: '{args.jobs}'", file=sys.stderr)
+            return 1
+
+    names = args.files or ['-']
+    if jobs is None:
+        if len(names) > 1 or args.check:
+            # Imported here so that single sums don't pay for it.
+            from nproc import effective_cpus
+            jobs = effective_cpus()
+        else:
+            jobs = 1
+    hasher = Hasher(algorithm, prog)
+
+    try:
+        if args.check:
+            ok = True
+            for name in names:
+                ok = check_list(name, hasher, tag, bits // 4, jobs, quiet=args.report == 'quiet',
+                                status_only=args.report == 'status', strict=args.strict,
+                                warn=args.report == 'warn', ignore_missing=args.ignore_missing) and ok
+            return 0 if ok else 1
+        return sum_files(names, hasher, None if not args.tag else tag, jobs,
+                         binary=args.binary, zero=args.zero)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); exit without a traceback.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
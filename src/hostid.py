@@ -6,48 +6,101 @@ Python port of GNU coreutils hostid
 
 import argparse
 import os
+import socket
+import struct
 import sys
 
-def get_host_id():
-    """
-    Get the host ID using several methods to ensure cross-platform compatibility.
+import statecache
+from deadline import call_with_deadline
 
-    1. Try os.gethostid() if available.
-    2. Try reading the binary ID from /etc/hostid.
-    3. Fallback to using the host's primary IP address.
+HOSTID_FILE = '/etc/hostid'
+BOOT_ID_FILE = '/proc/sys/kernel/random/boot_id'
+CACHE_NAME = 'hostid'
 
-    Returns the host ID as an integer or None if all methods fail.
-    """
-    # Method 1: Use os.gethostid() if available.
-    if hasattr(os, 'gethostid'):
-        try:
-            return os.gethostid()
-        except OSError:
-            # Function exists but is not implemented by the underlying C library.
-            pass
+# Upper bound, in seconds, on how long a lookup that may go through the
+# resolver (os.gethostid() without /etc/hostid, or gethostbyname()) can take.
+RESOLVE_TIMEOUT = 2.0
 
-    # Method 2: Read from the common /etc/hostid file.
+def read_hostid_file(path=HOSTID_FILE):
+    """
+    Return the host ID stored in binary form in path, or None.
+    """
     try:
-        with open('/etc/hostid', 'rb') as f:
-            import struct
+        with open(path, 'rb') as f:
             host_id_bytes = f.read(4)
             if len(host_id_bytes) == 4:
                 # Unpack 4 bytes as a little-endian unsigned integer.
                 return struct.unpack('<I', host_id_bytes)[0]
     except (FileNotFoundError, IOError):
         pass
+    return None
+
+def host_id_from_address():
+    """
+    Derive a host ID from the host's primary IP address. This goes through
+    the resolver and may block, so call it via call_with_deadline().
+    """
+    ip_address = socket.gethostbyname(socket.gethostname())
+    # The IP address is already in network byte order (big-endian).
+    return struct.unpack('!I', socket.inet_aton(ip_address))[0]
 
-    # Method 3: Fallback to deriving from the host's IP address.
+def cache_key():
+    """
+    Return the key that a cached host ID is valid for: the host name and,
+    where available, the boot ID, so a rename or reboot forces a new lookup.
+    """
     try:
-        import socket
-        import struct
-        ip_address = socket.gethostbyname(socket.gethostname())
-        # The IP address is already in network byte order (big-endian).
-        return struct.unpack('!I', socket.inet_aton(ip_address))[0]
-    except Exception:
-        pass
+        hostname = socket.gethostname()
+    except OSError:
+        hostname = ''
+    try:
+        with open(BOOT_ID_FILE) as f:
+            boot_id = f.read().strip()
+    except OSError:
+        boot_id = ''
+    return f"{hostname} {boot_id}"
 
-    return None
+def get_host_id(timeout=RESOLVE_TIMEOUT, use_cache=True):
+    """
+    Get the host ID using several methods to ensure cross-platform compatibility.
+
+    1. Read the binary ID from /etc/hostid.
+    2. Use the ID cached by an earlier run for this host name and boot.
+    3. Try os.gethostid() if available.
+    4. Fallback to using the host's primary IP address.
+
+    Without /etc/hostid, the C library's gethostid() resolves the host name
+    itself, so methods 3 and 4 each run with a deadline of timeout seconds
+    and their result is cached. A broken resolver therefore costs at most
+    2 * timeout once, instead of the full resolver timeout on every call.
+
+    Returns the host ID as an integer or None if all methods fail.
+    """
+    # Method 1: Read from the common /etc/hostid file.
+    host_id = read_hostid_file()
+    if host_id is not None:
+        return host_id
+
+    # Method 2: A previous run's answer.
+    key = cache_key()
+    if use_cache:
+        host_id = statecache.load(CACHE_NAME, key)
+        if isinstance(host_id, int):
+            return host_id
+
+    # Method 3: Use os.gethostid() if available. It raises OSError when the
+    # function exists but is not implemented by the underlying C library.
+    host_id = None
+    if hasattr(os, 'gethostid'):
+        host_id = call_with_deadline(os.gethostid, timeout)
+
+    # Method 4: Fallback to deriving from the host's IP address.
+    if host_id is None:
+        host_id = call_with_deadline(host_id_from_address, timeout)
+
+    if host_id is not None and use_cache:
+        statecache.store(CACHE_NAME, key, host_id)
+    return host_id
 
 def main():
     parser = argparse.ArgumentParser(
@@ -7,8 +7,122 @@ Python port of GNU coreutils hostname
 import argparse
 import os
 import socket
+import struct
 import sys
 
+import statecache
+from deadline import call_all_with_deadline
+
+# Overall deadline, in seconds, for the resolver lookups behind -f and -i.
+RESOLVE_TIMEOUT = 2.0
+
+# Resolved names and addresses are cached on disk for this many seconds.
+CACHE_NAME = 'hostname'
+CACHE_TTL = 60
+
+SIOCGIFADDR = 0x8915
+IF_INET6_FILE = '/proc/net/if_inet6'
+
+def resolve_host(name, timeout=RESOLVE_TIMEOUT):
+    """
+    Look up name and return a dict with its canonical name ('fqdn') and its
+    addresses ('addresses', IPv4 first), or None if nothing resolved within
+    timeout seconds. The IPv4 and IPv6 queries run concurrently, so a
+    resolver that stalls on one family doesn't hold up the other.
+    """
+    calls = [(socket.getaddrinfo, (name, None, family, socket.SOCK_STREAM, 0, socket.AI_CANONNAME))
+             for family in (socket.AF_INET, socket.AF_INET6)]
+    fqdn = None
+    addresses = []
+    for infos in call_all_with_deadline(calls, timeout):
+        for _family, _type, _proto, canonname, sockaddr in infos or ():
+            if canonname and not fqdn:
+                fqdn = canonname
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+    if not addresses:
+        return None
+    return {'fqdn': fqdn or name, 'addresses': addresses}
+
+def lookup_host(name, use_cache=True):
+    """
+    resolve_host() through the short-lived on-disk cache.
+    """
+    if use_cache:
+        cached = statecache.load(CACHE_NAME, name, CACHE_TTL)
+        if isinstance(cached, dict):
+            return cached
+    result = resolve_host(name)
+    if result is not None and use_cache:
+        statecache.store(CACHE_NAME, name, result)
+    return result
+
+def local_addresses():
+    """
+    Return the addresses configured on the network interfaces, without
+    asking the resolver. Loopback and IPv6 link-local addresses are left
+    out, as in 'hostname -I'. Only Linux is supported; elsewhere this
+    raises OSError.
+    """
+    if not sys.platform.startswith('linux'):
+        raise OSError("interface enumeration is not supported on this platform")
+    import fcntl
+
+    addresses = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _index, ifname in socket.if_nameindex():
+            request = struct.pack('256s', ifname.encode()[:15])
+            try:
+                reply = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+            except OSError:
+                # Interface without an IPv4 address.
+                continue
+            address = socket.inet_ntoa(reply[20:24])
+            if not address.startswith('127.') and address not in addresses:
+                addresses.append(address)
+
+    try:
+        with open(IF_INET6_FILE) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        scope = int(fields[3], 16)
+        # 0x10 is host (loopback) scope, 0x20 link-local.
+        if scope & 0x30:
+            continue
+        address = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(fields[0]))
+        if address not in addresses:
+            addresses.append(address)
+    return addresses
+
+def print_query(args):
+    """
+    Handle -f, -i and -I.
+    """
+    if args.all_ip_addresses:
+        try:
+            addresses = local_addresses()
+        except OSError as e:
+            print(f"hostname: {e}", file=sys.stderr)
+            return 1
+        print(''.join(f"{address} " for address in addresses))
+        return 0
+
+    name = socket.gethostname()
+    result = lookup_host(name)
+    if result is None:
+        print(f"hostname: {name}: Name or service not known", file=sys.stderr)
+        return 1
+    if args.fqdn:
+        print(result['fqdn'])
+    else:
+        print(' '.join(result['addresses']))
+    return 0
+
 def main():
     """
     Main function to handle argument parsing and execution.
@@ -18,6 +132,9 @@ def main():
         description='Print or set the hostname of the current system.',
         add_help=False
     )
+    parser.add_argument('-f', '--fqdn', '--long', action='store_true', help='long host name (FQDN)')
+    parser.add_argument('-i', '--ip-address', action='store_true', help='addresses for the host name')
+    parser.add_argument('-I', '--all-ip-addresses', action='store_true', help='all addresses for the host')
     parser.add_argument('--help', action='store_true', help='display this help and exit')
     parser.add_argument('--version', action='store_true', help='output version information and exit')
 
@@ -28,6 +145,14 @@ def main():
         print(f"  or:  {parser.prog} OPTION")
         print("Print or set the hostname of the current system.")
         print()
+        print("  -f, --fqdn, --long       print the fully qualified domain name")
+        print("  -i, --ip-address         print the addresses the host name resolves to")
+        print("  -I, --all-ip-addresses   print all addresses of the network interfaces,")
+        print("                             without using the resolver")
+        print()
+        print(f"Lookups for -f and -i are limited to {RESOLVE_TIMEOUT:g} seconds and their")
+        print(f"results are cached for {CACHE_TTL} seconds.")
+        print()
         print("      --help     display this help and exit")
         print("      --version  output version information and exit")
         return 0
@@ -40,6 +165,17 @@ def main():
         print("Written by Junaid Rahman.")
         return 0
 
+    queries = [args.fqdn, args.ip_address, args.all_ip_addresses]
+    if sum(queries) > 1:
+        print("hostname: options -f, -i and -I are mutually exclusive", file=sys.stderr)
+        return 1
+    if any(queries):
+        if name_args:
+            print(f"hostname: extra operand '{name_args[0]}'", file=sys.stderr)
+            print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+            return 1
+        return print_query(args)
+
     if len(name_args) > 1:
         print(f"hostname: extra operand '{name_args[1]}'", file=sys.stderr)
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
@@ -5,11 +5,12 @@ Python port of GNU coreutils id
 """
 
 import argparse
+import json
 import os
-import pwd
-import grp
 import sys
 
+import nsscache
+
 ok = True
 
 def get_user_by_spec(spec):
@@ -20,9 +21,9 @@ def get_user_by_spec(spec):
     try:
         if spec.isdigit():
             uid = int(spec)
-            return pwd.getpwuid(uid), None
+            return nsscache.getpwuid(uid), None
         else:
-            return pwd.getpwnam(spec), None
+            return nsscache.getpwnam(spec), None
     except (KeyError, ValueError):
         return None, f"id: '{spec}': no such user"
 
@@ -36,9 +37,9 @@ def print_id(id_val, id_type, use_name):
     if use_name:
         try:
             if id_type == 'user':
-                name = pwd.getpwuid(id_val).pw_name
+                name = nsscache.getpwuid(id_val).pw_name
             else:  # group
-                name = grp.getgrgid(id_val).gr_name
+                name = nsscache.getgrgid(id_val).gr_name
         except KeyError:
             # GNU id doesn't print an error here, it just prints the number.
             pass
@@ -49,36 +50,59 @@ def print_id(id_val, id_type, use_name):
     else:
         print(id_val, end='')
 
-def print_group_list(username, use_name, delimiter):
+def group_ids(username, rgid, egid):
+    """
+    Return the group IDs of a user (or of the current process when username
+    is None) in the order GNU prints them: the real group, the effective
+    group if different, then the remaining supplementary groups in the order
+    the group database lists them, without duplicates.
+    """
+    if username:
+        # getgrouplist includes the user's primary group ID
+        supplementary = nsscache.getgrouplist(username, nsscache.getpwnam(username).pw_gid)
+    else:
+        supplementary = os.getgroups()
+    groups = [rgid] if rgid == egid else [rgid, egid]
+    groups.extend(g for g in dict.fromkeys(supplementary) if g != rgid and g != egid)
+    return groups
+
+def print_group_list(username, use_name, delimiter, rgid=None, egid=None, prog='id'):
     """
     Prints all group IDs for a given user or the current process.
+    rgid and egid default to the user's primary group, or to the real and
+    effective group of the process. Returns False if anything failed.
     """
     global ok
     try:
-        if username:
-            user_info = pwd.getpwnam(username)
-            # os.getgrouplist includes the user's primary group ID
-            groups = sorted(os.getgrouplist(username, user_info.pw_gid))
-        else:  # current process
-            # For the current process, get real, effective, and supplementary
-            groups = sorted(list(set([os.getgid(), os.getegid()] + os.getgroups())))
+        if rgid is None:
+            rgid = nsscache.getpwnam(username).pw_gid if username else os.getgid()
+        if egid is None:
+            egid = rgid if username else os.getegid()
+        groups = group_ids(username, rgid, egid)
     except (KeyError, OSError) as e:
         err_user = f" for user {username}" if username else ""
-        print(f"id: failed to get groups{err_user}: {e}", file=sys.stderr)
+        print(f"{prog}: failed to get groups{err_user}: {e}", file=sys.stderr)
         ok = False
-        return
+        return False
 
+    success = True
     output = []
     for g in groups:
         if use_name:
             try:
-                output.append(grp.getgrgid(g).gr_name)
+                output.append(nsscache.getgrgid(g).gr_name)
             except KeyError:
-                output.append(str(g)) # Fallback to number if name not found
+                # Fall back to the number, as GNU does, but report it.
+                print(f"{prog}: cannot find name for group ID {g}", file=sys.stderr)
+                output.append(str(g))
+                success = False
         else:
             output.append(str(g))
 
     print(delimiter.join(output), end='')
+    if not success:
+        ok = False
+    return success
 
 def print_full_info(ruid, euid, rgid, egid, username=None):
     """
@@ -86,13 +110,13 @@ def print_full_info(ruid, euid, rgid, egid, username=None):
     """
     global ok
     try:
-        print(f"uid={ruid}({pwd.getpwuid(ruid).pw_name})", end='')
-        print(f" gid={rgid}({grp.getgrgid(rgid).gr_name})", end='')
+        print(f"uid={ruid}({nsscache.getpwuid(ruid).pw_name})", end='')
+        print(f" gid={rgid}({nsscache.getgrgid(rgid).gr_name})", end='')
 
         if euid != ruid:
-            print(f" euid={euid}({pwd.getpwuid(euid).pw_name})", end='')
+            print(f" euid={euid}({nsscache.getpwuid(euid).pw_name})", end='')
         if egid != rgid:
-            print(f" egid={egid}({grp.getgrgid(egid).gr_name})", end='')
+            print(f" egid={egid}({nsscache.getgrgid(egid).gr_name})", end='')
     except KeyError as e:
         # This can happen if a UID/GID doesn't have a corresponding name
         print(f"\nid: cannot find name for ID {e.args[0]}", file=sys.stderr)
@@ -100,17 +124,14 @@ def print_full_info(ruid, euid, rgid, egid, username=None):
         return
 
     try:
-        if username:
-            user_info = pwd.getpwnam(username)
-            all_groups = sorted(os.getgrouplist(username, user_info.pw_gid))
-        else:
-            all_groups = sorted(list(set([rgid, egid] + os.getgroups())))
+        # Same order as -G: the real and effective groups first.
+        all_groups = group_ids(username, rgid, egid)
 
         if all_groups:
             group_strings = []
             for gid in all_groups:
                 try:
-                    g_name = grp.getgrgid(gid).gr_name
+                    g_name = nsscache.getgrgid(gid).gr_name
                     group_strings.append(f"{gid}({g_name})")
                 except KeyError:
                     group_strings.append(str(gid))
@@ -121,19 +142,61 @@ def print_full_info(ruid, euid, rgid, egid, username=None):
         print(f"\nid: failed to get groups{err_user}: {e}", file=sys.stderr)
         ok = False
 
+def id_record(ruid, euid, rgid, egid, username=None):
+    """
+    Return the information of the default format as a dict, for --format=json.
+    Names that cannot be resolved are null.
+    """
+    global ok
+    groups = group_ids(username, rgid, egid)
+
+    def user_name(uid):
+        try:
+            return nsscache.getpwuid(uid).pw_name
+        except KeyError:
+            return None
+
+    def group_name(gid):
+        try:
+            return nsscache.getgrgid(gid).gr_name
+        except KeyError:
+            return None
+
+    return {
+        'uid': ruid, 'user': user_name(ruid),
+        'gid': rgid, 'group': group_name(rgid),
+        'euid': euid, 'euser': user_name(euid),
+        'egid': egid, 'egroup': group_name(egid),
+        'groups': [{'gid': gid, 'name': group_name(gid)} for gid in groups],
+    }
+
+def read_user_list(filename):
+    """
+    Read user names or UIDs, one per line, from filename ('-' for stdin).
+    """
+    if filename == '-':
+        return [line.strip() for line in sys.stdin if line.strip()]
+    with open(filename) as f:
+        return [line.strip() for line in f if line.strip()]
+
 def main():
     def do_print_for_ids(args, ruid, euid, rgid, egid, username=None):
         """Helper to perform the printing action."""
         delimiter = '\0' if args.zero else ' '
 
-        if args.user:
+        if args.format == 'json':
+            print(json.dumps(id_record(ruid, euid, rgid, egid, username)), end='')
+        elif args.user:
             uid_to_print = ruid if args.real else euid
             print_id(uid_to_print, 'user', args.name)
         elif args.group:
             gid_to_print = rgid if args.real else egid
             print_id(gid_to_print, 'group', args.name)
         elif args.groups:
-            print_group_list(username, args.name, delimiter)
+            if args.real:
+                print_group_list(username, args.name, delimiter, rgid, rgid)
+            else:
+                print_group_list(username, args.name, delimiter, rgid, egid)
         else: # default format
             print_full_info(ruid, euid, rgid, egid, username)
 
@@ -151,6 +214,8 @@ def main():
     parser.add_argument('-r', '--real', action='store_true', help='print the real ID instead of the effective ID, with -u, -g, -G')
     parser.add_argument('-u', '--user', action='store_true', help='print only the effective user ID')
     parser.add_argument('-z', '--zero', action='store_true', help='delimit entries with NUL characters, not whitespace')
+    parser.add_argument('--users-from', metavar='FILE', help='also read USERs, one per line, from FILE')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='output format')
     parser.add_argument('--help', action='store_true', help='display this help and exit')
     parser.add_argument('--version', action='store_true', help='output version information and exit')
     parser.add_argument('users', nargs='*', metavar='USER', help='user to inspect')
@@ -160,7 +225,7 @@ def main():
     if args.help:
         print(f"Usage: {parser.prog} [OPTION]... [USER]")
         print("Print user and group information for each specified USER, or (when USER is omitted) for the current user.")
-        print("\n  -a             ignore, for compatibility with other versions\n  -Z, --context  print only the security context of the process (not supported)\n  -g, --group    print only the effective group ID\n  -G, --groups   print all group IDs\n  -n, --name     print a name instead of a number, for -u,-g,-G\n  -r, --real     print the real ID instead of the effective ID, with -u,-g,-G\n  -u, --user     print only the effective user ID\n  -z, --zero     delimit entries with NUL characters, not whitespace;\n                   not permitted in default format")
+        print("\n  -a             ignore, for compatibility with other versions\n  -Z, --context  print only the security context of the process (not supported)\n  -g, --group    print only the effective group ID\n  -G, --groups   print all group IDs\n  -n, --name     print a name instead of a number, for -u,-g,-G\n  -r, --real     print the real ID instead of the effective ID, with -u,-g,-G\n  -u, --user     print only the effective user ID\n  -z, --zero     delimit entries with NUL characters, not whitespace;\n                   not permitted in default format\n      --users-from=FILE  also read USERs, one per line, from FILE (- for stdin);\n                   many users are resolved from one pass over the passwd\n                   and group databases\n      --format=FORMAT  'text' (default), or 'json' for one JSON object per\n                   line with the IDs, names and groups of each USER")
         print("      --help     display this help and exit\n      --version  output version information and exit")
         print("\nWithout any OPTION, print some useful set of identified information.")
         return 0
@@ -178,6 +243,15 @@ def main():
     if not any([args.user, args.group, args.groups, args.context]) and args.zero:
         print("id: option --zero not permitted in default format", file=sys.stderr)
         return 1
+    if args.format == 'json' and any([args.user, args.group, args.groups, args.context]):
+        print("id: --format=json prints the full record; it cannot be combined with -u, -g, -G or -Z", file=sys.stderr)
+        return 1
+    if args.users_from is not None:
+        try:
+            args.users += read_user_list(args.users_from)
+        except OSError as e:
+            print(f"id: cannot read '{args.users_from}': {e.strerror}", file=sys.stderr)
+            return 1
     if args.users and args.context:
         print("id: cannot print security context when user specified", file=sys.stderr)
         return 1
@@ -189,6 +263,13 @@ def main():
     end_char = '\0' if args.zero else '\n'
 
     if args.users:
+        # Only for an explicit list: the snapshot can miss group memberships
+        # that getgrouplist() would find, so plain operands don't use it.
+        if args.users_from is not None:
+            try:
+                nsscache.load_databases()
+            except OSError:
+                pass
         for user_spec in args.users:
             user_info, err_msg = get_user_by_spec(user_spec)
             if err_msg:
@@ -6,8 +6,9 @@ Python port of GNU coreutils kill (carbon copy)
 
 import sys
 import os
+import errno
 import signal
-import argparse
+import time
 
 # Build signal name/number maps (no SIG_*, no duplicates)
 SIGNALS = {name: num for name, num in signal.__dict__.items()
@@ -64,7 +65,149 @@ def list_signals(args=None, number_mode=False, table=False):
     return 0
 
 
-def send_signals(signum, pids, prog):
+class ExitWaiter:
+    """
+    Signals processes and then waits for all of them to exit.
+
+    Each process is addressed through a pidfd (os.pidfd_open, Linux 5.3
+    and later), so a PID that is reused after the process exits is never
+    signaled by mistake, and all pidfds are waited for at once with a
+    single select.poll() that wakes up as each process exits. Where pidfds
+    are not available, processes are signaled with os.kill() and their
+    exits detected by polling kill(pid, 0).
+    """
+
+    def __init__(self):
+        self.use_pidfd = hasattr(os, 'pidfd_open')
+        # pidfd (or PID without pidfds) -> PID
+        self.pending = {}
+
+    def signal(self, pid, signum):
+        """
+        Send signum to pid and remember it for wait(). Raises
+        ProcessLookupError or PermissionError like os.kill().
+        """
+        if self.use_pidfd:
+            try:
+                fd = self._open_pidfd(pid)
+            except OSError as e:
+                if e.errno != errno.ENOSYS:
+                    raise
+                self.use_pidfd = False
+            else:
+                try:
+                    signal.pidfd_send_signal(fd, signum)
+                except ProcessLookupError:
+                    # Exited between pidfd_open and the signal: done.
+                    os.close(fd)
+                    return
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self.pending[fd] = pid
+                return
+        os.kill(pid, signum)
+        self.pending[pid] = pid
+
+    @staticmethod
+    def _open_pidfd(pid):
+        try:
+            return os.pidfd_open(pid)
+        except OSError as e:
+            # Thousands of targets can exceed the soft descriptor limit.
+            if e.errno != errno.EMFILE or not _raise_fd_limit():
+                raise
+            return os.pidfd_open(pid)
+
+    def wait(self, timeout=None):
+        """
+        Wait until every signaled process has exited, or at most timeout
+        seconds. Returns True if none is left.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.use_pidfd:
+            return self._wait_polling(deadline)
+        # Imported here so that plain kill runs don't pay for it.
+        import select
+        poller = select.poll()
+        for fd in self.pending:
+            poller.register(fd, select.POLLIN)
+        while self.pending:
+            if deadline is None:
+                events = poller.poll()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                events = poller.poll(remaining * 1000 + 1)
+            for fd, _ in events:
+                poller.unregister(fd)
+                os.close(fd)
+                del self.pending[fd]
+        return True
+
+    def _wait_polling(self, deadline):
+        delay = 0.001
+        while self.pending:
+            for pid in list(self.pending):
+                try:
+                    os.kill(pid, 0)
+                except ProcessLookupError:
+                    del self.pending[pid]
+                except PermissionError:
+                    pass
+            if not self.pending:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(delay if deadline is None else min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, 0.1)
+        return True
+
+    def kill_remaining(self):
+        """Send SIGKILL to every process that has not exited yet."""
+        for key in list(self.pending):
+            try:
+                if self.use_pidfd:
+                    signal.pidfd_send_signal(key, signal.SIGKILL)
+                else:
+                    os.kill(key, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def close(self):
+        if self.use_pidfd:
+            for fd in self.pending:
+                os.close(fd)
+        self.pending.clear()
+
+
+def _raise_fd_limit():
+    """Raise the soft RLIMIT_NOFILE to the hard limit; False if it already is."""
+    import resource
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY:
+        hard = max(soft * 4, 1 << 16)
+    if soft >= hard:
+        return False
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return True
+
+
+def wait_for_exit(waiter, timeout=None):
+    """
+    Wait for the processes signaled through waiter to exit; those still
+    running after timeout seconds get SIGKILL, and are waited for too.
+    """
+    try:
+        if not waiter.wait(timeout):
+            waiter.kill_remaining()
+            waiter.wait()
+    finally:
+        waiter.close()
+
+
+def send_signals(signum, pids, prog, waiter=None):
     status = 0
     for pidstr in pids:
         try:
@@ -73,8 +216,15 @@ def send_signals(signum, pids, prog):
             print(f"{prog}: {pidstr}: invalid process id", file=sys.stderr)
             status = 1
             continue
+        if waiter is not None and pid <= 0:
+            print(f"{prog}: {pid}: cannot wait for a process group", file=sys.stderr)
+            status = 1
+            continue
         try:
-            os.kill(pid, signum)
+            if waiter is not None:
+                waiter.signal(pid, signum)
+            else:
+                os.kill(pid, signum)
         except ValueError:
             print(f"{prog}: {signum}: invalid signal", file=sys.stderr)
             status = 1
@@ -90,6 +240,315 @@ def send_signals(signum, pids, prog):
     return status
 
 
+PROC_DIR = '/proc'
+
+# Where cgroup file systems are mounted; relative --cgroup paths are looked
+# up below it. Can be overridden for testing purposes.
+CGROUP_ROOT = os.environ.get('_PYCOREUTILS_TEST_CGROUP_ROOT', '/sys/fs/cgroup')
+
+# How long --freeze waits for a cgroup to report that it is frozen.
+FREEZE_TIMEOUT = 10
+
+
+def _read_stat(proc_fd, pid):
+    """
+    Return /proc/PID/stat, read with a single os.read(), or None if the
+    process is gone. The line is well under a page.
+    """
+    try:
+        fd = os.open(f'{pid}/stat', os.O_RDONLY | os.O_CLOEXEC, dir_fd=proc_fd)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _read_cmdline(proc_fd, pid):
+    """
+    Return /proc/PID/cmdline with the NULs between arguments turned into
+    spaces, or None if the process is gone.
+    """
+    try:
+        fd = os.open(f'{pid}/cmdline', os.O_RDONLY | os.O_CLOEXEC, dir_fd=proc_fd)
+    except OSError:
+        return None
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return b''.join(chunks).rstrip(b'\0').replace(b'\0', b' ')
+
+
+def scan_processes(name=None, full=False, uids=None, parents=None, proc_dir=PROC_DIR):
+    """
+    Yield the PIDs of the processes matching all the given criteria, like
+    pgrep: name is a compiled bytes regex searched for in the process name
+    (in the full command line if full is true), uids a set of effective
+    UIDs and parents a set of parent PIDs. The calling process never
+    matches.
+
+    /proc is walked once with os.scandir; per process only stat is read,
+    and cmdline only with full. The UID is that of the /proc/PID directory,
+    so it costs a stat() and is only looked up when uids is given.
+    """
+    own = os.getpid()
+    proc_fd = os.open(proc_dir, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+    try:
+        with os.scandir(proc_fd) as entries:
+            for entry in entries:
+                pid = entry.name
+                if not pid.isdigit() or int(pid) == own:
+                    continue
+                if uids is not None:
+                    try:
+                        if entry.stat(follow_symlinks=False).st_uid not in uids:
+                            continue
+                    except OSError:
+                        continue
+                stat = None
+                if parents is not None or (name is not None and not full):
+                    stat = _read_stat(proc_fd, pid)
+                    if stat is None:
+                        continue
+                    # "PID (COMM) STATE PPID ..."; COMM may hold anything.
+                    comm_end = stat.rfind(b')')
+                    if parents is not None and int(stat[comm_end + 4:].split(b' ', 1)[0]) not in parents:
+                        continue
+                if name is not None:
+                    subject = _read_cmdline(proc_fd, pid) if full else None
+                    if not subject:
+                        # Kernel threads have no command line: use the name.
+                        if stat is None:
+                            stat = _read_stat(proc_fd, pid)
+                            if stat is None:
+                                continue
+                            comm_end = stat.rfind(b')')
+                        subject = stat[stat.find(b'(') + 1:comm_end]
+                    if not name.search(subject):
+                        continue
+                yield int(pid)
+    finally:
+        os.close(proc_fd)
+
+
+def parse_user_list(users):
+    """
+    Return the set of UIDs for a comma-separated list of user names or
+    numeric IDs, or raise ValueError naming the first unknown user.
+    """
+    # Imported here so that plain kill runs don't pay for it.
+    import pwd
+    uids = set()
+    for user in users.split(','):
+        if user.isdigit():
+            uids.add(int(user))
+            continue
+        try:
+            uids.add(pwd.getpwnam(user).pw_uid)
+        except KeyError:
+            raise ValueError(user) from None
+    return uids
+
+
+def signal_matching(signum, prog, waiter=None, **criteria):
+    """
+    Send signum to every process scan_processes() yields for criteria, as
+    it is found (through waiter, an ExitWaiter, if given). Returns 0 if at
+    least one process was signaled and there were no errors, else 1 (like
+    pkill, without a message if nothing matched).
+    """
+    status = 0
+    signaled = 0
+    for pid in scan_processes(**criteria):
+        try:
+            if waiter is not None:
+                waiter.signal(pid, signum)
+            else:
+                os.kill(pid, signum)
+            signaled += 1
+        except ProcessLookupError:
+            # Exited since the scan saw it.
+            pass
+        except PermissionError:
+            print(f"{prog}: {pid}: permission denied", file=sys.stderr)
+            status = 1
+    return status if signaled else 1
+
+
+def cgroup_directory(path):
+    """
+    Return the directory of cgroup path: path itself if it is a cgroup
+    directory, else path taken relative to CGROUP_ROOT or, on hybrid
+    systems, to the v2 hierarchy mounted below it as 'unified' (so both
+    /sys/fs/cgroup/app.slice and /app.slice work). Raises ValueError if
+    none is a cgroup.
+    """
+    relative = path.lstrip('/')
+    for directory in (path, os.path.join(CGROUP_ROOT, relative), os.path.join(CGROUP_ROOT, 'unified', relative)):
+        if os.path.isfile(os.path.join(directory, 'cgroup.procs')):
+            return directory
+    raise ValueError(path)
+
+
+def _cgroup_procs(directory):
+    """
+    Yield the PIDs in cgroup.procs of directory and of every cgroup below
+    it. The calling process is left out, as in scan_processes().
+    """
+    own = os.getpid()
+    try:
+        fd = os.open(os.path.join(directory, 'cgroup.procs'), os.O_RDONLY | os.O_CLOEXEC)
+    except FileNotFoundError:
+        # Removed since it was listed.
+        return
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    for pid in b''.join(chunks).split():
+        if int(pid) != own:
+            yield int(pid)
+    try:
+        with os.scandir(directory) as entries:
+            children = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        # Removed since cgroup.procs was read.
+        return
+    for child in children:
+        yield from _cgroup_procs(child)
+
+
+def _contains_self(directory):
+    """
+    Whether the calling process is in the cgroup directory or in a cgroup
+    below it, going by its cgroup v2 entry in /proc/self/cgroup.
+    """
+    try:
+        with open(os.path.join(PROC_DIR, 'self', 'cgroup'), 'rb') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return False
+    target = os.path.realpath(directory)
+    for line in lines:
+        if line.startswith(b'0::'):
+            path = os.fsdecode(line[3:]).lstrip('/')
+            for root in (CGROUP_ROOT, os.path.join(CGROUP_ROOT, 'unified')):
+                own = os.path.realpath(os.path.join(root, path))
+                if own == target or own.startswith(target.rstrip('/') + '/'):
+                    return True
+    return False
+
+
+def _write_cgroup_file(directory, name, value):
+    fd = os.open(os.path.join(directory, name), os.O_WRONLY | os.O_TRUNC | os.O_CLOEXEC)
+    try:
+        os.write(fd, value)
+    finally:
+        os.close(fd)
+
+
+def _wait_frozen(directory, timeout):
+    """
+    Wait until cgroup.events of directory reports "frozen 1", for at most
+    timeout seconds; the kernel signals changes to it with POLLPRI.
+    Returns whether the cgroup froze.
+    """
+    # Imported here so that plain kill runs don't pay for it.
+    import select
+    deadline = time.monotonic() + timeout
+    fd = os.open(os.path.join(directory, 'cgroup.events'), os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        poller = select.poll()
+        poller.register(fd, select.POLLPRI)
+        while True:
+            if b'frozen 1' in os.pread(fd, 4096, 0).splitlines():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            poller.poll(remaining * 1000 + 1)
+    finally:
+        os.close(fd)
+
+
+def signal_cgroup(signum, directory, prog, waiter=None, freeze=False):
+    """
+    Send signum to every process of the cgroup directory and of the cgroups
+    below it (through waiter, an ExitWaiter, if given). SIGKILL is sent
+    with a single write to cgroup.kill (cgroup v2, Linux 5.14 and later)
+    when available and kill is not in the cgroup itself. Otherwise cgroup.procs is read again until a pass
+    finds no process that was not already signaled, so processes forked
+    meanwhile are caught too. With freeze, the cgroup is frozen through
+    cgroup.freeze (cgroup v2) while the signals are sent, so none can fork,
+    and thawed afterwards.
+    """
+    if freeze and not os.path.isfile(os.path.join(directory, 'cgroup.freeze')):
+        print(f"{prog}: '{directory}': cannot freeze: no cgroup.freeze (cgroup v2 required)", file=sys.stderr)
+        return 1
+    if freeze and _contains_self(directory):
+        # A frozen kill could never thaw the cgroup again.
+        print(f"{prog}: '{directory}': cannot freeze a cgroup that kill itself is in", file=sys.stderr)
+        return 1
+    status = 0
+    try:
+        if freeze:
+            _write_cgroup_file(directory, 'cgroup.freeze', b'1')
+            if not _wait_frozen(directory, FREEZE_TIMEOUT):
+                print(f"{prog}: '{directory}': not frozen after {FREEZE_TIMEOUT}s, signaling anyway",
+                      file=sys.stderr)
+        # cgroup.kill would take kill down too; the loop below skips it.
+        if (signum == signal.SIGKILL and os.path.isfile(os.path.join(directory, 'cgroup.kill'))
+                and not _contains_self(directory)):
+            if waiter is not None:
+                # Signal 0 only opens the pidfds to wait on.
+                for pid in _cgroup_procs(directory):
+                    try:
+                        waiter.signal(pid, 0)
+                    except (ProcessLookupError, PermissionError):
+                        pass
+            _write_cgroup_file(directory, 'cgroup.kill', b'1')
+            return status
+        signaled = set()
+        while True:
+            found = False
+            for pid in _cgroup_procs(directory):
+                if pid in signaled:
+                    continue
+                found = True
+                signaled.add(pid)
+                try:
+                    if waiter is not None:
+                        waiter.signal(pid, signum)
+                    else:
+                        os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    print(f"{prog}: {pid}: permission denied", file=sys.stderr)
+                    status = 1
+            if not found:
+                return status
+    finally:
+        if freeze:
+            _write_cgroup_file(directory, 'cgroup.freeze', b'0')
+
+
 def print_help():
     print("kill: kill [-s sigspec | -n signum | -sigspec] pid | jobspec ... or kill -l [sigspec]\n")
     print("Send a signal to a job.\n")
@@ -103,6 +562,16 @@ def print_help():
     print("          assumed to be signal numbers for which names should be listed\n")
     print("-L        synonym for -l\n")
     print("-t        print a table of signal information\n")
+    print("      --name=REGEX  signal the processes whose name matches REGEX\n")
+    print("      --full     match REGEX against the full command line\n")
+    print("      --user=USER[,USER]...  only processes with one of these effective users\n")
+    print("      --parent=PID[,PID]...  only children of one of these processes\n")
+    print("      --cgroup=PATH  signal every process of cgroup PATH and the cgroups below\n")
+    print("                 it (PATH may be relative to /sys/fs/cgroup)\n")
+    print("      --freeze   with --cgroup, freeze the cgroup while signaling it\n")
+    print("      --wait     wait until the signaled processes have exited\n")
+    print("      --timeout=DURATION  wait at most DURATION, then send SIGKILL to the\n")
+    print("                 processes still running and wait for them\n")
     print("      --help     display this help and exit\n")
     print("      --version  output version information and exit\n")
     print("\nKill is a shell builtin for two reasons: it allows job IDs to be used\n")
@@ -121,6 +590,10 @@ def print_version():
 
 
 def main():
+    # Imported here so that importers of the signal table (timeout) don't
+    # pay for them.
+    import argparse
+    import re
     parser = argparse.ArgumentParser(
         prog='kill',
         description='Send signals to processes, or list signals.',
@@ -131,6 +604,14 @@ def main():
     parser.add_argument('-l', nargs='*', metavar='SIGSPEC', dest='list_signals', help='list signal names; if arguments follow, they are assumed to be signal numbers for which names should be listed')
     parser.add_argument('-L', nargs='*', metavar='SIGSPEC', dest='list_signals_L', help='synonym for -l')
     parser.add_argument('-t', action='store_true', dest='table', help='print a table of signal information')
+    parser.add_argument('--name', metavar='REGEX', help='signal the processes whose name matches REGEX')
+    parser.add_argument('--full', action='store_true', help='match REGEX against the full command line')
+    parser.add_argument('--user', metavar='USER', help='only match processes of these users')
+    parser.add_argument('--parent', metavar='PID', help='only match children of these processes')
+    parser.add_argument('--cgroup', metavar='PATH', help='signal every process of cgroup PATH')
+    parser.add_argument('--freeze', action='store_true', help='with --cgroup, freeze the cgroup while signaling it')
+    parser.add_argument('--wait', action='store_true', help='wait until the signaled processes have exited')
+    parser.add_argument('--timeout', metavar='DURATION', help='wait at most DURATION, then send SIGKILL')
     parser.add_argument('--help', action='store_true', help='display this help and exit')
     parser.add_argument('--version', action='store_true', help='output version information and exit')
     parser.add_argument('args', nargs=argparse.REMAINDER, help='PID(s) or signal spec')
@@ -192,13 +673,88 @@ def main():
     else:
         signum = signal.SIGTERM
 
+    waiter = timeout = None
+    if args.wait or args.timeout is not None:
+        if args.timeout is not None:
+            # Imported here so that plain kill runs don't pay for it.
+            from sleep import parse_time_interval
+            timeout = parse_time_interval(args.timeout)
+            if timeout is None or timeout < 0:
+                print(f"kill: invalid time interval '{args.timeout}'", file=sys.stderr)
+                return 1
+        waiter = ExitWaiter()
+
+    if args.full and args.name is None:
+        print("kill: --full requires --name", file=sys.stderr)
+        return 1
+    if args.freeze and args.cgroup is None:
+        print("kill: --freeze requires --cgroup", file=sys.stderr)
+        return 1
+    if args.cgroup is not None:
+        if args.name is not None or args.user is not None or args.parent is not None:
+            print("kill: --cgroup cannot be combined with --name, --user or --parent", file=sys.stderr)
+            return 1
+        if args.args:
+            print(f"kill: extra operand '{args.args[0]}'", file=sys.stderr)
+            print(f"Try 'kill --help' for more information.", file=sys.stderr)
+            return 1
+        try:
+            directory = cgroup_directory(args.cgroup)
+        except ValueError:
+            print(f"kill: '{args.cgroup}': not a cgroup", file=sys.stderr)
+            return 1
+        try:
+            status = signal_cgroup(signum, directory, 'kill', waiter, args.freeze)
+        except OSError as e:
+            print(f"kill: '{args.cgroup}': {e.strerror}", file=sys.stderr)
+            status = 1
+        return finish_waiting(waiter, timeout, status)
+    if args.name is not None or args.user is not None or args.parent is not None:
+        if args.args:
+            print(f"kill: extra operand '{args.args[0]}'", file=sys.stderr)
+            print(f"Try 'kill --help' for more information.", file=sys.stderr)
+            return 1
+        criteria = {'full': args.full}
+        if args.name is not None:
+            try:
+                criteria['name'] = re.compile(os.fsencode(args.name))
+            except re.error as e:
+                print(f"kill: invalid regular expression '{args.name}': {e}", file=sys.stderr)
+                return 1
+        if args.user is not None:
+            try:
+                criteria['uids'] = parse_user_list(args.user)
+            except ValueError as e:
+                print(f"kill: invalid user name '{e}'", file=sys.stderr)
+                return 1
+        if args.parent is not None:
+            try:
+                criteria['parents'] = {int(pid) for pid in args.parent.split(',')}
+            except ValueError:
+                print(f"kill: invalid process id '{args.parent}'", file=sys.stderr)
+                return 1
+        status = signal_matching(signum, 'kill', waiter, **criteria)
+        return finish_waiting(waiter, timeout, status)
+
     # Remaining args are PIDs
     pids = args.args
     if not pids:
         print(f"kill: missing operand", file=sys.stderr)
         print(f"Try 'kill --help' for more information.", file=sys.stderr)
         return 1
-    return send_signals(signum, pids, 'kill')
+    status = send_signals(signum, pids, 'kill', waiter)
+    return finish_waiting(waiter, timeout, status)
+
+
+def finish_waiting(waiter, timeout, status):
+    """Wait for the processes signaled through waiter, if any; return status."""
+    if waiter is None:
+        return status
+    try:
+        wait_for_exit(waiter, timeout)
+    except KeyboardInterrupt:
+        return 130
+    return status
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+md5sum - compute and check MD5 message digest
+Python port of GNU coreutils md5sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('md5sum'))
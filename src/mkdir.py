@@ -5,11 +5,14 @@ Python port of GNU coreutils mkdir
 """
 
 import argparse
+import errno
 import os 
 import stat
 import sys 
 from pathlib import Path
 
+from pathutil import open_files0_from
+
 def parse_mode(mode_str):
     """
     Parse a mode string (like chmod) and return the numeric mode.
@@ -110,83 +113,359 @@ def parse_mode(mode_str):
     
     return current_mode
 
-def make_directory(path, mode=None, parents=False, verbose=False, exists_ok=False):
+# Directories are only ever used as dir_fd anchors, so O_PATH (where
+# available) is enough and needs no read permission on them.
+_ANCHOR_FLAGS = getattr(os, 'O_PATH', os.O_RDONLY) | os.O_DIRECTORY | getattr(os, 'O_CLOEXEC', 0)
+
+
+def _emit(stream, line, messages):
+    """Print line to stream, or append it to messages if that is a list."""
+    if messages is None:
+        print(line, file=stream)
+    else:
+        messages.append((stream, line))
+
+
+def _report(path, error, messages=None):
+    _emit(sys.stderr, f"mkdir: cannot create directory '{path}': {error.strerror}", messages)
+
+
+def _announce(path, verbose, messages=None):
+    if verbose:
+        _emit(sys.stdout, f"mkdir: created directory '{path}'", messages)
+
+
+def _not_a_directory():
+    return NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR))
+
+
+def _components(path):
+    """Return the (start, end) offsets of the components of path."""
+    spans = []
+    i, n = 0, len(path)
+    while i < n:
+        if path[i] == '/':
+            i += 1
+            continue
+        j = path.find('/', i)
+        if j < 0:
+            j = n
+        spans.append((i, j))
+        i = j
+    return spans
+
+
+def _is_directory(path, dir_fd=None):
+    try:
+        return stat.S_ISDIR(os.stat(path, dir_fd=dir_fd).st_mode)
+    except OSError:
+        return False
+
+
+def _report_ancestor(path, messages=None):
+    """
+    Report that path could not be made with -p because one of its ancestors
+    is not a directory. Like GNU mkdir, name the first such ancestor.
+    """
+    for _start, end in _components(path)[:-1]:
+        if not _is_directory(path[:end]):
+            if os.path.lexists(path[:end]):
+                _report(path[:end], _not_a_directory(), messages)
+                return
+            break
+    _report(path, _not_a_directory(), messages)
+
+
+def _make_missing_parents(path, mode, parent_mode, verbose):
+    """
+    Create path after mkdir() on it failed with ENOENT. Backs off one
+    component at a time until an ancestor can be created or already exists,
+    then creates the rest relative to that ancestor through a dir_fd.
+    """
+    spans = _components(path)
+    for anchor in range(len(spans) - 2, -1, -1):
+        prefix = path[:spans[anchor][1]]
+        try:
+            os.mkdir(prefix, parent_mode)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            _report(prefix, e)
+            return False
+        else:
+            _announce(prefix, verbose)
+        break
+    else:
+        _report(path, FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT)))
+        return False
+
+    try:
+        fd = os.open(prefix, _ANCHOR_FLAGS)
+    except OSError as e:
+        _report(prefix, e)
+        return False
+    try:
+        base = spans[anchor + 1][0]
+        for i in range(anchor + 1, len(spans)):
+            end = spans[i][1]
+            leaf = i == len(spans) - 1
+            try:
+                os.mkdir(path[base:end], mode if leaf else parent_mode, dir_fd=fd)
+            except FileExistsError as e:
+                # Created by someone else since the back-off.
+                if not _is_directory(path[base:end], dir_fd=fd):
+                    _report(path[:end], e if leaf else _not_a_directory())
+                    return False
+            except OSError as e:
+                _report(path[:end], e)
+                return False
+            else:
+                _announce(path[:end], verbose)
+    finally:
+        os.close(fd)
+    return True
+
+
+def make_directory(path, mode=0o777, parents=False, verbose=False, parent_mode=0o777):
     """
     Create a directory with specified mode.
-    
+
+    The leaf is created first, so with parents only missing ancestors cost
+    anything: an existing parent means a single mkdir() call.
+
     Args:
         path: Directory path to create
-        mode: File mode (permissions) as integer
-        parents: Create parent directories if needed
+        mode: File mode (permissions) as integer, subject to the umask
+        parents: Create parent directories if needed, no error if existing
         verbose: Print messages for created directories
-        exist_ok: Don't error if directory already exists
-    
+        parent_mode: File mode for parent directories created
+
     Returns:
         True if successful, False otherwise
     """
     try:
+        os.mkdir(path, mode)
+    except FileExistsError as e:
+        if parents and _is_directory(path):
+            return True
+        _report(path, e)
+        return False
+    except FileNotFoundError as e:
+        if parents and path:
+            return _make_missing_parents(path, mode, parent_mode, verbose)
+        _report(path, e)
+        return False
+    except NotADirectoryError as e:
         if parents:
-            parent_path = os.path.dirname(path)
-            if parent_path and parent_path != path and not os.path.exists(parent_path):
-                make_directory(parent_path, parents=True, verbose=verbose, exists_ok=True)
-        
-        if mode is not None:
-            old_umask = os.umask(0)
-            try:
-                os.mkdir(path, mode)
-            finally:
-                os.umask(old_umask)
+            _report_ancestor(path)
         else:
-            os.mkdir(path)
-        
-        if verbose:
-            print(f'mkdir: created directory {path}')
-        return True
-
-    except FileExistsError:
-        if exists_ok or parents:
-            if os.path.isdir(path):
-                return True
-            else:
-                print(f'mkdir: cannot create directory {path}: File exists.', file=sys.stderr)
-                return False
-        else:
-            print(f"mkdir: cannot create directory '{path}': File exists", file=sys.stderr)
-            return False
-        
-    except FileNotFoundError:
-        if not parents:
-            print(f"mkdir: cannot create directory '{path}': No such file or directory", file=sys.stderr)
-        else:
-            print(f"mkdir: cannot create directory '{path}': No such file or directory", file=sys.stderr)
-        return False
-    
-    except PermissionError:
-        print(f"mkdir: cannot create directory '{path}': Permission denied", file=sys.stderr)
+            _report(path, e)
         return False
-    
     except OSError as e:
-        print(f"mkdir: cannot create directory '{path}': {e.strerror}", file=sys.stderr)
+        _report(path, e)
         return False
+    _announce(path, verbose)
+    return True
+
 
-def process_directories(directories, mode=None, parents=False, verbose=False, context=None):
+def process_directories(directories, mode=0o777, parents=False, verbose=False, context=None,
+                        parent_mode=0o777):
     """
     Process multiple directories for creation.
-    
+
     Returns:
         0 on success, 1 on any failure
     """
     success = True
-    
+
     for directory in directories:
-        if not make_directory(directory, mode=mode, parents=parents, verbose=verbose):
+        if not make_directory(directory, mode=mode, parents=parents, verbose=verbose,
+                              parent_mode=parent_mode):
             success = False
 
         if context and verbose:
             print(f'mkdir: context support not implemented in this port')
-    
+
+    return 0 if success else 1
+
+
+def directory_modes(mode, parents):
+    """
+    Return the modes to create leaf and parent directories with. Sets the
+    umask for the rest of the process: it is read (and, where the modes
+    must be exact, cleared) once here instead of around every mkdir().
+    Parents get u+wx on top of the umask, as in GNU mkdir, so that their
+    children can be created; a mode given with -m applies to the leaf only.
+    """
+    umask = os.umask(0)
+    if mode is None and not (parents and umask & 0o300):
+        os.umask(umask)
+        return 0o777, 0o777
+    default = 0o777 & ~umask
+    return (default if mode is None else mode), default | 0o300
+
+
+def read_manifest(stream):
+    """
+    Read directory names from a binary stream: NUL-separated if it holds a
+    NUL (names cannot contain one), else one name per line. Returns the
+    names as str (undecodable bytes escaped as os.fsdecode() does) and the
+    number of empty entries, which are skipped.
+    """
+    data = stream.read()
+    names = data.split(b'\0' if b'\0' in data else b'\n')
+    if names and not names[-1]:
+        names.pop()
+    valid = [os.fsdecode(name) for name in names if name]
+    return valid, len(names) - len(valid)
+
+
+def _key(path):
+    """The components of path as a tuple, led by '/' if it is absolute."""
+    components = tuple(name for name in path.split('/') if name)
+    return ('/',) + components if path.startswith('/') else components
+
+
+class TreeBuilder:
+    """
+    Creates many directories, remembering every directory known to exist
+    (keyed by its components) so that each ancestor is checked at most
+    once however many operands share it. make() may run on several threads
+    at once: set lookups and insertions are atomic, and an ancestor two
+    threads race to create is simply found to exist by one of them.
+    Messages are appended to a list per call rather than printed, so that
+    the caller decides their order; they read as for plain operands.
+    """
+
+    def __init__(self, mode=0o777, parents=False, parent_mode=0o777, verbose=False):
+        self.mode = mode
+        self.parents = parents
+        self.parent_mode = parent_mode
+        self.verbose = verbose
+        self.known = {(), ('/',)}
+
+    def _create(self, path, key, ancestor, messages):
+        try:
+            os.mkdir(path, self.parent_mode if ancestor else self.mode)
+        except FileExistsError as e:
+            if not ((ancestor or self.parents) and _is_directory(path)):
+                _report(path, _not_a_directory() if ancestor else e, messages)
+                return False
+        except NotADirectoryError as e:
+            if self.parents:
+                _report_ancestor(path, messages)
+            else:
+                _report(path, e, messages)
+            return False
+        except OSError as e:
+            _report(path, e, messages)
+            return False
+        else:
+            _announce(path, self.verbose, messages)
+        self.known.add(key)
+        return True
+
+    def make_parents(self, path, key, count, messages):
+        """Make sure the first count components of path exist."""
+        known = count
+        while key[:known] not in self.known:
+            known -= 1
+        if known == count:
+            return True
+        # Offsets in path of the end of each component.
+        ends, i = [], 0
+        for name in key[:count]:
+            i = 1 if name == '/' else path.index(name, i) + len(name)
+            ends.append(i)
+        if count - known > 1:
+            # Try the deepest one first: where the tree already exists, as
+            # for ancestors shared by all operands, that settles them all.
+            deepest = path[:ends[-1]]
+            try:
+                os.mkdir(deepest, self.parent_mode)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Anything but an existing directory is reported by the walk
+                # below, at the component it concerns.
+                if _is_directory(deepest):
+                    self.known.update(key[:i] for i in range(known + 1, count + 1))
+                    return True
+            else:
+                _announce(deepest, self.verbose, messages)
+                self.known.update(key[:i] for i in range(known + 1, count + 1))
+                return True
+        for i in range(known + 1, count + 1):
+            if not self._create(path[:ends[i - 1]], key[:i], True, messages):
+                return False
+        return True
+
+    def make(self, path, key, messages):
+        """Create path, whose _key() is key; returns True on success."""
+        if self.parents and not self.make_parents(path, key, len(key) - 1, messages):
+            return False
+        return self._create(path, key, False, messages)
+
+
+def _print_messages(messages):
+    for stream, line in messages:
+        print(line, file=stream)
+
+
+def make_directory_tree(directories, jobs, mode=0o777, parents=False, verbose=False, parent_mode=0o777):
+    """
+    Create a large number of directories, as from a manifest. Operands are
+    grouped by their first component below the ancestors they all share;
+    the groups are independent subtrees and are created concurrently on a
+    pool of jobs threads, each group in input order. Messages come out
+    group by group, in the order the groups first appear.
+
+    Returns:
+        0 on success, 1 on any failure
+    """
+    builder = TreeBuilder(mode, parents, parent_mode, verbose)
+    keys = [_key(path) for path in directories]
+    shared = len(os.path.commonprefix([key[:-1] for key in keys])) if keys else 0
+    groups = {}
+    for path, key in zip(directories, keys):
+        groups.setdefault(key[shared:shared + 1], []).append((path, key))
+
+    def make_group(group):
+        messages = []
+        success = True
+        for path, key in group:
+            if not builder.make(path, key, messages):
+                success = False
+        return success, messages
+
+    if parents and shared:
+        # Settle the shared ancestors before the groups start on them.
+        messages = []
+        if not builder.make_parents(directories[0], keys[0], shared, messages):
+            # Every operand below reports the failure itself, as it would
+            # as a plain operand.
+            messages = [message for message in messages if message[0] is sys.stdout]
+        _print_messages(messages)
+
+    success = True
+    if jobs > 1 and len(groups) > 1:
+        # Imported here so that plain mkdir runs don't pay for it.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(jobs, len(groups))) as pool:
+            results = pool.map(make_group, groups.values())
+            for group_success, messages in results:
+                success = success and group_success
+                _print_messages(messages)
+    else:
+        for group in groups.values():
+            group_success, messages = make_group(group)
+            success = success and group_success
+            _print_messages(messages)
     return 0 if success else 1
 
+
 def main():
     parser = argparse.ArgumentParser(
         prog='mkdir',
@@ -201,6 +480,10 @@ def main():
                             'with their file modes unaffected by any -m option')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='print a message for each created directory')
+    parser.add_argument('--from-file', metavar='FILE',
+                       help='read the DIRECTORY names from FILE instead')
+    parser.add_argument('-j', '--jobs', metavar='N',
+                       help='with --from-file, create up to N subtrees at once')
     parser.add_argument('-Z', dest='context_default', action='store_true',
                        help='set SELinux security context of each created directory '
                             'to the default type')
@@ -228,6 +511,11 @@ Create the DIRECTORY(ies), if they do not already exist.
   -p, --parents     no error if existing, make parent directories as needed,
                     with their file modes unaffected by any -m option
   -v, --verbose     print a message for each created directory
+      --from-file=FILE  read the DIRECTORY names from FILE, NUL-separated if
+                          it contains a NUL and one per line otherwise;
+                          with FILE of -, read standard input
+  -j, --jobs=N         with --from-file, create up to N independent subtrees
+                         at once (default: the number of usable CPUs plus 4)
   -Z                   set SELinux security context of each created directory
                          to the default type
       --context[=CTX]  like -Z, or if CTX is specified then set the SELinux
@@ -240,6 +528,7 @@ Examples:
   {parser.prog} -p a/b/c/d          Create directory tree 'a/b/c/d'
   {parser.prog} -m 755 newdir       Create 'newdir' with specific permissions
   {parser.prog} -pv /tmp/a/b/c      Create with parents and verbose output
+  {parser.prog} -p --from-file=dirs.txt   Create every directory listed in dirs.txt
 """)
         return 0
     
@@ -251,7 +540,28 @@ Examples:
         print("Written by Junaid Rahman.")
         return 0
     
-    if not args.directories:
+    if args.from_file is not None and args.directories:
+        print(f"mkdir: extra operand '{args.directories[0]}'", file=sys.stderr)
+        print("file operands cannot be combined with --from-file", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    if args.jobs is not None and args.from_file is None:
+        print("mkdir: option --jobs requires --from-file", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    jobs = None
+    if args.jobs is not None:
+        try:
+            jobs = int(args.jobs)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            print(f"mkdir: invalid number of jobs: '{args.jobs}'", file=sys.stderr)
+            return 1
+
+    if args.from_file is None and not args.directories:
         print("mkdir: missing operand", file=sys.stderr)
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
         return 1
@@ -270,12 +580,40 @@ Examples:
             print("mkdir: warning: SELinux/SMACK context support not implemented in this port", 
                   file=sys.stderr)
     
+    status = 0
+    if args.from_file is not None:
+        try:
+            with open_files0_from(args.from_file) as source:
+                directories, empty = read_manifest(source)
+        except OSError as e:
+            print(f"mkdir: cannot open '{args.from_file}' for reading: {e.strerror}", file=sys.stderr)
+            return 1
+        if empty:
+            print(f"mkdir: {args.from_file}: {empty} invalid zero-length directory name(s) skipped",
+                  file=sys.stderr)
+            status = 1
+        if jobs is None:
+            # Imported here so that plain mkdir runs don't pay for it.
+            from nproc import effective_cpus
+            jobs = effective_cpus() + 4
+
+    mode, parent_mode = directory_modes(mode, args.parents)
+    if args.from_file is not None:
+        return make_directory_tree(
+            directories,
+            jobs,
+            mode=mode,
+            parents=args.parents,
+            verbose=args.verbose,
+            parent_mode=parent_mode
+        ) or status
     return process_directories(
         args.directories,
         mode=mode,
         parents=args.parents,
         verbose=args.verbose,
-        context=context
+        context=context,
+        parent_mode=parent_mode
     )
 
 
@@ -4,9 +4,19 @@ nproc -- print the number of processors
 Python port of GNU coreutils nproc
 """
 
+import json
+import math
 import os
 import sys
 
+# Where cgroup file systems are mounted and where the kernel lists the
+# cgroups of this process. Both can be overridden for testing purposes.
+CGROUP_ROOT = os.environ.get('_PYCOREUTILS_TEST_CGROUP_ROOT', '/sys/fs/cgroup')
+PROC_SELF_CGROUP = os.environ.get('_PYCOREUTILS_TEST_PROC_CGROUP', '/proc/self/cgroup')
+
+# Root of the sysfs CPU and NUMA node directories used by --topology.
+SYSFS_SYSTEM = os.environ.get('_PYCOREUTILS_TEST_SYSFS_SYSTEM', '/sys/devices/system')
+
 def usage(status):
     program_name = os.path.basename(sys.argv[0])
     if status != 0:
@@ -17,6 +27,11 @@ def usage(status):
               "which may be less than the number of online processors\n\n")
         print("  --all         print the number of installed processors")
         print("  --ignore=N    if possible, exclude N processing units")
+        print("  --no-quota    do not limit the count to the CPU quota of the")
+        print("                  process's cgroup (cpu.max or cpu.cfs_quota_us)")
+        print("  --topology[=FORMAT]  instead of a count, print the NUMA nodes, cores and")
+        print("                  SMT threads, and which CPUs the process may run on;")
+        print("                  FORMAT is 'text' (default) or 'json'")
         print("      --help     display this help and exit")
         print("      --version  output version information and exit\n")
         print("Written by Giuseppe Scrivano.")
@@ -41,28 +56,274 @@ def parse_ignore(optarg):
         usage(1)
 
 
-def num_processors(mode):
+def read_first_line(path):
+    """
+    Return the first line of a small pseudo-file, or None if it can't be read.
+    """
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_dirs(base, path):
+    """
+    Yield the directory of cgroup path under the mount base and of each of its
+    ancestors, since a quota set on any of them limits this process. The
+    mount root itself is always included: inside a container without a
+    cgroup namespace the listed path may not exist in the container's view.
+    """
+    path = path.strip('/')
+    while path:
+        yield os.path.join(base, path)
+        path = path.rpartition('/')[0]
+    yield base
+
+
+def cgroup_v2_limit(base, path):
+    """
+    Return the smallest cpu.max limit (in CPUs) along a cgroup v2 path, or None.
+    """
+    limits = []
+    for directory in cgroup_dirs(base, path):
+        fields = (read_first_line(os.path.join(directory, 'cpu.max')) or '').split()
+        if len(fields) == 2 and fields[0] != 'max':
+            try:
+                quota, period = int(fields[0]), int(fields[1])
+            except ValueError:
+                continue
+            if quota > 0 and period > 0:
+                limits.append(quota / period)
+    return min(limits) if limits else None
+
+
+def cgroup_v1_limit(base, path):
+    """
+    Return the smallest CFS quota (in CPUs) along a cgroup v1 path, or None.
+    """
+    limits = []
+    for directory in cgroup_dirs(base, path):
+        quota = read_first_line(os.path.join(directory, 'cpu.cfs_quota_us'))
+        period = read_first_line(os.path.join(directory, 'cpu.cfs_period_us'))
+        try:
+            quota, period = int(quota), int(period)
+        except (TypeError, ValueError):
+            continue
+        if quota > 0 and period > 0:
+            limits.append(quota / period)
+    return min(limits) if limits else None
+
+
+def cgroup_cpu_limit():
+    """
+    Return the CPU bandwidth limit of this process's cgroup as a (possibly
+    fractional) number of CPUs, or None if there is no limit or no cgroups.
+    Both the unified v2 hierarchy and the v1 'cpu' controller are checked.
+    """
+    try:
+        with open(PROC_SELF_CGROUP) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    limits = []
+    for line in lines:
+        hierarchy, _, rest = line.partition(':')
+        controllers, _, path = rest.partition(':')
+        if hierarchy == '0' and controllers == '':
+            # cgroup v2, either mounted on the root or, on hybrid
+            # systems, below it as 'unified'.
+            base = CGROUP_ROOT
+            if not os.path.exists(os.path.join(base, 'cgroup.controllers')):
+                base = os.path.join(CGROUP_ROOT, 'unified')
+            limit = cgroup_v2_limit(base, path)
+        elif 'cpu' in controllers.split(','):
+            base = os.path.join(CGROUP_ROOT, 'cpu')
+            if not os.path.isdir(base):
+                base = os.path.join(CGROUP_ROOT, controllers)
+            limit = cgroup_v1_limit(base, path)
+        else:
+            continue
+        if limit is not None:
+            limits.append(limit)
+    return min(limits) if limits else None
+
+
+def num_processors(mode, honor_quota=True):
     if mode == 'all':
         try:
             return os.cpu_count() or 1
         except Exception:
             return 1
     else:
+        count = None
         try:
             if hasattr(os, 'sched_getaffinity'):
-                return len(os.sched_getaffinity(0))
+                count = len(os.sched_getaffinity(0))
         except Exception:
             pass
-        try:
-            return os.cpu_count() or 1
-        except Exception:
-            return 1
+        if count is None:
+            try:
+                count = os.cpu_count() or 1
+            except Exception:
+                count = 1
+        if honor_quota:
+            limit = cgroup_cpu_limit()
+            if limit is not None:
+                # A quota of 1.5 CPUs can still keep two threads busy part
+                # of the time, so round up.
+                count = min(count, max(1, math.ceil(limit)))
+        return count
+
+
+def read_sysfs(path):
+    """
+    Read a small sysfs attribute with a single raw read(), or return None.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 65536).decode('ascii', 'replace').strip()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def parse_cpu_list(text):
+    """
+    Parse a kernel CPU list such as '0-3,8,10-11' into a sorted list of ints.
+    """
+    cpus = []
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        if last:
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(first))
+    return sorted(set(cpus))
+
+
+def format_cpu_list(cpus):
+    """
+    Format CPU numbers as a kernel-style list, collapsing runs into ranges.
+    """
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def cpu_topology():
+    """
+    Describe the CPU layout from sysfs. Returns a dict with 'nodes' (node ->
+    CPU list), 'cores' (one entry per physical core with its package, core
+    ID, node and SMT thread CPUs) and 'available' (the affinity mask), or
+    None if sysfs has no CPU information.
+
+    Only one CPU of each core is queried: its sibling list names the other
+    threads, which are then skipped, so the number of reads grows with the
+    number of cores and nodes rather than with the number of threads.
+    """
+    cpu_dir = os.path.join(SYSFS_SYSTEM, 'cpu')
+    online = read_sysfs(os.path.join(cpu_dir, 'online'))
+    if online is None:
+        return None
+    cpus = parse_cpu_list(online)
+
+    nodes = {}
+    node_dir = os.path.join(SYSFS_SYSTEM, 'node')
+    for node in parse_cpu_list(read_sysfs(os.path.join(node_dir, 'online'))):
+        node_cpus = parse_cpu_list(read_sysfs(os.path.join(node_dir, f'node{node}', 'cpulist')))
+        if node_cpus:
+            nodes[node] = node_cpus
+    if not nodes:
+        # Kernel without NUMA support: everything lives on node 0.
+        nodes[0] = cpus
+    node_of = {cpu: node for node, node_cpus in nodes.items() for cpu in node_cpus}
+
+    cores = []
+    seen = set()
+    for cpu in cpus:
+        if cpu in seen:
+            continue
+        topology = os.path.join(cpu_dir, f'cpu{cpu}', 'topology')
+        siblings = read_sysfs(os.path.join(topology, 'core_cpus_list'))
+        if siblings is None:
+            siblings = read_sysfs(os.path.join(topology, 'thread_siblings_list'))
+        threads = [c for c in parse_cpu_list(siblings) if c in cpus] or [cpu]
+        seen.update(threads)
+        package = read_sysfs(os.path.join(topology, 'physical_package_id'))
+        core = read_sysfs(os.path.join(topology, 'core_id'))
+        cores.append({
+            'package': int(package) if package and package.lstrip('-').isdigit() else 0,
+            'core': int(core) if core and core.lstrip('-').isdigit() else cpu,
+            'node': node_of.get(cpu, 0),
+            'cpus': threads,
+        })
+
+    try:
+        available = sorted(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        available = cpus
+    return {'nodes': nodes, 'cores': cores, 'available': available}
+
+
+def print_topology(topology, fmt):
+    """
+    Print the result of cpu_topology() as a text report or as JSON.
+    """
+    available = set(topology['available'])
+    if fmt == 'json':
+        print(json.dumps({
+            'nodes': [{'node': node, 'cpus': cpus,
+                       'available': [c for c in cpus if c in available]}
+                      for node, cpus in sorted(topology['nodes'].items())],
+            'cores': [dict(core, available=[c for c in core['cpus'] if c in available])
+                      for core in topology['cores']],
+            'available': topology['available'],
+        }))
+        return
+
+    cores = topology['cores']
+    threads = sum(len(core['cpus']) for core in cores)
+    print(f"nodes: {len(topology['nodes'])}  packages: {len({c['package'] for c in cores})}  "
+          f"cores: {len(cores)}  threads: {threads}  available: {len(available)}")
+    for node, cpus in sorted(topology['nodes'].items()):
+        usable = [c for c in cpus if c in available]
+        print(f"node {node}: cpus {format_cpu_list(cpus)}  available {format_cpu_list(usable) or '-'}")
+        for core in cores:
+            if core['node'] != node:
+                continue
+            usable = [c for c in core['cpus'] if c in available]
+            print(f"  package {core['package']} core {core['core']}: "
+                  f"threads {format_cpu_list(core['cpus'])}  available {format_cpu_list(usable) or '-'}")
+
+
+def effective_cpus():
+    """
+    Return how many CPUs this process can actually use: the affinity mask
+    limited by any cgroup CPU quota. Use this to size thread and process
+    pools so that containers with a small quota are not oversubscribed.
+    """
+    return num_processors('current')
 
 
 def main():
     args = sys.argv[1:]
     mode = 'current'
     ignore = 0
+    honor_quota = True
+    topology_format = None
 
     i = 0
     while i < len(args):
@@ -79,6 +340,15 @@ def main():
         elif arg == '--all':
             mode = 'all'
             i += 1
+        elif arg == '--no-quota':
+            honor_quota = False
+            i += 1
+        elif arg == '--topology' or arg.startswith('--topology='):
+            topology_format = arg.partition('=')[2] or 'text'
+            if topology_format not in ('text', 'json'):
+                error("invalid topology format", repr(topology_format))
+                usage(1)
+            i += 1
         elif arg.startswith('--ignore='):
             ignore = parse_ignore(arg.split('=', 1)[1])
             i += 1
@@ -97,7 +367,15 @@ def main():
         error("extra operand", repr(args[i]))
         usage(1)
 
-    nproc = num_processors(mode)
+    if topology_format:
+        topology = cpu_topology()
+        if topology is None:
+            error("CPU topology information is not available")
+            return 1
+        print_topology(topology, topology_format)
+        return 0
+
+    nproc = num_processors(mode, honor_quota)
     if ignore < nproc:
         nproc -= ignore
     else:
@@ -0,0 +1,190 @@
+"""
+nsscache - memoized user and group database lookups shared by id and whoami
+Part of the Python port of GNU coreutils
+
+On hosts where passwd and group come from LDAP or SSSD every lookup can be a
+network round trip, and a single 'id' run asks for the same IDs several
+times. The functions here mirror pwd.getpwuid(), pwd.getpwnam(),
+grp.getgrgid() and os.getgrouplist() but remember every answer for the rest
+of the process, including "no such entry" answers (negative caching).
+
+Setting PYCOREUTILS_NSS_CACHE_TTL to a number of seconds also keeps the
+answers in an on-disk cache (see statecache) that later runs reuse for that
+long.
+"""
+
+import atexit
+import grp
+import os
+import pwd
+import socket
+import time
+
+import statecache
+
+CACHE_NAME = 'nss'
+
+# Number of lookups that actually reached the C library in this process.
+nss_calls = 0
+
+_tables = None
+_dirty = False
+
+
+def cache_ttl():
+    """
+    Return the on-disk cache lifetime in seconds, or None if it is disabled.
+    """
+    try:
+        ttl = float(os.environ.get('PYCOREUTILS_NSS_CACHE_TTL', ''))
+    except ValueError:
+        return None
+    return ttl if ttl > 0 else None
+
+
+def _cache_key():
+    try:
+        return f"v1 {socket.gethostname()}"
+    except OSError:
+        return 'v1'
+
+
+def _load_tables():
+    """
+    Return the memo tables, filling them from the on-disk cache on first use.
+    Each table maps a key (as a string, for JSON) to [time, entry or None].
+    """
+    global _tables
+    if _tables is not None:
+        return _tables
+    _tables = {'uid': {}, 'user': {}, 'gid': {}, 'grouplist': {}}
+    ttl = cache_ttl()
+    if ttl is None:
+        return _tables
+    stored = statecache.load(CACHE_NAME, _cache_key())
+    if isinstance(stored, dict):
+        now = time.time()
+        for name, table in _tables.items():
+            for key, item in (stored.get(name) or {}).items():
+                if isinstance(item, list) and len(item) == 2 and 0 <= now - item[0] <= ttl:
+                    table[key] = item
+    atexit.register(_save_tables)
+    return _tables
+
+
+def _save_tables():
+    if _dirty and _tables is not None:
+        statecache.store(CACHE_NAME, _cache_key(), _tables)
+
+
+def _lookup(table_name, key, func, arg):
+    """
+    Return the memoized result of func(arg), calling it only on a miss. The
+    result is stored as a plain list (or None when func raised KeyError) so
+    it can go into the on-disk cache.
+    """
+    global nss_calls, _dirty
+    table = _load_tables()[table_name]
+    item = table.get(key)
+    if item is None:
+        nss_calls += 1
+        try:
+            entry = list(func(arg))
+        except KeyError:
+            entry = None
+        item = table[key] = [time.time(), entry]
+        _dirty = True
+    return item[1]
+
+
+def _remember(table_name, key, entry):
+    """
+    Record an entry learned as a side effect of another lookup, e.g. the
+    passwd entry returned by getpwuid() also answers getpwnam().
+    """
+    global _dirty
+    table = _load_tables()[table_name]
+    if key not in table:
+        table[key] = [time.time(), entry]
+        _dirty = True
+
+
+def load_databases():
+    """
+    Enumerate the passwd and group databases once with pwd.getpwall() and
+    grp.getgrall() and answer every later lookup from that snapshot.
+
+    Group lists come from an inverted index (user name -> GIDs) built in the
+    same single pass over the groups, so looking up N users costs
+    O(users + groups) instead of one getgrouplist() scan of the whole group
+    database per user. Users missing from getpwall() are still looked up
+    individually, but an enumerated user's groups are only those getgrall()
+    lists: memberships a backend does not enumerate (e.g. LDAP or SSSD with
+    enumeration off) are not seen, so callers only do this when asked to.
+    """
+    global nss_calls
+    tables = _load_tables()
+    now = time.time()
+    passwd = pwd.getpwall()
+    groups = grp.getgrall()
+    nss_calls += 2
+
+    gid_table = tables['gid']
+    member_of = {}
+    for group in groups:
+        gid_table.setdefault(str(group.gr_gid), [now, list(group)])
+        for member in group.gr_mem:
+            member_of.setdefault(member, []).append(group.gr_gid)
+
+    uid_table, user_table, grouplist_table = tables['uid'], tables['user'], tables['grouplist']
+    for user in passwd:
+        entry = list(user)
+        name, gid = user.pw_name, user.pw_gid
+        user_table.setdefault(name, [now, entry])
+        uid_table.setdefault(str(user.pw_uid), [now, entry])
+        gids = list(dict.fromkeys([gid] + member_of.get(name, [])))
+        grouplist_table.setdefault(f"{name}:{gid}", [now, gids])
+
+
+def getpwuid(uid):
+    """
+    Like pwd.getpwuid(), memoized. Raises KeyError for an unknown UID.
+    """
+    entry = _lookup('uid', str(uid), pwd.getpwuid, uid)
+    if entry is None:
+        raise KeyError(f"getpwuid(): uid not found: {uid}")
+    _remember('user', entry[0], entry)
+    return pwd.struct_passwd(entry)
+
+
+def getpwnam(name):
+    """
+    Like pwd.getpwnam(), memoized. Raises KeyError for an unknown name.
+    """
+    entry = _lookup('user', name, pwd.getpwnam, name)
+    if entry is None:
+        raise KeyError(f"getpwnam(): name not found: '{name}'")
+    # Not remembered under its UID: with aliases such as toor sharing UID 0,
+    # getpwuid(0) must still answer with the first entry, root.
+    return pwd.struct_passwd(entry)
+
+
+def getgrgid(gid):
+    """
+    Like grp.getgrgid(), memoized. Raises KeyError for an unknown GID.
+    """
+    entry = _lookup('gid', str(gid), grp.getgrgid, gid)
+    if entry is None:
+        raise KeyError(f"getgrgid(): gid not found: {gid}")
+    return grp.struct_group(entry)
+
+
+def getgrouplist(user, group):
+    """
+    Like os.getgrouplist(), memoized per (user, group).
+    """
+    entry = _lookup('grouplist', f"{user}:{group}", lambda args: os.getgrouplist(*args), (user, group))
+    if entry is None:
+        raise KeyError(f"getgrouplist(): no groups for user: '{user}'")
+    return list(entry)
+
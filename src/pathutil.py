@@ -0,0 +1,150 @@
+"""
+pathutil - path component helpers shared by basename and dirname
+Part of the Python port of GNU coreutils
+"""
+
+import os
+import sys
+
+# Path separators recognised by the kernel below. Windows accepts both
+# slashes and drive prefixes; elsewhere they are ordinary name characters.
+HAS_DRIVES = os.name == 'nt'
+SEPARATORS = '/\\' if HAS_DRIVES else '/'
+SEPARATORS_BYTES = SEPARATORS.encode()
+
+# Names are read in blocks of this many bytes in bulk mode.
+BLOCK_SIZE = 1 << 16
+
+def has_drive(path):
+    """
+    Check if path starts with a drive letter such as "C:".
+    """
+    return len(path) >= 2 and path[1:2] in (':', b':')
+
+def strip_trailing_slashes(path):
+    """
+    Strip trailing slashes from path, but preserve root indicators.
+    Works on both str and bytes.
+    """
+    stripped = path.rstrip(SEPARATORS_BYTES if isinstance(path, bytes) else SEPARATORS)
+    if not stripped:
+        # Nothing but separators: keep a single one as the root.
+        return path[:1]
+    if HAS_DRIVES and len(stripped) == 2 and len(path) > 2 and has_drive(stripped):
+        # Keep the root of a drive such as "C:\\".
+        return path[:3]
+
+    return stripped
+
+def last_separator(path):
+    """
+    Return the index of the last path separator in path, or -1 if there is none.
+    """
+    seps = SEPARATORS_BYTES if isinstance(path, bytes) else SEPARATORS
+    if len(seps) == 1:
+        return path.rfind(seps)
+    return max(path.rfind(seps[i:i + 1]) for i in range(len(seps)))
+
+def base_name(path):
+    """
+    Extract the base name from a path, similar to C basename().
+    Accepts str or bytes and returns the same type. Only slicing is used, so
+    bytes names that are not valid UTF-8 pass through unchanged.
+    """
+    if not HAS_DRIVES and path:
+        # Fast path for the common case: one separator, no trailing slash.
+        sep = b'/' if isinstance(path, bytes) else '/'
+        if not path.endswith(sep):
+            return path[path.rfind(sep) + 1:]
+    if not path:
+        return b'.' if isinstance(path, bytes) else '.'
+    if path in ('//', b'//'):
+        return path
+    
+    path = strip_trailing_slashes(path)
+
+    if len(path) == 1 or (len(path) == 2 and has_drive(path)):
+        return path
+    
+    start = last_separator(path)
+    if start == len(path) - 1:
+        # A drive root such as "C:\\".
+        return path
+    if start < 0 and HAS_DRIVES and has_drive(path):
+        start = 1
+    return path[start + 1:]
+
+def dir_name(path):
+    """
+    Return path with its last non-slash component and trailing slashes removed,
+    similar to C dirname(). A path without separators yields ".".
+    Accepts str or bytes and returns the same type, using only slicing.
+    """
+    dot = b'.' if isinstance(path, bytes) else '.'
+    if not HAS_DRIVES and path:
+        # Fast path for the common case: one separator, no trailing slash and
+        # a single slash before the last component.
+        sep = b'/' if isinstance(path, bytes) else '/'
+        if not path.endswith(sep):
+            end = path.rfind(sep)
+            if end < 0:
+                return dot
+            if end == 0:
+                return path[:1]
+            if path[end - 1:end] != sep:
+                return path[:end]
+
+    seps = SEPARATORS_BYTES if isinstance(path, bytes) else SEPARATORS
+    stripped = path.rstrip(seps)
+    if not stripped:
+        # Empty, or nothing but separators.
+        return path[:1] or dot
+
+    end = last_separator(stripped)
+    if end < 0:
+        if HAS_DRIVES and has_drive(stripped):
+            return stripped[:2]
+        return dot
+
+    head = stripped[:end].rstrip(seps)
+    if not head:
+        return stripped[:1]
+    if HAS_DRIVES and len(head) == 2 and has_drive(head):
+        # Keep the root of a drive such as "C:\\".
+        return stripped[:3]
+    return head
+
+def write_names(batches, func, use_nuls, out):
+    """
+    Apply func to every name in an iterable of name batches (lists of bytes)
+    and write the results to the binary stream out, one write per batch.
+    """
+    end = b'\0' if use_nuls else b'\n'
+    for names in batches:
+        out.write(end.join(map(func, names)) + end)
+
+def read_names0(stream, block_size=BLOCK_SIZE):
+    """
+    Read NUL-terminated names from a binary stream, yielding them in
+    lists of one block's worth so callers can process whole batches at once.
+    A final name without a terminating NUL is still returned.
+    """
+    pending = b''
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        names = (pending + block).split(b'\0') if pending else block.split(b'\0')
+        pending = names.pop()
+        if names:
+            yield names
+    if pending:
+        yield [pending]
+
+def open_files0_from(filename):
+    """
+    Open the --files0-from source for binary reading; '-' means standard input.
+    """
+    if filename == '-':
+        return sys.stdin.buffer
+    return open(filename, 'rb')
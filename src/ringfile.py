@@ -0,0 +1,156 @@
+"""
+ringfile - fixed-size binary records in a preallocated, memory-mapped ring
+Part of the Python port of GNU coreutils
+
+A ring file is a 32-byte header followed by a fixed number of slots, each
+holding one record of a fixed size. The header holds a magic string, the
+slot size, the number of slots and the number of records ever appended;
+record n lives in slot n % slots and starts with n as a 64-bit sequence
+number. The file is allocated in full when it is created, so appending a
+record is one struct.pack_into() into the mapping plus an update of the
+counter: no write(), no flush and no growth of the file. The kernel writes
+the dirty pages back on its own schedule.
+
+A new ring is built under a temporary name and renamed into place once its
+header is written, so no reader ever maps a file without one. There is one
+writer at a time. Readers map the file read-only and may run
+while it is being written; a slot whose sequence number is not the one
+expected (because the writer has lapped the reader) is skipped.
+"""
+
+import errno
+import mmap
+import os
+import struct
+
+MAGIC = b'PYRING01'
+
+# magic, slot size, number of slots, records appended so far
+_HEADER = struct.Struct('<8sIIQ8x')
+_COUNT = struct.Struct('<Q')
+_COUNT_OFFSET = 16
+
+
+class RingFile:
+    """
+    A ring file of records packed (little-endian, unaligned) with the
+    struct.Struct record. Opens an existing ring read-only, or with
+    create=True for appending, creating a ring of slots records first if
+    path does not exist yet (an existing ring keeps its own number of
+    slots). Raises OSError if the file cannot be opened and ValueError if
+    it is not a ring of such records. Use as a context manager; the
+    mapping is released on exit.
+    """
+
+    def __init__(self, path, record, create=False, slots=None):
+        self._slot = struct.Struct('<Q' + record.format.lstrip('<>=!@'))
+        self._mmap = None
+        writable = create
+        if create:
+            try:
+                fd = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+            except FileNotFoundError:
+                fd = self._create(path, slots)
+            else:
+                if os.fstat(fd).st_size == 0:
+                    os.close(fd)
+                    fd = self._create(path, slots)
+        else:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            size = os.fstat(fd).st_size
+            if size < _HEADER.size:
+                raise ValueError("not a ring file")
+            self._mmap = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        magic, slot_size, self.slots, _ = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("not a ring file")
+        if slot_size != self._slot.size or size < _HEADER.size + self.slots * slot_size or not self.slots:
+            self.close()
+            raise ValueError("ring file holds records of another format")
+
+    def _create(self, path, slots):
+        """
+        Create a ring of slots records at path, replacing an empty file
+        there, and return a descriptor open on it.
+        """
+        directory, name = os.path.split(path)
+        tmp = os.path.join(directory, f'.{name}.{os.getpid()}.{os.urandom(4).hex()}')
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o644)
+        try:
+            self._initialize(fd, slots)
+            os.replace(tmp, path)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp)
+            raise
+        return fd
+
+    def _initialize(self, fd, slots):
+        size = _HEADER.size + slots * self._slot.size
+        allocated = False
+        if hasattr(os, 'posix_fallocate'):
+            # Reserve the blocks now: running out of space later would
+            # surface as SIGBUS on a store into the mapping.
+            try:
+                os.posix_fallocate(fd, 0, size)
+                allocated = True
+            except OSError as e:
+                # Some filesystems (NFS, FUSE, ...) cannot preallocate; a
+                # sparse file still works there.
+                if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+        if not allocated:
+            os.ftruncate(fd, size)
+        os.pwrite(fd, _HEADER.pack(MAGIC, self._slot.size, slots, 0), 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        """Number of records held (at most slots)."""
+        return min(self.appended(), self.slots)
+
+    def appended(self):
+        """Number of records ever appended."""
+        return _COUNT.unpack_from(self._mmap, _COUNT_OFFSET)[0]
+
+    def append(self, *values):
+        """Store a record in the next slot, overwriting the oldest one."""
+        n = self.appended()
+        self._slot.pack_into(self._mmap, _HEADER.size + (n % self.slots) * self._slot.size, n, *values)
+        _COUNT.pack_into(self._mmap, _COUNT_OFFSET, n + 1)
+
+    def records(self):
+        """Return the records held, oldest first, as a list of lists of values."""
+        end = self.appended()
+        start = max(end - self.slots, 0)
+        size = self._slot.size
+        first = _HEADER.size + (start % self.slots) * size
+        if start:
+            # The oldest records run to the end of the file, the newer ones
+            # wrap around to the first slot.
+            spans = [(first, _HEADER.size + self.slots * size), (_HEADER.size, first)]
+        else:
+            spans = [(first, first + end * size)]
+        result = []
+        expected = start
+        with memoryview(self._mmap) as view:
+            for begin, stop in spans:
+                with view[begin:stop] as segment:
+                    for seq, *values in self._slot.iter_unpack(segment):
+                        if seq == expected:
+                            result.append(values)
+                        expected += 1
+        return result
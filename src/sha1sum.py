@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+sha1sum - compute and check SHA1 message digest
+Python port of GNU coreutils sha1sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('sha1sum'))
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+sha224sum - compute and check SHA224 message digest
+Python port of GNU coreutils sha224sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('sha224sum'))
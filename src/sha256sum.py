@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+sha256sum - compute and check SHA256 message digest
+Python port of GNU coreutils sha256sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('sha256sum'))
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+sha384sum - compute and check SHA384 message digest
+Python port of GNU coreutils sha384sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('sha384sum'))
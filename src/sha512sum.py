@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+sha512sum - compute and check SHA512 message digest
+Python port of GNU coreutils sha512sum
+"""
+
+import sys
+
+from hashsum import main
+
+if __name__ == '__main__':
+    sys.exit(main('sha512sum'))
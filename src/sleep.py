@@ -7,7 +7,16 @@ Python port of GNU coreutils sleep
 import sys
 import os
 import time
-import argparse
+
+# Clocks that --every can align its wakeups to.
+CLOCKS = {
+    'realtime': time.time,
+    'monotonic': time.monotonic,
+}
+
+# While waiting for a wall-clock deadline, look at the clock again at least
+# this often (in seconds) so that clock steps and suspend are noticed.
+REALTIME_RECHECK = 1.0
 
 def parse_time_interval(arg):
     """
@@ -44,13 +53,138 @@ def parse_time_interval(arg):
     else:
         return None
 
+def parse_deadline(arg, now=None):
+    """
+    Parse an --until TIME argument and return it as a Unix timestamp, or None
+    if invalid. A bare HH:MM[:SS] means the next time the clock shows that
+    time; anything else goes through the date parser (including @SECONDS).
+    """
+    # Imported here so that importers of parse_time_interval don't pay for it.
+    from datetime import datetime, timedelta
+    if now is None:
+        now = time.time()
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            time_of_day = datetime.strptime(arg, fmt).time()
+        except ValueError:
+            continue
+        deadline = datetime.combine(datetime.fromtimestamp(now).date(), time_of_day)
+        if deadline.timestamp() <= now:
+            deadline += timedelta(days=1)
+        return deadline.timestamp()
+
+    # Imported here so that plain interval sleeps don't pay for it.
+    from date import parse_date_string
+    dt = parse_date_string(arg)
+    if dt is None:
+        return None
+    return dt.timestamp()
+
+def sleep_until(deadline, clock=time.time):
+    """
+    Sleep until clock() reaches deadline. The remaining time is recomputed
+    from the clock after every wakeup, so an early return (signal, wall
+    clock stepped back) never ends the wait and errors don't accumulate.
+    """
+    recheck = REALTIME_RECHECK if clock is time.time else None
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        if recheck is not None and remaining > recheck:
+            remaining = recheck
+        time.sleep(remaining)
+
+def next_boundary(now, interval):
+    """
+    Return the index of the first multiple of interval strictly after now.
+    """
+    return int(now // interval) + 1
+
+def sleep_every(interval, clock=time.time, until=None, out=None):
+    """
+    Wake on every multiple of interval on the given clock and write the
+    wall-clock time of each boundary to out, one line per tick, until the
+    wall-clock deadline until (if any) is passed.
+
+    Each boundary is computed as index * interval rather than from the time
+    the process woke up, so neither wakeup latency nor floating-point error
+    accumulates. If a tick is handled so late that the next boundary has
+    passed, the missed ticks are skipped and the schedule resynchronizes.
+    """
+    if out is None:
+        out = sys.stdout
+    # Offset that converts a reading of clock into wall-clock time, rounded
+    # to the microseconds printed so that it does not shift every tick.
+    if clock is time.time:
+        wall_offset = 0.0
+    else:
+        before = clock()
+        wall = time.time()
+        wall_offset = round(wall - (before + clock()) / 2, 6)
+    end = None if until is None else until - wall_offset
+
+    index = next_boundary(clock(), interval)
+    while end is None or index * interval <= end:
+        tick = index * interval
+        sleep_until(tick, clock)
+        out.write(f"{tick + wall_offset:.6f}\n")
+        out.flush()
+        index += 1
+        now = clock()
+        if index * interval <= now:
+            index = next_boundary(now, interval)
+
+def sleep_schedule(prog, args):
+    """
+    Handle --until and --every.
+    """
+    if args.times:
+        print(f"{prog}: extra operand '{args.times[0]}'", file=sys.stderr)
+        print(f"Try '{prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    deadline = None
+    if args.until is not None:
+        deadline = parse_deadline(args.until)
+        if deadline is None:
+            print(f"{prog}: invalid time '{args.until}'", file=sys.stderr)
+            return 1
+
+    try:
+        if args.every is None:
+            sleep_until(deadline)
+            return 0
+
+        interval = parse_time_interval(args.every)
+        if interval is None or not interval > 0:
+            print(f"{prog}: invalid time interval '{args.every}'", file=sys.stderr)
+            return 1
+        sleep_every(interval, CLOCKS[args.clock], deadline)
+    except BrokenPipeError:
+        # The reader of the ticks went away; that is the normal way to stop.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"{prog}: cannot sleep: {e}", file=sys.stderr)
+        return 1
+    return 0
+
 def main():
+    import argparse
     parser = argparse.ArgumentParser(
         prog='sleep',
         description='Pause for NUMBER seconds. SUFFIX may be s, m, h, or d. With multiple arguments, sum their values.',
         add_help=False
     )
     parser.add_argument('times', nargs='*', help='NUMBER[SUFFIX]...')
+    parser.add_argument('--until', metavar='TIME',
+                        help='pause until TIME instead of for an interval')
+    parser.add_argument('--every', metavar='INTERVAL',
+                        help='wake on every multiple of INTERVAL and print its time')
+    parser.add_argument('--clock', choices=sorted(CLOCKS), default='realtime',
+                        help='clock that --every aligns to')
     parser.add_argument('--help', action='store_true', help='display this help and exit')
     parser.add_argument('--version', action='store_true', help='output version information and exit')
 
@@ -58,12 +192,22 @@ def main():
 
     if args.help:
         print(f"Usage: {parser.prog} NUMBER[SUFFIX]...")
+        print(f"  or:  {parser.prog} --until=TIME")
+        print(f"  or:  {parser.prog} --every=INTERVAL [--clock=CLOCK] [--until=TIME]")
         print(f"  or:  {parser.prog} OPTION")
         print()
         print("Pause for NUMBER seconds, where NUMBER is an integer or floating-point.")
         print("SUFFIX may be 's','m','h', or 'd', for seconds, minutes, hours, days.")
         print("With multiple arguments, pause for the sum of their values.")
         print()
+        print("      --until=TIME      pause until the wall clock reaches TIME, given as")
+        print("                          HH:MM[:SS] (next occurrence), @SECONDS, or a")
+        print("                          date string as accepted by date -d")
+        print("      --every=INTERVAL  wake on every multiple of INTERVAL and print the")
+        print("                          time of each wakeup as seconds since the Epoch;")
+        print("                          runs until killed or until --until TIME")
+        print("      --clock=CLOCK     align --every to CLOCK: 'realtime' (default,")
+        print("                          wall-clock boundaries) or 'monotonic'")
         print("      --help     display this help and exit")
         print("      --version  output version information and exit")
         return 0
@@ -75,6 +219,9 @@ def main():
         print("Written by Junaid Rahman.")
         return 0
 
+    if args.until is not None or args.every is not None:
+        return sleep_schedule(parser.prog, args)
+
     if not args.times:
         print(f"{parser.prog}: missing operand", file=sys.stderr)
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
@@ -0,0 +1,64 @@
+"""
+statecache - small persistent cache files shared by several tools
+Part of the Python port of GNU coreutils
+
+Each cache is one JSON file under $XDG_CACHE_HOME/py-coreutils (or
+~/.cache/py-coreutils) holding a key, the time it was written and a value.
+A cached value is only returned if it was stored under the same key, so
+callers fold whatever invalidates the data (host name, boot ID, ...) into
+the key. The cache is best effort: any error reading or writing it behaves
+like a miss.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+
+def cache_dir():
+    """
+    Return the directory that holds the cache files.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'py-coreutils')
+
+
+def load(name, key, max_age=None):
+    """
+    Return the value stored in cache file name under key, or None if there is
+    none, it was stored under a different key, or it is older than max_age
+    seconds.
+    """
+    try:
+        with open(os.path.join(cache_dir(), name)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('key') != key:
+        return None
+    if max_age is not None:
+        age = time.time() - data.get('time', 0)
+        if not 0 <= age <= max_age:
+            return None
+    return data.get('value')
+
+
+def store(name, key, value):
+    """
+    Store a JSON-serializable value in cache file name under key. The file is
+    replaced atomically so concurrent readers never see a partial write.
+    """
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{name}.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'key': key, 'time': time.time(), 'value': value}, f)
+            os.replace(tmp, os.path.join(directory, name))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except (OSError, TypeError, ValueError):
+        pass
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+timeout - run a command with a time limit
+Python port of GNU coreutils timeout
+
+The command is started with os.posix_spawnp and waited for with select()
+on a pidfd (Linux 5.3 and later) or, elsewhere, on a pipe that a SIGCHLD
+handler writes to. Either way the wait costs no CPU and ends within
+microseconds of the command exiting or the deadline passing. Signals that
+timeout itself receives arrive on the same pipe (signal.set_wakeup_fd), so
+they are forwarded to the command at once.
+
+Only modules that the interpreter has loaded anyway are imported on the
+way to starting the command; option parsing is done by hand rather than
+with argparse for the same reason.
+"""
+
+import errno
+import os
+import select
+import signal
+import sys
+import time
+
+from kill import SIGNAL_NAMES, parse_signal
+from sleep import parse_time_interval
+
+EXIT_TIMEDOUT = 124
+EXIT_CANCELED = 125
+EXIT_CANNOT_INVOKE = 126
+EXIT_ENOENT = 127
+
+# Signals that timeout passes on to the command.
+FORWARDED_SIGNALS = ('SIGHUP', 'SIGINT', 'SIGQUIT', 'SIGTERM', 'SIGUSR1', 'SIGUSR2', 'SIGALRM')
+
+
+def usage(status):
+    if status != 0:
+        print("Try 'timeout --help' for more information.", file=sys.stderr)
+    else:
+        print("Usage: timeout [OPTION] DURATION COMMAND [ARG]...")
+        print("  or:  timeout [OPTION]")
+        print("Start COMMAND, and kill it if still running after DURATION.\n")
+        print("Mandatory arguments to long options are mandatory for short options too.")
+        print("      --preserve-status")
+        print("                 exit with the same status as COMMAND, even when the")
+        print("                   command times out")
+        print("      --foreground")
+        print("                 when not running timeout directly from a shell prompt,")
+        print("                   allow COMMAND to read from the TTY and get TTY signals;")
+        print("                   in this mode, children of COMMAND will not be timed out")
+        print("  -k, --kill-after=DURATION")
+        print("                 also send a KILL signal if COMMAND is still running")
+        print("                   this long after the initial signal was sent")
+        print("  -s, --signal=SIGNAL")
+        print("                 specify the signal to be sent on timeout;")
+        print("                   SIGNAL may be a name like 'HUP' or a number;")
+        print("                   see 'kill -l' for a list of signals")
+        print("  -v, --verbose  diagnose to stderr any signal sent upon timeout")
+        print("      --help     display this help and exit")
+        print("      --version  output version information and exit\n")
+        print("DURATION is a floating point number with an optional suffix:")
+        print("'s' for seconds (the default), 'm' for minutes, 'h' for hours or 'd' for days.")
+        print("A duration of 0 disables the associated timeout.\n")
+        print("Upon timeout, send the TERM signal to COMMAND, if no other SIGNAL specified.")
+        print("The TERM signal kills any process that does not block or catch that signal.")
+        print("It may be necessary to use the KILL signal, since this signal can't be caught.\n")
+        print("Exit status:")
+        print("  124  if COMMAND times out, and --preserve-status is not specified")
+        print("  125  if the timeout command itself fails")
+        print("  126  if COMMAND is found but cannot be invoked")
+        print("  127  if COMMAND cannot be found")
+        print("  137  if COMMAND (or timeout itself) is sent the KILL signal (128+9)")
+        print("  -    the exit status of COMMAND otherwise")
+    return status
+
+
+def error(msg):
+    print(f"timeout: {msg}", file=sys.stderr)
+
+
+def signal_name(signum):
+    name = SIGNAL_NAMES.get(signum)
+    return name[3:] if name else str(signum)
+
+
+class Monitor:
+    """
+    Runs one command and enforces its time limit.
+    """
+
+    def __init__(self, argv, signum=signal.SIGTERM, kill_after=0.0, foreground=False, verbose=False):
+        self.argv = argv
+        self.signum = signum
+        self.kill_after = kill_after
+        self.foreground = foreground
+        self.verbose = verbose
+        self.pid = None
+        self.timed_out = False
+        self.kill_deadline = None
+        self._pidfd = None
+        self._wakeup_r = self._wakeup_w = None
+
+    def start(self):
+        """
+        Start the command. Raises OSError (FileNotFoundError, ...) if it
+        cannot be run.
+        """
+        if not self.foreground:
+            # Put timeout and the command in a process group of their own,
+            # so that the signal reaches the command's children too.
+            try:
+                os.setpgid(0, 0)
+            except OSError:
+                pass
+        self._wakeup_r, self._wakeup_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        signal.set_wakeup_fd(self._wakeup_w, warn_on_full_buffer=False)
+        for name in FORWARDED_SIGNALS:
+            signal.signal(getattr(signal, name), self._forward)
+        if not hasattr(os, 'pidfd_open'):
+            signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        # A background timeout must not stop on terminal I/O; the command
+        # gets the default actions back, as well as those of the signals
+        # Python ignores (SIGPIPE, SIGXFSZ).
+        if not self.foreground:
+            signal.signal(signal.SIGTTIN, signal.SIG_IGN)
+            signal.signal(signal.SIGTTOU, signal.SIG_IGN)
+        defaults = [signal.SIGTTIN, signal.SIGTTOU, signal.SIGPIPE]
+        if hasattr(signal, 'SIGXFSZ'):
+            defaults.append(signal.SIGXFSZ)
+        self.pid = os.posix_spawnp(self.argv[0], self.argv, os.environ, setsigdef=defaults,
+                                   setsigmask=())
+        if hasattr(os, 'pidfd_open'):
+            try:
+                self._pidfd = os.pidfd_open(self.pid)
+            except OSError:
+                signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    def _forward(self, signum, frame):
+        self.send(signum)
+        if self.kill_after and self.kill_deadline is None:
+            self.kill_deadline = time.monotonic() + self.kill_after
+
+    def send(self, signum):
+        """Send signum to the command (and its process group)."""
+        os.kill(self.pid, signum)
+        if not self.foreground:
+            # The group includes timeout itself, which ignores the signal
+            # from now on; SIGKILL ends timeout too, which is what the
+            # caller then sees (status 137).
+            if signum != signal.SIGKILL:
+                signal.signal(signum, signal.SIG_IGN)
+            os.killpg(0, signum)
+            if signum not in (signal.SIGKILL, signal.SIGCONT):
+                # Let stopped processes act on the signal.
+                os.kill(self.pid, signal.SIGCONT)
+                os.killpg(0, signal.SIGCONT)
+
+    def wait(self, deadline=None):
+        """
+        Wait until the command exits, or until time.monotonic() reaches
+        deadline (or kill_deadline, if set by a forwarded signal). Returns
+        the wait status, or None at the deadline.
+        """
+        ready = [self._wakeup_r] if self._pidfd is None else [self._pidfd, self._wakeup_r]
+        while True:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid:
+                return status
+            deadlines = [d for d in (deadline, self.kill_deadline) if d is not None]
+            timeout = None
+            if deadlines:
+                timeout = min(deadlines) - time.monotonic()
+                if timeout <= 0:
+                    if self.kill_deadline is not None and self.kill_deadline <= time.monotonic():
+                        self.kill_deadline = None
+                        self._kill()
+                        continue
+                    return None
+            # select() takes its timeout in seconds (poll() would want milliseconds).
+            if self._wakeup_r in select.select(ready, [], [], timeout)[0]:
+                try:
+                    while os.read(self._wakeup_r, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+
+    def _kill(self):
+        if self.verbose:
+            print(f"timeout: sending signal KILL to command '{self.argv[0]}'", file=sys.stderr, flush=True)
+        self.send(signal.SIGKILL)
+
+    def run(self, duration):
+        """Run the command, and return its wait status."""
+        self.start()
+        status = self.wait(time.monotonic() + duration if duration > 0 else None)
+        if status is None:
+            self.timed_out = True
+            if self.verbose:
+                print(f"timeout: sending signal {signal_name(self.signum)} to command '{self.argv[0]}'",
+                      file=sys.stderr, flush=True)
+            self.send(self.signum)
+            if self.kill_after and self.kill_deadline is None:
+                self.kill_deadline = time.monotonic() + self.kill_after
+            status = self.wait()
+        return status
+
+
+def exit_status(monitor, status, preserve_status):
+    """
+    Turn the command's wait status into timeout's exit status, like GNU
+    timeout.
+    """
+    if os.WIFSIGNALED(status):
+        signum = os.WTERMSIG(status)
+        if getattr(os, 'WCOREDUMP', lambda s: False)(status):
+            error("the monitored command dumped core")
+        if not monitor.timed_out:
+            # Die of the same signal, so the caller sees what the command
+            # did; without a core dump of timeout itself.
+            try:
+                import resource
+                resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+                signal.signal(signum, signal.SIG_DFL)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, [signum])
+                os.kill(os.getpid(), signum)
+            except (ImportError, OSError, ValueError):
+                pass
+        if monitor.timed_out and signum == signal.SIGKILL:
+            preserve_status = True
+        result = 128 + signum
+    else:
+        result = os.waitstatus_to_exitcode(status)
+    if monitor.timed_out and not preserve_status:
+        return EXIT_TIMEDOUT
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    signum = signal.SIGTERM
+    kill_after = 0.0
+    preserve_status = foreground = verbose = False
+
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '--':
+            i += 1
+            break
+        if not arg.startswith('-') or arg == '-':
+            break
+        name, has_value, value = arg.partition('=')
+        if arg.startswith('--'):
+            long_options = ('--signal', '--kill-after', '--preserve-status', '--foreground',
+                            '--verbose', '--help', '--version')
+            matches = [option for option in long_options if option.startswith(name)]
+            if name in long_options:
+                matches = [name]
+            if len(matches) != 1:
+                kind = 'ambiguous' if matches else 'unrecognized'
+                error(f"{kind} option '{arg}'")
+                return usage(EXIT_CANCELED)
+            name = matches[0]
+            if name in ('--signal', '--kill-after'):
+                if not has_value:
+                    if i + 1 >= len(args):
+                        error(f"option '{name}' requires an argument")
+                        return usage(EXIT_CANCELED)
+                    i += 1
+                    value = args[i]
+                option = name[1:3]
+            else:
+                option = name
+        else:
+            option = arg[:2]
+            if option in ('-s', '-k'):
+                value = arg[2:]
+                if not value:
+                    if i + 1 >= len(args):
+                        error(f"option requires an argument -- '{option[1]}'")
+                        return usage(EXIT_CANCELED)
+                    i += 1
+                    value = args[i]
+            elif arg == '-v':
+                option = '--verbose'
+            else:
+                error(f"invalid option -- '{arg[1]}'")
+                return usage(EXIT_CANCELED)
+        i += 1
+
+        if option == '--help':
+            return usage(0)
+        if option == '--version':
+            print("timeout (Python port of GNU coreutils) 1.0")
+            print("This is free software: you are free to change and redistribute it.")
+            print("There is NO WARRANTY, to the extent permitted by law.")
+            print("\nWritten by Junaid Rahman.")
+            return 0
+        if option == '-s':
+            signum = parse_signal(value)
+            if signum is None or signum not in SIGNAL_NAMES:
+                error(f"{value}: invalid signal")
+                return usage(EXIT_CANCELED)
+        elif option == '-k':
+            kill_after = parse_time_interval(value)
+            if kill_after is None or kill_after < 0:
+                error(f"invalid time interval '{value}'")
+                return usage(EXIT_CANCELED)
+        elif option == '--preserve-status':
+            preserve_status = True
+        elif option == '--foreground':
+            foreground = True
+        elif option == '--verbose':
+            verbose = True
+
+    if len(args) - i < 2:
+        error("missing operand" if len(args) == i else f"missing operand after '{args[i]}'")
+        return usage(EXIT_CANCELED)
+    duration = parse_time_interval(args[i])
+    if duration is None or duration < 0:
+        error(f"invalid time interval '{args[i]}'")
+        return usage(EXIT_CANCELED)
+
+    monitor = Monitor(args[i + 1:], signum, kill_after, foreground, verbose)
+    try:
+        status = monitor.run(duration)
+    except OSError as e:
+        if monitor.pid is not None:
+            error(str(e))
+            return EXIT_CANCELED
+        error(f"failed to run command '{args[i + 1]}': {e.strerror}")
+        return EXIT_ENOENT if e.errno == errno.ENOENT else EXIT_CANNOT_INVOKE
+    return exit_status(monitor, status, preserve_status)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
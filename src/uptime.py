@@ -5,43 +5,35 @@ Python port of GNU coreutils uptime
 """
 
 import argparse
+import math
 import os
-import re
 import struct
-import subprocess
 import sys
 import time
-from datetime import datetime
 
-# --- Constants and helpers from users.py for user counting ---
-DEFAULT_UTMP_FILE = '/var/run/utmp'
-USER_PROCESS = 7
-UTMP_STRUCT_FORMAT = 'hi32s4s32s256shhiii4i20x'
-UTMP_STRUCT_SIZE = struct.calcsize(UTMP_STRUCT_FORMAT)
+import ringfile
+import utmp
+from utmp import DEFAULT_UTMP_FILE
+
+PROC_UPTIME = '/proc/uptime'
+PROC_LOADAVG = '/proc/loadavg'
 
 
 def get_user_count_unix(filename):
     """Reads a utmp-like file and counts active user sessions."""
-    count = 0
     try:
-        with open(filename, 'rb') as f:
-            while True:
-                record = f.read(UTMP_STRUCT_SIZE)
-                if not record or len(record) < UTMP_STRUCT_SIZE:
-                    break
-                unpacked_record = struct.unpack(UTMP_STRUCT_FORMAT, record)
-                if unpacked_record[0] == USER_PROCESS:
-                    username = unpacked_record[4].split(b'\0', 1)[0]
-                    if username:
-                        count += 1
-    except (FileNotFoundError, PermissionError, IOError):
+        with utmp.UtmpFile(filename) as f:
+            return f.count_users()
+    except OSError:
         # Errors are handled gracefully, returning 0 users
-        pass
-    return count
+        return 0
 
 
 def get_user_count_windows():
     """Gets user count on Windows by parsing 'query user' output."""
+    # Imported here so that uptime runs on Linux don't pay for them.
+    import re
+    import subprocess
     try:
         result = subprocess.run(['query', 'user'], capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
         # Count non-header lines that contain a username
@@ -60,7 +52,14 @@ def get_user_count(filename):
 
 
 def get_boot_time():
-    """Returns the system boot time as a Unix timestamp."""
+    """
+    Returns the system boot time as a Unix timestamp. On Linux this scans
+    /proc/stat; Sampler reads /proc/uptime instead and only falls back to
+    this when that cannot be opened.
+    """
+    # Imported here so that uptime runs on Linux don't pay for them.
+    import re
+    import subprocess
     if sys.platform.startswith('linux'):
         try:
             # Allow overriding the path for testing purposes
@@ -80,6 +79,7 @@ def get_boot_time():
         except (FileNotFoundError, subprocess.CalledProcessError, IndexError, ValueError):
             return None
     elif sys.platform == 'win32':
+        from datetime import datetime
         try:
             result = subprocess.run(['wmic', 'os', 'get', 'lastbootuptime'], capture_output=True, text=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
             boottime_str = result.stdout.strip().split('\n')[1].split('.')[0]
@@ -90,6 +90,207 @@ def get_boot_time():
     return None
 
 
+def _open_proc_file(path):
+    try:
+        return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+
+
+class Sampler:
+    """
+    Source of the uptime and the load averages. On Linux /proc/uptime and
+    /proc/loadavg are opened once and every sample is a single pread() of
+    each, so a process that keeps a Sampler pays no open(), parsing of
+    /proc/stat or fork per sample. Elsewhere the boot time is looked up
+    once and the load averages come from os.getloadavg().
+    """
+
+    def __init__(self):
+        self._uptime_fd = self._loadavg_fd = None
+        if sys.platform.startswith('linux'):
+            # Allow overriding the paths for testing purposes
+            self._uptime_fd = _open_proc_file(os.environ.get('_PYCOREUTILS_TEST_PROC_UPTIME', PROC_UPTIME))
+            self._loadavg_fd = _open_proc_file(os.environ.get('_PYCOREUTILS_TEST_PROC_LOADAVG', PROC_LOADAVG))
+        self._boot_time = get_boot_time() if self._uptime_fd is None else None
+        # Allow overriding load average for testing
+        self._fake_load = os.environ.get('_PYCOREUTILS_TEST_LOAD_AVG')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for fd in (self._uptime_fd, self._loadavg_fd):
+            if fd is not None:
+                os.close(fd)
+        self._uptime_fd = self._loadavg_fd = None
+
+    def uptime(self):
+        """Seconds since boot, or None if unknown."""
+        if self._uptime_fd is not None:
+            try:
+                return float(os.pread(self._uptime_fd, 64, 0).split(None, 1)[0])
+            except (OSError, IndexError, ValueError):
+                return None
+        if self._boot_time is None:
+            return None
+        return time.time() - self._boot_time
+
+    def loadavg(self):
+        """The 1, 5 and 15 minute load averages, or None if unavailable."""
+        if self._fake_load:
+            return [float(x) for x in self._fake_load.split(',')]
+        if self._loadavg_fd is not None:
+            try:
+                return [float(x) for x in os.pread(self._loadavg_fd, 128, 0).split(None, 3)[:3]]
+            except (OSError, ValueError):
+                return None
+        if hasattr(os, 'getloadavg'):
+            try:
+                return os.getloadavg()
+            except OSError:
+                pass
+        return None
+
+
+def format_uptime(uptime_seconds, user_count, load=None):
+    """Returns the uptime line for the given uptime, user count and load averages."""
+    current_time_str = time.strftime('%H:%M:%S')
+
+    uptime_str = "up ??:??"
+    if uptime_seconds is not None:
+        uptime_seconds = int(uptime_seconds)
+        if uptime_seconds >= 0:
+            up_days = uptime_seconds // 86400
+            up_hours = (uptime_seconds % 86400) // 3600
+            up_mins = (uptime_seconds % 3600) // 60
+            if up_days > 0:
+                day_str = "day" if up_days == 1 else "days"
+                uptime_str = f"up {up_days} {day_str}, {up_hours:2}:{up_mins:02}"
+            else:
+                uptime_str = f"up {up_hours:2}:{up_mins:02}"
+
+    user_str = f"{user_count} user" if user_count == 1 else f"{user_count} users"
+
+    load_avg_str = ""
+    if load is not None:
+        load_avg_str = f",  load average: {load[0]:.2f}, {load[1]:.2f}, {load[2]:.2f}"
+
+    return f" {current_time_str} {uptime_str},  {user_str}{load_avg_str}"
+
+
+def watch_uptime(filename, interval):
+    """
+    Print the uptime line, then again every time the number of users
+    changes, checking the utmp file every interval seconds. Runs until
+    interrupted.
+    """
+    with Sampler() as sampler, utmp.UtmpWatcher(filename) as watcher:
+        user_count = sum(watcher.sessions.values())
+        print(format_uptime(sampler.uptime(), user_count, sampler.loadavg()), flush=True)
+        while True:
+            time.sleep(interval)
+            if watcher.poll():
+                new_count = sum(watcher.sessions.values())
+                if new_count != user_count:
+                    user_count = new_count
+                    print(format_uptime(sampler.uptime(), user_count, sampler.loadavg()), flush=True)
+
+
+def _ticks(interval, count=None):
+    """
+    Yield count times (or forever), every interval seconds on a fixed
+    schedule, so the work done between ticks does not make them drift.
+    """
+    deadline = time.monotonic()
+    done = 0
+    while True:
+        yield
+        done += 1
+        if count is not None and done >= count:
+            return
+        deadline += interval
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind (e.g. the system was suspended); start afresh.
+            deadline = time.monotonic()
+
+
+def sample_uptime(filename, interval, count=None):
+    """
+    Print the uptime line every interval seconds (count times, or until
+    interrupted), keeping the /proc files and the utmp file open between
+    samples.
+    """
+    with Sampler() as sampler, utmp.UtmpWatcher(filename) as watcher:
+        for _ in _ticks(interval, count):
+            watcher.poll()
+            print(format_uptime(sampler.uptime(), sum(watcher.sessions.values()), sampler.loadavg()),
+                  flush=True)
+
+
+# A recorded sample: time, the 1, 5 and 15 minute load averages (NaN if
+# unknown) and the number of users.
+SAMPLE = struct.Struct('<d3fI')
+DEFAULT_RECORD_INTERVAL = 60
+DEFAULT_RECORD_SLOTS = 10080  # a week of one-minute samples
+
+
+def record_uptime(filename, ring, interval, count=None):
+    """
+    Append a SAMPLE to the RingFile ring every interval seconds (count
+    times, or until interrupted). Once the ring is full, each sample
+    overwrites the oldest one.
+    """
+    unknown = (math.nan,) * 3
+    with Sampler() as sampler, utmp.UtmpWatcher(filename) as watcher:
+        for _ in _ticks(interval, count):
+            watcher.poll()
+            ring.append(time.time(), *(sampler.loadavg() or unknown), sum(watcher.sessions.values()))
+
+
+def print_history(ring_path, window=None):
+    """
+    Print the minimum, maximum and average load and user count of the
+    samples in ring_path taken in the last window seconds (all if None).
+    """
+    with ringfile.RingFile(ring_path, SAMPLE) as ring:
+        samples = ring.records()
+    if window is not None:
+        cutoff = time.time() - window
+        samples = [sample for sample in samples if sample[0] >= cutoff]
+    if not samples:
+        print("samples: 0")
+        return
+    times, *columns = zip(*samples)
+    first = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(min(times)))
+    last = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(max(times)))
+    lines = [f"samples: {len(samples)} from {first} to {last}",
+             f"{'':8}{'min':>9}{'max':>9}{'avg':>9}"]
+    for name, values in zip(('load1', 'load5', 'load15', 'users'), columns):
+        values = [value for value in values if not math.isnan(value)]
+        if not values:
+            lines.append(f"{name:8}{'-':>9}{'-':>9}{'-':>9}")
+        elif name == 'users':
+            lines.append(f"{name:8}{min(values):>9}{max(values):>9}{sum(values) / len(values):>9.2f}")
+        else:
+            lines.append(f"{name:8}{min(values):>9.2f}{max(values):>9.2f}{sum(values) / len(values):>9.2f}")
+    print('\n'.join(lines))
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog='uptime',
@@ -98,6 +299,20 @@ def main():
     )
     parser.add_argument('file', nargs='?', default=DEFAULT_UTMP_FILE,
                         help='file to read user information from (e.g., /var/log/wtmp)')
+    parser.add_argument('--watch', metavar='INTERVAL',
+                        help='keep running, printing a new line whenever the number of users changes')
+    parser.add_argument('--interval', metavar='INTERVAL',
+                        help='keep running, printing a new line every INTERVAL')
+    parser.add_argument('--count', metavar='N',
+                        help='with --interval or --record, stop after N lines or samples')
+    parser.add_argument('--record', metavar='RING',
+                        help='keep running, appending a sample to the ring file RING every INTERVAL')
+    parser.add_argument('--slots', metavar='N',
+                        help='with --record, the number of samples a new ring file holds')
+    parser.add_argument('--history', metavar='RING',
+                        help='print minimum, maximum and average load and users recorded in RING')
+    parser.add_argument('--window', metavar='DURATION',
+                        help='with --history, only use the samples of the last DURATION')
     parser.add_argument('--help', action='store_true', help='display this help and exit')
     parser.add_argument('--version', action='store_true', help='output version information and exit')
 
@@ -109,6 +324,18 @@ def main():
         print("the number of users on the system, and the average number of jobs")
         print("in the run queue over the last 1, 5 and 15 minutes.")
         print(f"\nIf FILE is not specified, use {DEFAULT_UTMP_FILE}. /var/log/wtmp as FILE is common.\n")
+        print("      --watch=INTERVAL  check FILE every INTERVAL (e.g. 1, 0.5, 1m) and print")
+        print("                  a new line whenever the number of users changes")
+        print("      --interval=INTERVAL  print a new line every INTERVAL, keeping the")
+        print("                  files it reads open between lines")
+        print("      --count=N  with --interval or --record, stop after N lines or samples")
+        print("      --record=RING  append the load averages and the number of users to")
+        print("                  the ring file RING every INTERVAL (default 1 minute)")
+        print("      --slots=N  with --record, the number of samples a new RING holds")
+        print(f"                  (default {DEFAULT_RECORD_SLOTS}); older samples are overwritten")
+        print("      --history=RING  print the minimum, maximum and average of the samples")
+        print("                  recorded in RING")
+        print("      --window=DURATION  with --history, only use samples of the last DURATION")
         print("      --help     display this help and exit")
         print("      --version  output version information and exit")
         return 0
@@ -125,39 +352,96 @@ def main():
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
         return 1
 
-    current_time_str = datetime.now().strftime('%H:%M:%S')
-
-    boot_time = get_boot_time()
-    uptime_str = "up ??:??"
-    if boot_time:
-        uptime_seconds = int(time.time() - boot_time)
-        if uptime_seconds >= 0:
-            up_days = uptime_seconds // 86400
-            up_hours = (uptime_seconds % 86400) // 3600
-            up_mins = (uptime_seconds % 3600) // 60
-            if up_days > 0:
-                day_str = "day" if up_days == 1 else "days"
-                uptime_str = f"up {up_days} {day_str}, {up_hours:2}:{up_mins:02}"
-            else:
-                uptime_str = f"up {up_hours:2}:{up_mins:02}"
+    modes = [name for name, value in (('--watch', args.watch), ('--record', args.record),
+                                      ('--history', args.history)) if value is not None]
+    if args.watch is not None and args.interval is not None:
+        modes.append('--interval')
+    if len(modes) > 1:
+        print(f"uptime: {modes[0]} and {modes[1]} are mutually exclusive", file=sys.stderr)
+        return 1
+    if args.count is not None and args.interval is None and args.record is None:
+        print("uptime: --count requires --interval or --record", file=sys.stderr)
+        return 1
+    if args.slots is not None and args.record is None:
+        print("uptime: --slots requires --record", file=sys.stderr)
+        return 1
+    if args.window is not None and args.history is None:
+        print("uptime: --window requires --history", file=sys.stderr)
+        return 1
 
-    user_count = get_user_count(args.file)
-    user_str = f"{user_count} user" if user_count == 1 else f"{user_count} users"
+    if args.history is not None:
+        window = None
+        if args.window is not None:
+            # Imported here so that plain uptime runs don't pay for it.
+            from sleep import parse_time_interval
+            window = parse_time_interval(args.window)
+            if window is None or window < 0:
+                print(f"uptime: invalid time interval '{args.window}'", file=sys.stderr)
+                return 1
+        try:
+            print_history(args.history, window)
+        except OSError as e:
+            print(f"uptime: cannot read '{args.history}': {e.strerror}", file=sys.stderr)
+            return 1
+        except ValueError as e:
+            print(f"uptime: '{args.history}': {e}", file=sys.stderr)
+            return 1
+        return 0
 
-    load_avg_str = ""
-    if hasattr(os, 'getloadavg'):
+    option = '--watch' if args.watch is not None else '--record' if args.record is not None else '--interval'
+    value = args.watch if args.watch is not None else args.interval
+    if value is None and args.record is not None:
+        value = str(DEFAULT_RECORD_INTERVAL)
+    if value is not None:
+        if sys.platform == 'win32':
+            print(f"uptime: {option} is not supported on Windows", file=sys.stderr)
+            return 1
+        # Imported here so that plain uptime runs don't pay for it.
+        from sleep import parse_time_interval
+        interval = parse_time_interval(value)
+        if interval is None or not interval > 0:
+            print(f"uptime: invalid time interval '{value}'", file=sys.stderr)
+            return 1
+        count = slots = None
+        if args.count is not None:
+            count = _positive_int(args.count)
+            if count is None:
+                print(f"uptime: invalid count '{args.count}'", file=sys.stderr)
+                return 1
+        if args.slots is not None:
+            slots = _positive_int(args.slots)
+            if slots is None:
+                print(f"uptime: invalid number of slots '{args.slots}'", file=sys.stderr)
+                return 1
         try:
-            # Allow overriding load average for testing
-            fake_load = os.environ.get('_PYCOREUTILS_TEST_LOAD_AVG')
-            if fake_load:
-                avg = [float(x) for x in fake_load.split(',')]
+            if args.watch is not None:
+                watch_uptime(args.file, interval)
+            elif args.record is not None:
+                try:
+                    ring = ringfile.RingFile(args.record, SAMPLE, create=True,
+                                             slots=slots or DEFAULT_RECORD_SLOTS)
+                except OSError as e:
+                    print(f"uptime: cannot open '{args.record}': {e.strerror}", file=sys.stderr)
+                    return 1
+                except ValueError as e:
+                    print(f"uptime: '{args.record}': {e}", file=sys.stderr)
+                    return 1
+                with ring:
+                    record_uptime(args.file, ring, interval, count)
             else:
-                avg = os.getloadavg()
-            load_avg_str = f",  load average: {avg[0]:.2f}, {avg[1]:.2f}, {avg[2]:.2f}"
-        except OSError:
-            pass
+                sample_uptime(args.file, interval, count)
+        except BrokenPipeError:
+            # The reader went away; that is the normal way to stop.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        except KeyboardInterrupt:
+            return 130
+        except OSError as e:
+            print(f"uptime: cannot watch '{args.file}': {e.strerror}", file=sys.stderr)
+            return 1
+        return 0
 
-    print(f" {current_time_str} {uptime_str},  {user_str}{load_avg_str}")
+    with Sampler() as sampler:
+        print(format_uptime(sampler.uptime(), get_user_count(args.file), sampler.loadavg()))
     return 0
 
 if __name__ == '__main__':
@@ -6,15 +6,13 @@ Python port of GNU coreutils users
 
 import argparse
 import os
-import struct
 import re
 import sys
 import subprocess
+import time
 
-DEFAULT_UTMP_FILE = '/var/run/utmp'
-USER_PROCESS = 7
-UTMP_STRUCT_FORMAT = 'hi32s4s32s256shhiii4i20x'
-UTMP_STRUCT_SIZE = struct.calcsize(UTMP_STRUCT_FORMAT)
+import utmp
+from utmp import DEFAULT_UTMP_FILE, DEFAULT_WTMP_FILE
 
 def get_logged_in_users_unix(filename):
     """
@@ -29,27 +27,56 @@ def get_logged_in_users_unix(filename):
     Raises:
         FileNotFoundError: If the file does not exist.
         PermissionError: If the file cannot be read.
-        IOError: For other I/O related errors.
+        OSError: For other I/O related errors.
     """
-    users = []
-    with open(filename, 'rb') as f:
+    with utmp.UtmpFile(filename) as f:
+        return session_list(f.user_sessions())
+
+def session_list(sessions):
+    """
+    Expand a Counter of sessions per user into the sorted list users prints.
+    """
+    return [name for name in sorted(sessions) for _ in range(sessions[name])]
+
+def watch_users(filename, interval):
+    """
+    Print the logged-in users, then again every time the set changes,
+    checking the file every interval seconds. Each state is one line, so an
+    empty line means nobody is logged in any more. Runs until interrupted.
+    """
+    with utmp.UtmpWatcher(filename) as watcher:
+        print(' '.join(session_list(watcher.sessions)), flush=True)
         while True:
-            record = f.read(UTMP_STRUCT_SIZE)
-            if not record:
-                break
-            if len(record) < UTMP_STRUCT_SIZE:
-                continue
-
-            unpacked_record = struct.unpack(UTMP_STRUCT_FORMAT, record)
-            ut_type = unpacked_record[0]
-            
-            if ut_type == USER_PROCESS:
-                ut_user_bytes = unpacked_record[4]
-                username = ut_user_bytes.split(b'\0', 1)[0].decode('utf-8', 'ignore')
-                if username:
-                    users.append(username)
-    
-    return sorted(users)
+            time.sleep(interval)
+            if watcher.poll():
+                print(' '.join(session_list(watcher.sessions)), flush=True)
+
+def print_session_stats(filename):
+    """
+    Print per-user connect time, the concurrent-session peak and the number
+    of sessions per day from a wtmp file.
+    """
+    # Imported here so that plain users runs don't pay for it.
+    import wtmpstats
+    stats = wtmpstats.session_stats(filename)
+    width = max([len(name) for name in stats.users] + [5])
+    lines = [f"{'USER':<{width}}  SESSIONS     HOURS"]
+    for index in sorted(range(len(stats.users)), key=stats.users.__getitem__):
+        lines.append(f"{stats.users[index]:<{width}}  {stats.sessions[index]:>8}  "
+                     f"{stats.connect[index] / 3600:>8.2f}")
+    lines.append(f"{'total':<{width}}  {sum(stats.sessions):>8}  {sum(stats.connect) / 3600:>8.2f}")
+    lines.append("")
+    if stats.peak_time is not None:
+        peak_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats.peak_time))
+        lines.append(f"peak concurrent sessions: {stats.peak} at {peak_time}")
+    else:
+        lines.append("peak concurrent sessions: 0")
+    lines.append(f"sessions still open: {stats.still_open}")
+    lines.append("")
+    lines.append("DAY         SESSIONS")
+    for day, count in stats.per_day():
+        lines.append(f"{day.isoformat()}  {count:>8}")
+    print('\n'.join(lines))
 
 def get_logged_in_users_windows():
     """
@@ -96,8 +123,12 @@ def main():
         epilog=f"If FILE is not specified, use {DEFAULT_UTMP_FILE}. /var/log/wtmp as FILE is common.",
         add_help=False
     )
-    parser.add_argument('file', nargs='?', default=DEFAULT_UTMP_FILE,
+    parser.add_argument('file', nargs='?',
                         help='the file to read user information from')
+    parser.add_argument('--watch', metavar='INTERVAL',
+                        help='keep running, printing the users again whenever they change')
+    parser.add_argument('--stats', action='store_true',
+                        help='print session statistics from FILE (default: wtmp)')
     parser.add_argument('--help', action='store_true',
                         help='display this help and exit')
     parser.add_argument('--version', action='store_true',
@@ -110,6 +141,11 @@ def main():
         print("Output who is currently logged in according to FILE.")
         print(f"If FILE is not specified, use {DEFAULT_UTMP_FILE}. /var/log/wtmp as FILE is common.")
         print()
+        print("      --watch=INTERVAL  check FILE every INTERVAL (e.g. 1, 0.5, 1m) and")
+        print("                  print the users again whenever they change")
+        print("      --stats    print connect time and sessions per user, the peak")
+        print("                  number of concurrent sessions and the sessions per day,")
+        print(f"                  like ac and last; FILE defaults to {DEFAULT_WTMP_FILE}")
         print("      --help     display this help and exit")
         print("      --version  output version information and exit")
         return 0
@@ -127,13 +163,36 @@ def main():
         print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
         return 1
 
+    if args.file is None:
+        args.file = DEFAULT_WTMP_FILE if args.stats else DEFAULT_UTMP_FILE
+
+    if args.stats and args.watch is not None:
+        print("users: --stats and --watch are mutually exclusive", file=sys.stderr)
+        return 1
+
     if sys.platform == 'win32' and args.file != DEFAULT_UTMP_FILE:
         print("users: warning: FILE argument is ignored on Windows", file=sys.stderr)
 
+    if args.watch is not None:
+        if sys.platform == 'win32':
+            print("users: --watch is not supported on Windows", file=sys.stderr)
+            return 1
+        # Imported here so that plain users runs don't pay for it.
+        from sleep import parse_time_interval
+        interval = parse_time_interval(args.watch)
+        if interval is None or not interval > 0:
+            print(f"users: invalid time interval '{args.watch}'", file=sys.stderr)
+            return 1
+
     try:
-        user_list = get_logged_in_users(args.file)
-        if user_list:
-            print(' '.join(user_list))
+        if args.stats:
+            print_session_stats(args.file)
+        elif args.watch is not None:
+            watch_users(args.file, interval)
+        else:
+            user_list = get_logged_in_users(args.file)
+            if user_list:
+                print(' '.join(user_list))
     except FileNotFoundError:
         if args.file != DEFAULT_UTMP_FILE:
             print(f"users: cannot open '{args.file}': No such file or directory", file=sys.stderr)
@@ -141,7 +200,12 @@ def main():
     except PermissionError:
         print(f"users: cannot open '{args.file}': Permission denied", file=sys.stderr)
         return 1
-    except (IOError, struct.error) as e:
+    except BrokenPipeError:
+        # The reader of --watch went away; that is the normal way to stop.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        return 130
+    except OSError as e:
         print(f"users: error reading '{args.file}': {e}", file=sys.stderr)
         return 1
         
@@ -0,0 +1,375 @@
+"""
+utmp - decoder for utmp and wtmp login records shared by users and uptime
+Part of the Python port of GNU coreutils
+
+utmp and wtmp are arrays of fixed-size records (struct utmp in the glibc
+layout for x86-64 and most 64-bit Linux ports). wtmp on a long-lived host
+can be several gigabytes, so instead of reading and unpacking the records
+one by one, large files are mapped with mmap and walked through a
+memoryview:
+
+* questions that only need a record's type and the first byte of its user
+  name (how many users are logged in?) are answered from strided
+  memoryview slices, one byte per record, without a Python loop;
+* records are filtered on ut_type with a struct that unpacks only the
+  fields needed, before any string is decoded;
+* full records are decoded into UtmpRecord objects only for the matches;
+* wtmp is appended in time order, so a time range is located by binary
+  search on ut_tv, reading about log2(records) timestamps;
+* UtmpWatcher follows a file across polls, re-reading it with os.pread
+  only after its size or mtime changed, and decoding only changed or
+  appended records.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from collections import Counter
+
+DEFAULT_UTMP_FILE = '/var/run/utmp'
+DEFAULT_WTMP_FILE = '/var/log/wtmp'
+
+# ut_type values
+EMPTY = 0
+RUN_LVL = 1
+BOOT_TIME = 2
+NEW_TIME = 3
+OLD_TIME = 4
+INIT_PROCESS = 5
+LOGIN_PROCESS = 6
+USER_PROCESS = 7
+DEAD_PROCESS = 8
+ACCOUNTING = 9
+
+UTMP_STRUCT_FORMAT = 'hi32s4s32s256shhiii4i20x'
+UTMP_STRUCT_SIZE = struct.calcsize(UTMP_STRUCT_FORMAT)
+LINE_OFFSET = struct.calcsize('hi')
+ID_OFFSET = struct.calcsize('hi32s')
+USER_OFFSET = struct.calcsize('hi32s4s')
+TIME_OFFSET = struct.calcsize('hi32s4s32s256shhi')
+
+_RECORD = struct.Struct(UTMP_STRUCT_FORMAT)
+# ut_type and ut_user only, for filtering without unpacking the rest.
+_TYPE_AND_USER = struct.Struct(f'h{USER_OFFSET - 2}x32s{UTMP_STRUCT_SIZE - USER_OFFSET - 32}x')
+_TIME = struct.Struct('ii')
+
+# Files smaller than this are simply read; mapping only pays off for big ones.
+MMAP_THRESHOLD = 1 << 20
+
+# Byte offsets of the low and high byte of ut_type within a record.
+_TYPE_LOW = 0 if sys.byteorder == 'little' else 1
+_TYPE_HIGH = 1 - _TYPE_LOW
+
+# bytes.translate tables mapping each byte to 1 if it matches, else 0.
+_IS_USER_PROCESS = bytes(int(b == USER_PROCESS) for b in range(256))
+_IS_ZERO = bytes(int(b == 0) for b in range(256))
+_IS_NONZERO = bytes(int(b != 0) for b in range(256))
+
+
+def c_string(raw):
+    """
+    Decode a NUL-padded fixed-width utmp field.
+    """
+    return raw.split(b'\0', 1)[0].decode('utf-8', 'ignore')
+
+
+class UtmpRecord:
+    """
+    One decoded utmp record.
+    """
+    __slots__ = ('type', 'pid', 'line', 'id', 'user', 'host', 'termination', 'exit',
+                 'session', 'tv_sec', 'tv_usec', 'addr_v6')
+
+    def __init__(self, fields):
+        (self.type, self.pid, line, ut_id, user, host, self.termination, self.exit,
+         self.session, self.tv_sec, self.tv_usec, *addr_v6) = fields
+        self.line = c_string(line)
+        self.id = c_string(ut_id)
+        self.user = c_string(user)
+        self.host = c_string(host)
+        self.addr_v6 = tuple(addr_v6)
+
+    @property
+    def time(self):
+        """The record's timestamp in seconds since the epoch."""
+        return self.tv_sec + self.tv_usec / 1e6
+
+    def __repr__(self):
+        return (f"UtmpRecord(type={self.type}, pid={self.pid}, line={self.line!r}, "
+                f"user={self.user!r}, host={self.host!r}, tv_sec={self.tv_sec})")
+
+
+class UtmpFile:
+    """
+    A utmp or wtmp file opened for decoding. Use as a context manager; the
+    file (and its mapping) is closed on exit. A trailing partial record is
+    ignored. Raises OSError (FileNotFoundError, PermissionError, ...) like
+    open() if the file cannot be read. filename may also be a file
+    descriptor positioned at the start of the file; it is left open.
+    """
+
+    def __init__(self, filename):
+        self._map = None
+        with open(filename, 'rb', closefd=not isinstance(filename, int)) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                try:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    self._map = None
+                else:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        self._map.madvise(mmap.MADV_SEQUENTIAL)
+            self._data = self._map if self._map is not None else f.read()
+        self._count = len(self._data) // UTMP_STRUCT_SIZE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # An unfinished records() generator still holds a view; the
+                # mapping goes away when it is garbage collected.
+                pass
+            self._map = None
+        self._data = b''
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def view(self):
+        """
+        Return a memoryview of the complete records. Release it (use it as
+        a context manager) before closing the file.
+        """
+        return memoryview(self._data)[:self._count * UTMP_STRUCT_SIZE]
+
+    def _column(self, view, offset):
+        """
+        Return one byte per record: the byte at offset within each record.
+        """
+        return view[offset::UTMP_STRUCT_SIZE].tobytes()
+
+    def count_users(self):
+        """
+        Return the number of USER_PROCESS records with a non-empty user name,
+        i.e. the number of login sessions.
+        """
+        if not self._count:
+            return 0
+        with self.view() as view:
+            is_user = int.from_bytes(self._column(view, _TYPE_LOW).translate(_IS_USER_PROCESS), 'little')
+            is_user &= int.from_bytes(self._column(view, _TYPE_HIGH).translate(_IS_ZERO), 'little')
+            is_user &= int.from_bytes(self._column(view, USER_OFFSET).translate(_IS_NONZERO), 'little')
+        return is_user.bit_count()
+
+    def user_sessions(self):
+        """
+        Return a Counter mapping each logged-in user name to its number of
+        USER_PROCESS records. Names are decoded once per distinct name, and
+        records whose name decodes to nothing are left out.
+        """
+        with self.view() as view:
+            raw_names = Counter(user for ut_type, user in _TYPE_AND_USER.iter_unpack(view)
+                                if ut_type == USER_PROCESS and user[0])
+        sessions = Counter()
+        for raw, count in raw_names.items():
+            name = c_string(raw)
+            if name:
+                sessions[name] += count
+        return sessions
+
+    def time_at(self, index):
+        """
+        Return the timestamp (ut_tv) of record number index.
+        """
+        tv_sec, tv_usec = _TIME.unpack_from(self._data, index * UTMP_STRUCT_SIZE + TIME_OFFSET)
+        return tv_sec + tv_usec / 1e6
+
+    def bisect_time(self, when, lo=0, hi=None):
+        """
+        Return the index of the first record at or after time when, assuming
+        the records are in chronological order as in wtmp. Records before a
+        backwards clock step can make the answer inexact, as for any binary
+        search over an almost sorted log.
+        """
+        if hi is None:
+            hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < when:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, types=None, start=0, stop=None):
+        """
+        Yield a UtmpRecord for every record numbered from start up to (not
+        including) stop, or only for those whose ut_type is in types.
+        """
+        if stop is None or stop > self._count:
+            stop = self._count
+        start = min(max(start, 0), stop)
+        with self.view() as whole, whole[start * UTMP_STRUCT_SIZE:stop * UTMP_STRUCT_SIZE] as view:
+            if types is None:
+                for fields in _RECORD.iter_unpack(view):
+                    yield UtmpRecord(fields)
+                return
+            types = frozenset(types)
+            unpack_from = _RECORD.unpack_from
+            for index, (ut_type, _) in enumerate(_TYPE_AND_USER.iter_unpack(view)):
+                if ut_type in types:
+                    yield UtmpRecord(unpack_from(view, index * UTMP_STRUCT_SIZE))
+
+
+def slot_user(raw):
+    """
+    Return the user name of a raw record if it is a login session, else None.
+    """
+    ut_type, user = _TYPE_AND_USER.unpack(raw)
+    if ut_type == USER_PROCESS and user[0]:
+        return c_string(user) or None
+    return None
+
+
+class UtmpWatcher:
+    """
+    Keeps a utmp or wtmp file open and maintains the Counter of login
+    sessions per user (sessions) across calls to poll().
+
+    A poll costs one stat() while the file's size and mtime are unchanged.
+    utmp is rewritten in place, so a file of up to MMAP_THRESHOLD bytes is
+    re-read with one pread() and compared record by record with the
+    previous contents; only records that differ are decoded. A larger file
+    is taken to be an append-only log like wtmp, and only the bytes
+    appended since the last poll are read. A file that is replaced (new
+    inode) or shrinks is read again from the start, and a missing file
+    counts as nobody logged in.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.sessions = Counter()
+        self._fd = None
+        self._ident = None
+        self._stamp = None
+        self._offset = 0
+        # Contents read so far, kept only while the file is small.
+        self._data = b''
+        self.poll()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _reset(self):
+        self.close()
+        self.sessions = Counter()
+        self._ident = self._stamp = None
+        self._offset = 0
+        self._data = b''
+
+    def _count(self, raw, step):
+        name = slot_user(raw)
+        if name is not None:
+            self.sessions[name] += step
+            if not self.sessions[name]:
+                del self.sessions[name]
+
+    def _read_small(self, size):
+        """
+        Re-read the whole file and apply the records that changed.
+        """
+        data = os.pread(self._fd, size, 0)
+        end = len(data) // UTMP_STRUCT_SIZE * UTMP_STRUCT_SIZE
+        old = self._data
+        for offset in range(0, max(end, len(old)), UTMP_STRUCT_SIZE):
+            before = old[offset:offset + UTMP_STRUCT_SIZE]
+            after = data[offset:offset + UTMP_STRUCT_SIZE] if offset < end else b''
+            if before != after:
+                if before:
+                    self._count(before, -1)
+                if after:
+                    self._count(after, 1)
+        self._data = data[:end]
+        self._offset = end
+
+    def _read_appended(self, size):
+        """
+        Read and apply only the records appended since the last poll.
+        """
+        data = os.pread(self._fd, size - self._offset, self._offset)
+        end = len(data) // UTMP_STRUCT_SIZE * UTMP_STRUCT_SIZE
+        with memoryview(data)[:end] as view:
+            for ut_type, user in _TYPE_AND_USER.iter_unpack(view):
+                if ut_type == USER_PROCESS and user[0]:
+                    name = c_string(user)
+                    if name:
+                        self.sessions[name] += 1
+        self._offset += end
+
+    def poll(self):
+        """
+        Bring sessions up to date with the file. Returns True if it changed.
+        """
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            changed = bool(self.sessions)
+            self._reset()
+            return changed
+
+        replaced = (st.st_dev, st.st_ino) != self._ident or st.st_size < self._offset
+        if not replaced and (st.st_size, st.st_mtime_ns) == self._stamp:
+            return False
+
+        before = Counter(self.sessions)
+        if replaced:
+            self._reset()
+            self._fd = os.open(self.filename, os.O_RDONLY)
+            # The file may have been replaced again since the stat() above.
+            st = os.fstat(self._fd)
+            self._ident = (st.st_dev, st.st_ino)
+            if st.st_size > MMAP_THRESHOLD:
+                # Big log seen for the first time: count it through a
+                # mapping of the descriptor just opened.
+                with UtmpFile(self._fd) as f:
+                    self.sessions = f.user_sessions()
+                    self._offset = len(f) * UTMP_STRUCT_SIZE
+                self._data = None
+
+        self._stamp = (st.st_size, st.st_mtime_ns)
+        if self._data is not None and st.st_size <= MMAP_THRESHOLD:
+            self._read_small(st.st_size)
+        else:
+            if self._data is not None:
+                # The file outgrew the in-place check; from now on only appends count.
+                self._read_small(self._offset)
+                self._data = None
+            self._read_appended(st.st_size)
+        return self.sessions != before
+
+
+def read_records(filename, types=None):
+    """
+    Return the records of a utmp file as a list, optionally only those whose
+    ut_type is in types.
+    """
+    with UtmpFile(filename) as f:
+        return list(f.records(types))
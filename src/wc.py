@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+wc - print newline, word, and byte counts for each file
+Python port of GNU coreutils wc
+
+Newlines are counted with bytearray.count() over large blocks filled by
+readinto(), and -c alone takes the size of a regular file from fstat()
+without reading it. Words, characters and line widths go through an
+incremental decoder for the locale's encoding; blocks that are pure ASCII
+skip the decoder. Several files are counted at once on a thread pool, and
+when only newlines and bytes are wanted a very large file is split into
+ranges that are counted by a pool of processes.
+"""
+
+import argparse
+import codecs
+import locale
+import os
+import re
+import stat
+import sys
+import threading
+import unicodedata
+
+from pathutil import open_files0_from, read_names0
+
+# Read size for counting; large enough to make the per-call cost vanish,
+# small enough to stay in the CPU caches.
+BLOCK_SIZE = 1 << 18
+# Files at least this large are split into ranges across processes when
+# only newlines and bytes are counted.
+SPLIT_SIZE = 256 << 20
+# Smallest range handed to one process.
+RANGE_SIZE = 32 << 20
+
+# The counts in output order, with the option that selects each.
+FIELDS = ('lines', 'words', 'chars', 'bytes', 'max_line_length')
+
+# Where str.split() and GNU wc disagree about word separators: glibc does
+# not count the information separators or NEL as space, while wc counts
+# WORD JOINER.
+_WORD_TRANSLATION = str.maketrans({'\x1c': 'x', '\x1d': 'x', '\x1e': 'x', '\x1f': 'x',
+                                   '\x85': 'x', '\u2060': ' '})
+# Bytes that do not decode, as the surrogateescape handler leaves them. They
+# are not characters, neither start nor end a word and take no columns;
+# a U+FFFD actually present in the input is an ordinary character.
+_INVALID_BYTES = re.compile('[\udc80-\udcff]+')
+# ASCII white space becomes 0 and every other byte 1, so that a word
+# starts wherever b'\0\1' occurs; one translate() and one count() beat
+# splitting a block into a list of words by far.
+_WORD_BYTES = bytes(0 if bytes([byte]).isspace() else 1 for byte in range(256))
+# Characters that end a line for -L.
+_LINE_BREAKS = re.compile('[\n\r\f]')
+# Control characters, which take no columns for -L; in the C locale every
+# byte above 127 is one.
+_CONTROLS = bytes(range(9)) + b'\x0b' + bytes(range(14, 32)) + b'\x7f'
+_C_CONTROLS = _CONTROLS + bytes(range(128, 256))
+_TEXT_CONTROLS = dict.fromkeys(list(_CONTROLS) + list(range(128, 160)))
+
+
+class Counts:
+    """The counts of one input, or the total of several."""
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.lines = self.words = self.chars = self.bytes = self.max_line_length = 0
+
+    def add(self, other):
+        self.lines += other.lines
+        self.words += other.words
+        self.chars += other.chars
+        self.bytes += other.bytes
+        self.max_line_length = max(self.max_line_length, other.max_line_length)
+
+
+def _count_word_bytes(block, in_word):
+    """
+    Return the words starting in a nonempty block of bytes and whether it
+    ends inside a word; in_word tells whether the bytes before it did.
+    """
+    marks = block.translate(_WORD_BYTES)
+    words = marks.count(b'\0\1')
+    if marks[0] and not in_word:
+        words += 1
+    return words, marks[-1] == 1
+
+
+def _count_words(text, in_word):
+    """
+    Return the words starting in text and whether text ends inside a word.
+    in_word tells whether the text before it did.
+    """
+    if not text:
+        return 0, in_word
+    words = len(text.split())
+    if in_word and not text[:1].isspace():
+        words -= 1
+    return words, not text[-1:].isspace()
+
+
+def _width(text):
+    """Columns taken by text without tabs: wide characters take two, combining marks none."""
+    width = len(text)
+    if not text.isascii():
+        for char in text:
+            if char > '\x7f':
+                if unicodedata.combining(char):
+                    width -= 1
+                elif unicodedata.east_asian_width(char) in ('W', 'F'):
+                    width += 1
+    return width
+
+
+def _advance(column, text):
+    """The column after text is written from column; a tab moves to the next multiple of 8."""
+    *segments, last = text.split('\t')
+    for segment in segments:
+        column = (column + _width(segment)) // 8 * 8 + 8
+    return column + _width(last)
+
+
+def _widest(text, column, longest):
+    """
+    Track -L over a block of text: returns the column the block ends at
+    and the longest line width seen so far.
+    """
+    lines = _LINE_BREAKS.split(text)
+    last = lines.pop()
+    if text.isascii() and '\t' not in text:
+        if lines:
+            longest = max(longest, column + len(lines[0]), max(map(len, lines), default=0))
+            column = 0
+        return column + len(last), longest
+    for line in lines:
+        longest = max(longest, _advance(column, line))
+        column = 0
+    return _advance(column, last), longest
+
+
+def _count_range(path, start, end):
+    """
+    Count newlines and bytes from start to end (None for the end of the
+    file) of the file at path. Runs in a worker process.
+    """
+    buffer = bytearray(BLOCK_SIZE)
+    view = memoryview(buffer)
+    lines = total = 0
+    remaining = end - start if end is not None else None
+    with open(path, 'rb', buffering=0) as f:
+        f.seek(start)
+        while remaining is None or remaining > 0:
+            n = f.readinto(view[:remaining] if remaining is not None and remaining < BLOCK_SIZE else view)
+            if not n:
+                break
+            lines += buffer.count(b'\n', 0, n)
+            total += n
+            if remaining is not None:
+                remaining -= n
+    return lines, total
+
+
+def locale_encoding():
+    """
+    The codec name for the LC_CTYPE locale, or None where every byte is a
+    character (the C and POSIX locales).
+    """
+    try:
+        locale.setlocale(locale.LC_CTYPE, '')
+    except locale.Error:
+        pass
+    try:
+        codeset = locale.nl_langinfo(locale.CODESET)
+    except AttributeError:
+        codeset = locale.getpreferredencoding(False)
+    try:
+        name = codecs.lookup(codeset).name
+    except LookupError:
+        return None
+    return None if name == 'ascii' else name
+
+
+class Counter:
+    """
+    Counts inputs for one set of options. It can be shared by threads:
+    each thread reads into a buffer of its own, and the process pool for
+    splitting large files is started once, by whichever thread needs it
+    first.
+    """
+
+    def __init__(self, fields, encoding=None, processes=1):
+        self.fields = fields
+        self.lines = 'lines' in fields
+        self.words = 'words' in fields
+        self.chars = 'chars' in fields
+        self.max_line_length = 'max_line_length' in fields
+        self.decode = self.words or self.chars or self.max_line_length
+        self.encoding = encoding
+        # Pure ASCII blocks can bypass a decoder for these encodings.
+        self.ascii_fast_path = encoding is None or encoding == 'utf-8'
+        self.processes = processes
+        self.local = threading.local()
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    def _buffer(self):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            buffer = self.local.buffer = bytearray(BLOCK_SIZE)
+        return buffer
+
+    def count_fd(self, fd, st, counts):
+        """Add the counts of the open descriptor fd, whose fstat() is st, to counts."""
+        regular = stat.S_ISREG(st.st_mode)
+        if not (self.lines or self.decode) and regular and st.st_size > 0:
+            # -c alone: a regular file's size is known without reading it.
+            # Files in /proc and /sys claim to be empty and are read.
+            try:
+                position = os.lseek(fd, 0, os.SEEK_CUR)
+            except OSError:
+                position = None
+            if position is not None and position <= st.st_size:
+                counts.bytes += st.st_size - position
+                return
+        if regular and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        stream = open(fd, 'rb', buffering=0, closefd=False)
+        buffer = self._buffer()
+        if self.decode:
+            self._scan_text(stream, buffer, counts)
+            return
+        while True:
+            n = stream.readinto(buffer)
+            if not n:
+                break
+            counts.bytes += n
+            counts.lines += buffer.count(b'\n', 0, n)
+
+    def _scan_text(self, stream, buffer, counts):
+        view = memoryview(buffer)
+        decoder = None
+        if self.encoding is not None:
+            decoder = codecs.getincrementaldecoder(self.encoding)('surrogateescape')
+        in_word = False
+        column = 0
+        while True:
+            n = stream.readinto(buffer)
+            text = None
+            if n:
+                counts.bytes += n
+                if self.lines:
+                    counts.lines += buffer.count(b'\n', 0, n)
+                block = buffer if n == len(buffer) else buffer[:n]
+                if decoder is None or (self.ascii_fast_path and not decoder.getstate()[0]
+                                       and block.isascii()):
+                    if self.chars:
+                        counts.chars += n
+                    if self.words:
+                        words, in_word = _count_word_bytes(block, in_word)
+                        counts.words += words
+                    if self.max_line_length:
+                        column, counts.max_line_length = _widest(
+                            block.translate(None, _C_CONTROLS).decode('ascii'), column,
+                            counts.max_line_length)
+                    continue
+                text = decoder.decode(view[:n])
+            elif decoder is not None:
+                # An incomplete character at the very end.
+                text = decoder.decode(b'', True)
+            if text and _INVALID_BYTES.search(text):
+                text = _INVALID_BYTES.sub('', text)
+            if text:
+                if self.chars:
+                    counts.chars += len(text)
+                if self.words:
+                    words, in_word = _count_words(text.translate(_WORD_TRANSLATION), in_word)
+                    counts.words += words
+                if self.max_line_length:
+                    column, counts.max_line_length = _widest(text.translate(_TEXT_CONTROLS), column,
+                                                             counts.max_line_length)
+            if not n:
+                break
+        counts.max_line_length = max(counts.max_line_length, column)
+
+    def splits(self, st):
+        """Whether a file with this fstat() is counted in ranges by several processes."""
+        return (self.processes > 1 and not self.decode and stat.S_ISREG(st.st_mode)
+                and st.st_size >= SPLIT_SIZE)
+
+    def count_split(self, path, size, counts):
+        """Add the counts of the large regular file at path to counts, range by range."""
+        with self.pool_lock:
+            if self.pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Forking while other threads hold locks is unsafe; the fork
+                # server starts workers from a single-threaded process.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+                self.pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+        parts = max(min(self.processes * 4, size // RANGE_SIZE), 1)
+        step = -(-size // parts)
+        starts = range(0, size, step)
+        ends = [start + step for start in starts[:-1]] + [None]
+        futures = [self.pool.submit(_count_range, path, start, end) for start, end in zip(starts, ends)]
+        for future in futures:
+            lines, total = future.result()
+            counts.lines += lines
+            counts.bytes += total
+
+    def count_file(self, name):
+        """
+        Count one operand, '-' being standard input. Returns the counts,
+        None if the file could not be opened, and an error message or None.
+        """
+        if name in ('-', b'-'):
+            fd, opened = sys.stdin.fileno(), False
+        else:
+            try:
+                fd, opened = os.open(name, os.O_RDONLY | getattr(os, 'O_BINARY', 0)), True
+            except OSError as e:
+                return None, f"wc: {os.fsdecode(name)}: {e.strerror}"
+        counts = Counts()
+        try:
+            st = os.fstat(fd)
+            if opened and self.splits(st):
+                self.count_split(name, st.st_size, counts)
+            else:
+                self.count_fd(fd, st, counts)
+        except OSError as e:
+            return counts, f"wc: {os.fsdecode(name)}: {e.strerror}"
+        finally:
+            if opened:
+                os.close(fd)
+        return counts, None
+
+    def close(self):
+        """Stop the worker processes, if any were started."""
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def number_width(names):
+    """
+    The column width GNU wc uses: the digits of the total size of the
+    regular files, and at least 7 if any input is not a regular file.
+    """
+    width, minimum, total = 1, 1, 0
+    for name in names:
+        try:
+            st = os.fstat(sys.stdin.fileno()) if name in ('-', b'-') else os.stat(name)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            total += st.st_size
+        else:
+            minimum = 7
+    while total >= 10:
+        width += 1
+        total //= 10
+    return max(width, minimum)
+
+
+def format_counts(counts, fields, width, name=None):
+    """One output line, as bytes."""
+    line = b' '.join([b'%*d' % (width, getattr(counts, field)) for field in fields])
+    if name is not None:
+        line += b' ' + os.fsencode(name)
+    return line + b'\n'
+
+
+def wc(batches, counter, threads, width, total_mode='auto', show_names=True, out=None):
+    """
+    Count every operand in an iterable of operand batches and write a line
+    for each, in input order, then the total. Batches with more than one
+    operand are counted on a pool of that many threads.
+
+    Returns:
+        0 on success, 1 on any failure
+    """
+    out = out or sys.stdout.buffer
+    total = Counts()
+    files = 0
+    status = 0
+    pool = None
+    try:
+        for names in batches:
+            if threads > 1 and len(names) > 1 and pool is None:
+                # Imported here so that single files don't pay for it.
+                from concurrent.futures import ThreadPoolExecutor
+                pool = ThreadPoolExecutor(max_workers=threads)
+            # Standard input can only be read once, by one thread.
+            if pool is not None and len(names) > 1 and sum(name in ('-', b'-') for name in names) < 2:
+                results = pool.map(counter.count_file, names)
+            else:
+                results = map(counter.count_file, names)
+            for name, (counts, error) in zip(names, results):
+                files += 1
+                if error is not None:
+                    out.flush()
+                    print(error, file=sys.stderr)
+                    status = 1
+                if counts is None:
+                    continue
+                total.add(counts)
+                if total_mode != 'only':
+                    out.write(format_counts(counts, counter.fields, width, name if show_names else None))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        counter.close()
+    if total_mode == 'always' or (total_mode == 'auto' and files > 1):
+        out.write(format_counts(total, counter.fields, width, 'total'))
+    elif total_mode == 'only':
+        out.write(format_counts(total, counter.fields, width))
+    out.flush()
+    return status
+
+
+class Files0Operands:
+    """
+    The operands in a --files0-from stream, in batches. Names wc cannot
+    accept are reported and dropped, and rejected is set.
+    """
+
+    def __init__(self, source, source_name):
+        self.source = source
+        self.source_name = source_name
+        self.rejected = False
+
+    def __iter__(self):
+        index = 0
+        for names in read_names0(self.source):
+            valid = []
+            for name in names:
+                index += 1
+                if not name:
+                    print(f"wc: {self.source_name}:{index}: invalid zero-length file name", file=sys.stderr)
+                    self.rejected = True
+                elif name == b'-' and self.source_name == '-':
+                    print("wc: when reading file names from standard input, no file name of '-' allowed",
+                          file=sys.stderr)
+                    self.rejected = True
+                else:
+                    valid.append(name)
+            yield valid
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='wc',
+        description='Print newline, word, and byte counts for each FILE.',
+        add_help=False
+    )
+
+    parser.add_argument('-c', '--bytes', action='store_true', help='print the byte counts')
+    parser.add_argument('-m', '--chars', action='store_true', help='print the character counts')
+    parser.add_argument('-l', '--lines', action='store_true', help='print the newline counts')
+    parser.add_argument('-L', '--max-line-length', action='store_true',
+                        help='print the maximum display width')
+    parser.add_argument('-w', '--words', action='store_true', help='print the word counts')
+    parser.add_argument('--files0-from', metavar='F',
+                        help='read input from the files specified by NUL-terminated names in file F')
+    parser.add_argument('--total', metavar='WHEN', default='auto',
+                        help='when to print a line with total counts')
+    parser.add_argument('-j', '--jobs', metavar='N',
+                        help='count up to N files, or ranges of a large file, at once')
+    parser.add_argument('--help', action='store_true', help='display this help and exit')
+    parser.add_argument('--version', action='store_true', help='output version information and exit')
+    parser.add_argument('files', nargs='*', metavar='FILE')
+
+    try:
+        args = parser.parse_args()
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"""Usage: {parser.prog} [OPTION]... [FILE]...
+  or:  {parser.prog} [OPTION]... --files0-from=F
+Print newline, word, and byte counts for each FILE, and a total line if
+more than one FILE is specified.  A word is a nonempty sequence of non white
+space delimited by white space characters or by start or end of input.
+
+With no FILE, or when FILE is -, read standard input.
+
+The options below may be used to select which counts are printed, always in
+the following order: newline, word, character, byte, maximum line length.
+  -c, --bytes            print the byte counts
+  -m, --chars            print the character counts
+  -l, --lines            print the newline counts
+      --files0-from=F    read input from the files specified by
+                           NUL-terminated names in file F;
+                           If F is - then read names from standard input
+  -L, --max-line-length  print the maximum display width
+  -w, --words            print the word counts
+      --total=WHEN       when to print a line with total counts;
+                           WHEN can be: auto, always, only, never
+  -j, --jobs=N           count up to N files at once, and split a file of
+                           {SPLIT_SIZE >> 20} MiB or more into ranges counted by N
+                           processes when only -l and -c are given
+                           (default: the number of usable CPUs)
+      --help        display this help and exit
+      --version     output version information and exit
+
+Examples:
+  {parser.prog} -l /var/log/*.log        Count the lines of each log and in total
+  find . -name '*.py' -print0 | {parser.prog} -l --files0-from=-
+""")
+        return 0
+
+    if args.version:
+        print("wc (Python port of GNU coreutils) 1.0")
+        print("This is free software: you are free to change and redistribute it.")
+        print("There is NO WARRANTY, to the extent permitted by law.")
+        print("")
+        print("Written by Junaid Rahman.")
+        return 0
+
+    if args.files0_from is not None and args.files:
+        print(f"wc: extra operand '{args.files[0]}'", file=sys.stderr)
+        print("file operands cannot be combined with --files0-from", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    total_modes = ('auto', 'always', 'only', 'never')
+    if args.total not in total_modes:
+        print(f"wc: invalid argument '{args.total}' for '--total'", file=sys.stderr)
+        print("Valid arguments are:", file=sys.stderr)
+        for mode in total_modes:
+            print(f"  - '{mode}'", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    jobs = None
+    if args.jobs is not None:
+        try:
+            jobs = int(args.jobs)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            print(f"wc: invalid number of jobs: '{args.jobs}'", file=sys.stderr)
+            return 1
+
+    fields = tuple(field for field, wanted in zip(FIELDS, (args.lines, args.words, args.chars,
+                                                           args.bytes, args.max_line_length))
+                   if wanted) or ('lines', 'words', 'bytes')
+    encoding = locale_encoding() if {'words', 'chars', 'max_line_length'} & set(fields) else None
+
+    if jobs is None:
+        # Imported here so that plain wc runs don't pay for it.
+        from nproc import effective_cpus
+        jobs = effective_cpus()
+    counter = Counter(fields, encoding, processes=jobs)
+    # Opening and reading files mostly waits on the disk, so a few
+    # threads more than CPUs keep it busy.
+    threads = jobs + 4 if args.jobs is None else jobs
+
+    try:
+        if args.files0_from is None:
+            names = args.files or ['-']
+            if (len(names) == 1 and len(fields) == 1) or args.total == 'only':
+                width = 1
+            else:
+                width = number_width(names)
+            return wc([names], counter, threads, width, args.total, show_names=bool(args.files))
+        try:
+            source = open_files0_from(args.files0_from)
+        except OSError as e:
+            print(f"wc: cannot open '{args.files0_from}' for reading: {e.strerror}", file=sys.stderr)
+            return 1
+        with source:
+            operands = Files0Operands(source, args.files0_from)
+            batches = operands
+            if stat.S_ISREG(os.fstat(source.fileno()).st_mode):
+                # A list in a regular file is read whole, as GNU wc does,
+                # so that the columns can be sized for its files.
+                names = [name for batch in batches for name in batch]
+                batches = [names]
+                width = number_width(names)
+            else:
+                width = 1
+            status = wc(batches, counter, threads, width, args.total)
+        return status or int(operands.rejected)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); exit without a traceback.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
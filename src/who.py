@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+who - show who is logged on
+Python port of GNU coreutils who
+"""
+
+import argparse
+import grp
+import locale
+import os
+import re
+import socket
+import stat
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+
+import utmp
+from utmp import DEFAULT_UTMP_FILE, DEFAULT_WTMP_FILE
+
+DEV_DIR = '/dev/'
+
+# Units accepted in relative --since/--until times, as in last(1).
+RELATIVE_UNITS = {
+    's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
+    'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+    'h': 3600, 'hour': 3600, 'hours': 3600,
+    'd': 86400, 'day': 86400, 'days': 86400,
+    'w': 604800, 'week': 604800, 'weeks': 604800,
+}
+RELATIVE_TIME = re.compile(r'([+-])\s*(\d+(?:\.\d*)?)\s*([a-z]+)')
+
+def parse_time_bound(arg, now=None):
+    """
+    Parse a --since/--until TIME and return it as a Unix timestamp, or None
+    if invalid. Accepts the forms last(1) does: now, today, yesterday,
+    tomorrow, +N/-N with a unit (e.g. -2hours, -3days), hh:mm[:ss] (today),
+    YYYYMMDDhhmmss, and anything the date parser accepts (including
+    @SECONDS).
+    """
+    if now is None:
+        now = time.time()
+    text = arg.strip().lower()
+    midnight = datetime.combine(datetime.fromtimestamp(now).date(), datetime.min.time())
+    days = {'today': 0, 'yesterday': -1, 'tomorrow': 1}
+    if text == 'now':
+        return now
+    if text in days:
+        return (midnight + timedelta(days=days[text])).timestamp()
+
+    match = RELATIVE_TIME.fullmatch(text)
+    if match:
+        sign, amount, unit = match.groups()
+        if unit not in RELATIVE_UNITS:
+            return None
+        offset = float(amount) * RELATIVE_UNITS[unit]
+        return now + offset if sign == '+' else now - offset
+
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            time_of_day = datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+        return datetime.combine(midnight.date(), time_of_day).timestamp()
+    if text.isdigit() and len(text) == 14:
+        try:
+            return datetime.strptime(text, '%Y%m%d%H%M%S').timestamp()
+        except ValueError:
+            return None
+
+    # Imported here so that plain who runs don't pay for it.
+    from date import parse_date_string
+    dt = parse_date_string(arg)
+    if dt is None:
+        return None
+    return dt.timestamp()
+
+def uses_hard_locale():
+    """
+    Switch LC_TIME to the user's locale and return True unless that is C or
+    POSIX, in which case GNU who prints "Mon dd hh:mm" instead of ISO dates.
+    """
+    try:
+        name = locale.setlocale(locale.LC_TIME, '')
+    except locale.Error:
+        return False
+    return name not in ('C', 'POSIX')
+
+def idle_string(when, boottime, now):
+    """
+    Return how long a terminal has been idle: "  .  " if less than a
+    minute, HH:MM if less than a day, " old " otherwise.
+    """
+    if boottime < when <= now:
+        seconds_idle = int(now - when)
+        if seconds_idle < 24 * 60 * 60:
+            if seconds_idle < 60:
+                return "  .  "
+            return f"{seconds_idle // 3600:02d}:{seconds_idle % 3600 // 60:02d}"
+    return " old "
+
+def tty_group_id():
+    try:
+        return grp.getgrnam('tty').gr_gid
+    except KeyError:
+        return None
+
+def canon_host(host, timeout):
+    """
+    Return the canonical name of host, or None if it doesn't resolve within
+    timeout seconds.
+    """
+    # Imported here so that who without --lookup never loads it.
+    from deadline import call_with_deadline
+    infos = call_with_deadline(socket.getaddrinfo, timeout, host, None, 0, 0, 0, socket.AI_CANONNAME)
+    return infos[0][3] if infos and infos[0][3] else None
+
+def address_string(addr_v6):
+    """
+    Format ut_addr_v6 (four 32-bit words in network byte order) as an IPv4 or
+    IPv6 address, or return None if it is unset.
+    """
+    if not any(addr_v6):
+        return None
+    if not any(addr_v6[1:]):
+        return socket.inet_ntop(socket.AF_INET, struct.pack('i', addr_v6[0]))
+    return socket.inet_ntop(socket.AF_INET6, struct.pack('4i', *addr_v6))
+
+class Who:
+    """
+    Formats utmp records the way GNU who does. opts is the parsed argparse
+    namespace with the derived need_*/include_* flags set.
+    """
+
+    def __init__(self, opts, out=sys.stdout):
+        self.opts = opts
+        self.out = out
+        self.now = time.time()
+        self.boottime = 0
+        if uses_hard_locale():
+            self.time_format, self.time_width = '%Y-%m-%d %H:%M', 16
+        else:
+            self.time_format, self.time_width = '%b %e %H:%M', 12
+        self.tty_gid = tty_group_id() if opts.include_mesg else None
+        # wtmp mentions the same few terminals over and over; stat each once.
+        self.tty_status = {}
+
+    def time_string(self, record):
+        return time.strftime(self.time_format, time.localtime(record.tv_sec))
+
+    def print_line(self, user, state, line, time_str, idle, pid, comment, exitstr):
+        opts = self.opts
+        mesg = ' ' + state if opts.include_mesg else ''
+        x_idle = f" {idle:<6}" if opts.include_idle and not opts.short_output else ''
+        x_pid = f" {pid:>10}" if not opts.short_output else ''
+        x_exit = f" {exitstr:<12}" if opts.include_exit else ''
+        buf = (f"{user:<8}{mesg} {line:<12} "
+               f"{time_str:<{self.time_width}}{x_idle}{x_pid} {comment:<8}{x_exit}")
+        self.out.write(buf.rstrip(' ') + '\n')
+
+    def print_heading(self):
+        self.print_line("NAME", ' ', "LINE", "TIME", "IDLE", "PID", "COMMENT", "EXIT")
+
+    def terminal_status(self, line):
+        """
+        Return (mesg, last_change) for a ut_line: whether the terminal is
+        writable by its group ('+', '-', or '?' if it can't be examined) and
+        its last access time (0 if unknown).
+        """
+        status = self.tty_status.get(line)
+        if status is not None:
+            return status
+        # If ut_line contains a space, the device name starts after it.
+        device = line.split(' ', 1)[-1]
+        if not device.startswith('/'):
+            device = DEV_DIR + device
+        try:
+            st = os.stat(device)
+        except OSError:
+            status = ('?', 0)
+        else:
+            writable = bool(st.st_mode & stat.S_IWGRP)
+            if self.tty_gid is not None and st.st_gid != self.tty_gid:
+                writable = False
+            status = ('+' if writable else '-', st.st_atime)
+        self.tty_status[line] = status
+        return status
+
+    def print_user(self, record):
+        opts = self.opts
+        mesg, last_change = self.terminal_status(record.line)
+        idle = idle_string(last_change, self.boottime, self.now)[:6] if last_change else "  ?"
+
+        hoststr = ''
+        if record.host:
+            host, sep, display = record.host.partition(':')
+            address = address_string(record.addr_v6) if opts.ips else None
+            if address:
+                # GNU prints the stored address bare, without parentheses.
+                hoststr = f"{address}:{display}" if sep else address
+            else:
+                if host and opts.lookup:
+                    host = canon_host(host, opts.lookup_timeout) or host
+                hoststr = f"({host}:{display})" if sep else f"({host})"
+        self.print_line(record.user, mesg, record.line, self.time_string(record), idle,
+                        str(record.pid), hoststr, '')
+
+    def print_boottime(self, record):
+        self.print_line('', ' ', "system boot", self.time_string(record), '', '', '', '')
+
+    def print_clockchange(self, record):
+        self.print_line('', ' ', "clock change", self.time_string(record), '', '', '', '')
+
+    def print_runlevel(self, record):
+        last, curr = record.pid // 256 % 256, record.pid % 256
+        last_char = 'S' if last == ord('N') else chr(last)
+        comment = f"last={last_char}" if 32 <= ord(last_char) < 127 else ''
+        self.print_line('', ' ', f"run-level {chr(curr)}", self.time_string(record), '', '', comment, '')
+
+    def print_initspawn(self, record):
+        self.print_line('', ' ', record.line, self.time_string(record), '', str(record.pid),
+                        f"id={record.id}", '')
+
+    def print_login(self, record):
+        self.print_line("LOGIN", ' ', record.line, self.time_string(record), '', str(record.pid),
+                        f"id={record.id}", '')
+
+    def print_deadproc(self, record):
+        self.print_line('', ' ', record.line, self.time_string(record), '', str(record.pid),
+                        f"id={record.id}", f"term={record.termination} exit={record.exit}")
+
+    def scan_entries(self, records, my_line=None):
+        opts = self.opts
+        if opts.heading:
+            self.print_heading()
+        for record in records:
+            ut_type = record.type
+            if my_line is None or record.line == my_line:
+                if opts.need_users and ut_type == utmp.USER_PROCESS and record.user:
+                    self.print_user(record)
+                elif opts.need_runlevel and ut_type == utmp.RUN_LVL:
+                    self.print_runlevel(record)
+                elif opts.need_boottime and ut_type == utmp.BOOT_TIME:
+                    self.print_boottime(record)
+                elif opts.need_clockchange and ut_type == utmp.NEW_TIME:
+                    self.print_clockchange(record)
+                elif opts.need_initspawn and ut_type == utmp.INIT_PROCESS:
+                    self.print_initspawn(record)
+                elif opts.need_login and ut_type == utmp.LOGIN_PROCESS:
+                    self.print_login(record)
+                elif opts.need_deadprocs and ut_type == utmp.DEAD_PROCESS:
+                    self.print_deadproc(record)
+            if ut_type == utmp.BOOT_TIME:
+                self.boottime = record.tv_sec
+
+    def list_entries(self, records):
+        names = [record.user for record in records
+                 if record.type == utmp.USER_PROCESS and record.user]
+        self.out.write(' '.join(names) + f"\n# users={len(names)}\n")
+
+def process_alive(pid):
+    """
+    Like gnulib's READ_UTMP_CHECK_PIDS: False only if pid is known not to
+    exist.
+    """
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+def select_records(f, since, until, check_pids):
+    """
+    Yield the records of an open UtmpFile, restricted to [since, until) by
+    binary search on the record times when either bound is given.
+    """
+    start, stop = 0, len(f)
+    if since is not None:
+        start = f.bisect_time(since)
+    if until is not None:
+        stop = f.bisect_time(until, start)
+    for record in f.records(start=start, stop=stop):
+        if check_pids and record.type == utmp.USER_PROCESS and not process_alive(record.pid):
+            continue
+        yield record
+
+def current_line():
+    """
+    Return stdin's terminal relative to /dev, or None if stdin isn't one.
+    """
+    try:
+        name = os.ttyname(0)
+    except OSError:
+        return None
+    return name[len(DEV_DIR):] if name.startswith(DEV_DIR) else name
+
+def join_time_options(argv):
+    """
+    Rewrite '--since TIME' and '--until TIME' as '--since=TIME' so that
+    relative times such as -2hours are not mistaken for options by argparse.
+    """
+    joined = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--':
+            joined.append(arg)
+            joined.extend(args)
+            break
+        if arg in ('--since', '--until'):
+            value = next(args, None)
+            if value is not None:
+                arg = f"{arg}={value}"
+        joined.append(arg)
+    return joined
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='who',
+        description='Print information about users who are currently logged in.',
+        add_help=False
+    )
+    parser.add_argument('-a', '--all', action='store_true', help='same as -b -d --login -p -r -t -T -u')
+    parser.add_argument('-b', '--boot', action='store_true', help='time of last system boot')
+    parser.add_argument('-d', '--dead', action='store_true', help='print dead processes')
+    parser.add_argument('-H', '--heading', action='store_true', help='print line of column headings')
+    parser.add_argument('--ips', action='store_true', help='print ips instead of hostnames')
+    parser.add_argument('-l', '--login', action='store_true', help='print system login processes')
+    parser.add_argument('--lookup', action='store_true', help='attempt to canonicalize hostnames via DNS')
+    parser.add_argument('-m', dest='my_line_only', action='store_true', help='only hostname and user associated with stdin')
+    parser.add_argument('-p', '--process', action='store_true', help='print active processes spawned by init')
+    parser.add_argument('-q', '--count', action='store_true', help='all login names and number of users logged on')
+    parser.add_argument('-r', '--runlevel', action='store_true', help='print current runlevel')
+    parser.add_argument('-s', '--short', action='store_true', help='print only name, line, and time (default)')
+    parser.add_argument('-t', '--time', action='store_true', help='print last system clock change')
+    parser.add_argument('-T', '-w', '--mesg', '--message', '--writable', dest='mesg', action='store_true',
+                        help="add user's message status as +, - or ?")
+    parser.add_argument('-u', '--users', action='store_true', help='list users logged in')
+    parser.add_argument('--since', metavar='TIME', help='only records from TIME on (default FILE: wtmp)')
+    parser.add_argument('--until', metavar='TIME', help='only records before TIME (default FILE: wtmp)')
+    parser.add_argument('--help', action='store_true', help='display this help and exit')
+    parser.add_argument('--version', action='store_true', help='output version information and exit')
+    parser.add_argument('operands', nargs='*', help='FILE | ARG1 ARG2')
+
+    try:
+        args = parser.parse_args(join_time_options(sys.argv[1:]))
+    except SystemExit:
+        return 1
+
+    if args.help:
+        print(f"""Usage: {parser.prog} [OPTION]... [ FILE | ARG1 ARG2 ]
+Print information about users who are currently logged in.
+
+  -a, --all         same as -b -d --login -p -r -t -T -u
+  -b, --boot        time of last system boot
+  -d, --dead        print dead processes
+  -H, --heading     print line of column headings
+      --ips         print ips instead of hostnames
+  -l, --login       print system login processes
+      --lookup      attempt to canonicalize hostnames via DNS
+  -m                only hostname and user associated with stdin
+  -p, --process     print active processes spawned by init
+  -q, --count       all login names and number of users logged on
+  -r, --runlevel    print current runlevel
+  -s, --short       print only name, line, and time (default)
+  -t, --time        print last system clock change
+  -T, -w, --mesg    add user's message status as +, - or ?
+  -u, --users       list users logged in
+      --message     same as -T
+      --writable    same as -T
+      --since=TIME  only show records from TIME on
+      --until=TIME  only show records before TIME
+      --help        display this help and exit
+      --version     output version information and exit
+
+If FILE is not specified, use {DEFAULT_UTMP_FILE}.  {DEFAULT_WTMP_FILE} as FILE is common.
+If ARG1 ARG2 given, -m presumed: 'am i' or 'mom likes' are usual.
+
+With --since or --until the default FILE is {DEFAULT_WTMP_FILE}, and the records in
+the time range are found by binary search, relying on wtmp being written in
+time order. TIME may be now, today, yesterday, tomorrow, +N or -N followed
+by a unit (s, min, h, days, weeks), hh:mm[:ss], YYYYMMDDhhmmss, or a date
+such as '2024-01-31 12:00' or @SECONDS.""")
+        return 0
+
+    if args.version:
+        print("who (Python port of GNU coreutils) 1.0\nThis is free software: you are free to change and redistribute it.\nThere is NO WARRANTY, to the extent permitted by law.\n\nWritten by Junaid Rahman.")
+        return 0
+
+    args.need_users = args.users
+    args.need_boottime = args.boot
+    args.need_deadprocs = args.dead
+    args.need_login = args.login
+    args.need_initspawn = args.process
+    args.need_runlevel = args.runlevel
+    args.need_clockchange = args.time
+    args.include_mesg = args.mesg
+    args.include_idle = args.dead or args.login or args.runlevel or args.users
+    args.include_exit = args.dead
+    args.short_output = args.short
+    args.lookup_timeout = 2.0
+    if args.all:
+        args.need_users = args.need_boottime = args.need_deadprocs = args.need_login = True
+        args.need_initspawn = args.need_runlevel = args.need_clockchange = True
+        args.include_mesg = args.include_idle = args.include_exit = True
+    if not any([args.all, args.boot, args.dead, args.login, args.process,
+                args.runlevel, args.time, args.users]):
+        args.need_users = True
+        args.short_output = True
+    if args.include_exit:
+        args.short_output = False
+
+    since = until = None
+    for option, value in (('since', args.since), ('until', args.until)):
+        if value is None:
+            continue
+        bound = parse_time_bound(value)
+        if bound is None:
+            print(f"who: invalid time value '{value}'", file=sys.stderr)
+            return 1
+        if option == 'since':
+            since = bound
+        else:
+            until = bound
+    time_query = since is not None or until is not None
+
+    my_line_only = args.my_line_only
+    if len(args.operands) == 0:
+        filename = DEFAULT_WTMP_FILE if time_query else DEFAULT_UTMP_FILE
+        check_pids = not time_query
+    elif len(args.operands) == 1:
+        filename = args.operands[0]
+        check_pids = False
+    elif len(args.operands) == 2:
+        my_line_only = True
+        filename = DEFAULT_UTMP_FILE
+        check_pids = True
+    else:
+        print(f"who: extra operand '{args.operands[2]}'", file=sys.stderr)
+        print(f"Try '{parser.prog} --help' for more information.", file=sys.stderr)
+        return 1
+
+    my_line = None
+    if my_line_only:
+        my_line = current_line()
+        if my_line is None:
+            return 0
+
+    who = Who(args)
+    try:
+        with utmp.UtmpFile(filename) as f:
+            records = select_records(f, since, until, check_pids)
+            if args.count:
+                who.list_entries(records)
+            else:
+                who.scan_entries(records, my_line)
+            records.close()
+        sys.stdout.flush()
+    except FileNotFoundError:
+        # Like GNU who, a missing file just means nobody is logged in.
+        if args.count:
+            who.list_entries([])
+        else:
+            who.scan_entries([])
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except OSError as e:
+        print(f"who: {filename}: {e.strerror}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,9 +6,10 @@ Python port of GNU coreutils whoami
 
 import sys
 import os
-import pwd
 import argparse
 
+import nsscache
+
 def main():
     parser = argparse.ArgumentParser(
         prog='whoami',
@@ -49,7 +50,7 @@ def main():
     
     try:
         uid = os.geteuid()
-        pw_entry = pwd.getpwuid(uid)
+        pw_entry = nsscache.getpwuid(uid)
         print(pw_entry.pw_name)
         return 0
         
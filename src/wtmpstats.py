@@ -0,0 +1,140 @@
+"""
+wtmpstats - login session statistics from wtmp, like ac and last
+Part of the Python port of GNU coreutils
+
+A session starts with a USER_PROCESS record and ends with the next
+USER_PROCESS or DEAD_PROCESS record for the same terminal (ut_line, or
+ut_id for records without a line), or with the next reboot or shutdown
+record; sessions still open at the end of the file run until now. The
+records are streamed once, with the open sessions in a dict keyed by
+terminal, and the results are kept in compact arrays indexed by user and
+by day.
+
+Clock changes (NEW_TIME/OLD_TIME records) are not corrected for, as in
+last(1).
+"""
+
+import struct
+import time
+from array import array
+from datetime import date
+
+import utmp
+
+# ut_type, ut_line, ut_id, ut_user and tv_sec only.
+_EVENT = struct.Struct(
+    f'h{utmp.LINE_OFFSET - 2}x32s4s32s{utmp.TIME_OFFSET - utmp.USER_OFFSET - 32}x'
+    f'i{utmp.UTMP_STRUCT_SIZE - utmp.TIME_OFFSET - 4}x')
+
+# Local dates are looked up once per quarter of an hour: every time zone
+# offset, and every change to one, falls on a multiple of 15 minutes.
+_DAY_STEP = 900
+
+
+class SessionStats:
+    """
+    Aggregated sessions. users[i] is a user name, connect[i] its total
+    connect time in seconds and sessions[i] its number of sessions.
+    day_sessions[d] is the number of sessions started on local date
+    first_day + d (a proleptic Gregorian ordinal). peak is the largest
+    number of sessions open at once, first reached at peak_time.
+    """
+    __slots__ = ('users', 'connect', 'sessions', 'first_day', 'day_sessions',
+                 'peak', 'peak_time', 'still_open')
+
+    def __init__(self):
+        self.users = []
+        self.connect = array('d')
+        self.sessions = array('L')
+        self.first_day = 0
+        self.day_sessions = array('L')
+        self.peak = 0
+        self.peak_time = None
+        self.still_open = 0
+
+    def per_day(self):
+        """Yield (datetime.date, sessions) for every day with sessions."""
+        for offset, count in enumerate(self.day_sessions):
+            if count:
+                yield date.fromordinal(self.first_day + offset), count
+
+
+def _local_day(quarter, cache):
+    day = cache.get(quarter)
+    if day is None:
+        day = cache[quarter] = date.fromtimestamp(quarter * _DAY_STEP).toordinal()
+    return day
+
+
+def _set_days(stats, day_counts):
+    """Store a {day ordinal: sessions} dict as a dense array."""
+    if day_counts:
+        stats.first_day = min(day_counts)
+        stats.day_sessions = array('L', [0]) * (max(day_counts) - stats.first_day + 1)
+        for day, count in day_counts.items():
+            stats.day_sessions[day - stats.first_day] = count
+
+
+def _aggregate(f, now):
+    """Stream the records of the open UtmpFile f once into a SessionStats."""
+    stats = SessionStats()
+    user_index = {}
+    name_index = {}
+    open_sessions = {}
+    day_counts = {}
+    day_cache = {}
+    connect, sessions = stats.connect, stats.sessions
+    USER_PROCESS, DEAD_PROCESS = utmp.USER_PROCESS, utmp.DEAD_PROCESS
+    BOOT_TIME, RUN_LVL = utmp.BOOT_TIME, utmp.RUN_LVL
+
+    with f.view() as view:
+        for ut_type, line, ut_id, user, tv_sec in _EVENT.iter_unpack(view):
+            if ut_type == USER_PROCESS or ut_type == DEAD_PROCESS:
+                key = line if line[0] else ut_id
+                previous = open_sessions.pop(key, None)
+                if previous is not None and tv_sec > previous[1]:
+                    connect[previous[0]] += tv_sec - previous[1]
+                if ut_type == USER_PROCESS and user[0]:
+                    index = user_index.get(user)
+                    if index is None:
+                        # Padding after the NUL can differ; group by name.
+                        # A name that decodes to nothing is no user, as in
+                        # users, and is remembered as -1.
+                        name = utmp.c_string(user)
+                        index = name_index.get(name) if name else -1
+                        if index is None:
+                            index = name_index[name] = len(stats.users)
+                            stats.users.append(name)
+                            connect.append(0.0)
+                            sessions.append(0)
+                        user_index[user] = index
+                    if index < 0:
+                        continue
+                    sessions[index] += 1
+                    day = _local_day(tv_sec // _DAY_STEP, day_cache)
+                    day_counts[day] = day_counts.get(day, 0) + 1
+                    open_sessions[key] = (index, tv_sec)
+                    if len(open_sessions) > stats.peak:
+                        stats.peak, stats.peak_time = len(open_sessions), tv_sec
+            elif ut_type == BOOT_TIME or (ut_type == RUN_LVL and user.startswith(b'shutdown\0')):
+                for index, start in open_sessions.values():
+                    if tv_sec > start:
+                        connect[index] += tv_sec - start
+                open_sessions.clear()
+
+    for index, start in open_sessions.values():
+        if now > start:
+            connect[index] += now - start
+    stats.still_open = len(open_sessions)
+    _set_days(stats, day_counts)
+    return stats
+
+
+def session_stats(filename, now=None):
+    """
+    Return the SessionStats of a wtmp file.
+    """
+    if now is None:
+        now = int(time.time())
+    with utmp.UtmpFile(filename) as f:
+        return _aggregate(f, now)
@@ -1,6 +1,7 @@
 import subprocess
 import sys
 import os
+import pytest
 
 SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'basename.py'))
 
@@ -22,6 +23,12 @@ def test_suffix_removal():
     assert result.returncode == 0
 
 
+@pytest.mark.skipif(os.name == 'nt', reason='drive letters and backslashes are special on Windows')
+def test_suffix_removal_colon_and_backslash():
+    result = run_cli(['-s', '.h', 'x/a:b.h', 'c:.h', '\\x.h'])
+    assert result.stdout.splitlines() == ['a:b', 'c:', '\\x']
+
+
 def test_suffix_flag():
     result = run_cli(['-s', '.h', 'include/stdio.h'])
     assert result.stdout.strip() == 'stdio'
@@ -64,3 +71,38 @@ def test_version():
     result = run_cli(['--version'])
     assert 'basename (Python port of GNU coreutils)' in result.stdout
     assert result.returncode == 0
+
+
+def test_files0_from_stdin():
+    result = subprocess.run([sys.executable, SCRIPT, '--files0-from=-'],
+                            input=b'/usr/bin/sort\0a/b/\0last', capture_output=True)
+    assert result.stdout == b'sort\nb\nlast\n'
+    assert result.returncode == 0
+
+
+def test_files0_from_file_with_suffix(tmp_path):
+    names = tmp_path / 'names'
+    names.write_bytes(b'include/stdio.h\0src/main.c\0')
+    result = subprocess.run([sys.executable, SCRIPT, '-z', '-s', '.h', f'--files0-from={names}'],
+                            capture_output=True)
+    assert result.stdout == b'stdio\0main.c\0'
+    assert result.returncode == 0
+
+
+def test_non_utf8_names_pass_through():
+    result = subprocess.run([sys.executable, SCRIPT, '--files0-from=-'],
+                            input=b'/tmp/\xff\xfe.log\0', capture_output=True)
+    assert result.stdout == b'\xff\xfe.log\n'
+    assert result.returncode == 0
+
+
+def test_files0_from_with_operand():
+    result = run_cli(['--files0-from=-', 'extra'])
+    assert 'file operands cannot be combined with --files0-from' in result.stderr
+    assert result.returncode == 1
+
+
+def test_files0_from_missing_file():
+    result = run_cli(['--files0-from=/no/such/file'])
+    assert 'cannot open' in result.stderr
+    assert result.returncode == 1
@@ -0,0 +1,174 @@
+import subprocess
+import sys
+import os
+import shutil
+import socket
+import pytest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'cat.py'))
+
+# Large enough to span blocks, with lines and CRLFs cut at block boundaries.
+SAMPLE = (b''.join(b'line %d\r\n\n\n\tx\x01\x7f\xe9\x89\n' % i for i in range(200000))
+          + bytes(range(256)) * 64 + b'\n\n\nend\r')
+
+
+def run_cli(args, input=None):
+    return subprocess.run([sys.executable, SCRIPT] + args, input=input, capture_output=True)
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / 'a').write_bytes(b'\n\n\nfirst\n\n')
+    (tmp_path / 'b').write_bytes(b'\n\nsecond')
+    (tmp_path / 'c').write_bytes(b' continued\n')
+    (tmp_path / 'big').write_bytes(SAMPLE)
+    return tmp_path
+
+
+def test_cat_concatenates(files):
+    result = run_cli([str(files / 'a'), '-', str(files / 'c')], input=b'stdin\n')
+    assert result.returncode == 0
+    assert result.stdout == b'\n\n\nfirst\n\nstdin\n continued\n'
+
+
+def test_cat_stdin_by_default():
+    result = run_cli([], input=SAMPLE)
+    assert result.returncode == 0
+    assert result.stdout == SAMPLE
+
+
+def test_cat_number_and_squeeze(files):
+    result = run_cli(['-sn', str(files / 'a'), str(files / 'b'), str(files / 'c')])
+    assert result.stdout == (b'     1\t\n     2\tfirst\n     3\t\n'
+                             b'     4\tsecond continued\n')
+    result = run_cli(['-b', str(files / 'a'), str(files / 'b'), str(files / 'c')])
+    assert result.stdout == b'\n\n\n     1\tfirst\n\n\n\n     2\tsecond continued\n'
+
+
+def test_cat_show_all():
+    result = run_cli(['-A'], input=b'a\tb\x01\x80\xff\x7f\x89\r\nc\r')
+    assert result.stdout == b'a^Ib^AM-^@M-^?^?M-^I^M$\nc^M'
+    result = run_cli(['-E'], input=b'a\r\nb\rc\n')
+    assert result.stdout == b'a^M$\nb\rc$\n'
+
+
+@pytest.mark.skipif(shutil.which('cat') is None, reason='system cat not available')
+@pytest.mark.parametrize('options', [[], ['-n'], ['-b'], ['-s'], ['-sn'], ['-E'], ['-T'], ['-v'],
+                                     ['-A'], ['-e'], ['-t'], ['-bsA'], ['-nE']])
+def test_cat_matches_system(files, options):
+    names = [str(files / name) for name in ('a', 'big', 'b', 'c', 'a')]
+    expected = subprocess.run(['cat'] + options + names, capture_output=True)
+    result = run_cli(options + names)
+    assert result.returncode == expected.returncode
+    assert result.stdout == expected.stdout
+
+
+# Records which copy calls cat.py makes for one run.
+COPY_RUNNER = f"""
+import os, sys
+sys.path.insert(0, {os.path.dirname(SCRIPT)!r})
+import cat
+calls = []
+def recording(name, function):
+    def wrapper(*args):
+        calls.append(name)
+        return function(*args)
+    return wrapper
+for name in ('copy_file_range', 'sendfile', 'splice', 'readv'):
+    setattr(os, name, recording(name, getattr(os, name)))
+if sys.argv[1] == 'unsupported':
+    def unsupported(*args):
+        raise OSError(38, 'Function not implemented')
+    os.copy_file_range = os.sendfile = os.splice = unsupported
+sys.argv = ['cat'] + sys.argv[2:]
+status = cat.main()
+print(' '.join(sorted(set(calls))), file=sys.stderr)
+sys.exit(status)
+"""
+
+
+def copy_calls(args, mode='record', stdout=subprocess.PIPE, **kwargs):
+    result = subprocess.run([sys.executable, '-c', COPY_RUNNER, mode] + args, stdout=stdout,
+                            stderr=subprocess.PIPE, **kwargs)
+    assert result.returncode == 0, result.stderr
+    return result, result.stderr.decode().split()
+
+
+def test_cat_file_to_file_copy_file_range(files):
+    with open(files / 'out', 'wb') as out:
+        _, calls = copy_calls([str(files / 'big'), str(files / 'c')], stdout=out)
+    assert (files / 'out').read_bytes() == SAMPLE + b' continued\n'
+    assert 'copy_file_range' in calls and 'sendfile' not in calls
+
+
+def test_cat_file_to_pipe_sendfile(files):
+    result, calls = copy_calls([str(files / 'big')])
+    assert result.stdout == SAMPLE
+    assert 'sendfile' in calls and 'copy_file_range' not in calls
+
+
+def test_cat_pipe_to_pipe_splice():
+    result, calls = copy_calls([], input=SAMPLE)
+    assert result.stdout == SAMPLE
+    assert calls == ['readv', 'splice']
+
+
+def test_cat_file_to_socket(files):
+    parent, child = socket.socketpair()
+    with parent, child:
+        process = subprocess.Popen([sys.executable, SCRIPT, str(files / 'big')], stdout=child)
+        child.close()
+        received = b''.join(iter(lambda: parent.recv(1 << 16), b''))
+        assert process.wait() == 0
+    assert received == SAMPLE
+
+
+def test_cat_falls_back_to_read_write(files):
+    with open(files / 'out', 'wb') as out:
+        _, calls = copy_calls([str(files / 'big'), '-'], 'unsupported', stdout=out, input=b'tail\n')
+    assert (files / 'out').read_bytes() == SAMPLE + b'tail\n'
+    assert calls == ['readv']
+
+
+def test_cat_reads_proc_files():
+    result = run_cli(['/proc/self/stat'])
+    assert result.returncode == 0
+    assert result.stdout.startswith(b'%d (' % int(result.stdout.split()[0]))
+
+
+def test_cat_errors(files):
+    result = run_cli(['/no/such/file', str(files / 'c'), str(files)])
+    assert result.returncode == 1
+    assert result.stdout == b' continued\n'
+    assert b'cat: /no/such/file: No such file or directory' in result.stderr
+    assert b': Is a directory' in result.stderr
+
+
+def test_cat_input_is_output(files):
+    with open(files / 'c', 'ab') as out:
+        result = subprocess.run([sys.executable, SCRIPT, str(files / 'c')], stdout=out,
+                                stderr=subprocess.PIPE)
+    assert result.returncode == 1
+    assert b'input file is output file' in result.stderr
+    assert (files / 'c').read_bytes() == b' continued\n'
+
+
+def test_cat_broken_pipe(files):
+    process = subprocess.Popen([sys.executable, SCRIPT, '-n', str(files / 'big')],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.read(10)
+    process.stdout.close()
+    assert process.wait() == 1
+    assert process.stderr.read() == b''
+
+
+def test_cat_help():
+    result = run_cli(['--help'])
+    assert b'Usage: cat' in result.stdout
+    assert result.returncode == 0
+
+
+def test_cat_version():
+    result = run_cli(['--version'])
+    assert b'cat (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import os
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'dirname.py'))
+
+
+def run_cli(args):
+    result = subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
+    return result
+
+
+def test_basic_usage():
+    result = run_cli(['/usr/bin/'])
+    assert result.stdout == '/usr\n'
+    assert result.returncode == 0
+
+
+def test_no_slash():
+    result = run_cli(['stdio.h'])
+    assert result.stdout == '.\n'
+    assert result.returncode == 0
+
+
+def test_multiple_names():
+    result = run_cli(['dir1/str', 'dir2/str'])
+    assert result.stdout.split('\n')[:2] == ['dir1', 'dir2']
+    assert result.returncode == 0
+
+
+def test_edge_cases():
+    result = run_cli(['--', '/', '//a', 'a//b//', '', 'a/'])
+    assert result.stdout.split('\n')[:5] == ['/', '/', 'a', '.', '.']
+    assert result.returncode == 0
+
+
+def test_zero_terminated():
+    result = run_cli(['-z', 'a/b', 'c/d'])
+    assert result.stdout == 'a\0c\0'
+    assert result.returncode == 0
+
+
+def test_files0_from_stdin():
+    result = subprocess.run([sys.executable, SCRIPT, '--files0-from=-'],
+                            input=b'/usr/bin/sort\0a/\xff/b\0last', capture_output=True)
+    assert result.stdout == b'/usr/bin\na/\xff\n.\n'
+    assert result.returncode == 0
+
+
+def test_files0_from_with_operand():
+    result = run_cli(['--files0-from=-', 'extra'])
+    assert 'file operands cannot be combined with --files0-from' in result.stderr
+    assert result.returncode == 1
+
+
+def test_missing_operand():
+    result = run_cli([])
+    assert 'missing operand' in result.stderr
+    assert result.returncode == 1
+
+
+def test_help():
+    result = run_cli(['--help'])
+    assert 'Usage:' in result.stdout
+    assert result.returncode == 0
+
+
+def test_version():
+    result = run_cli(['--version'])
+    assert 'dirname (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
@@ -0,0 +1,120 @@
+import subprocess
+import sys
+import os
+import grp
+import pwd
+import shutil
+
+import pytest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'groups.py'))
+
+def run_cli(args):
+    result = subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
+    return result
+
+# Runs groups in-process against a fake user and group database.
+STUB_RUNNER = """
+import sys, grp, pwd
+sys.path.insert(0, {src!r})
+sys.argv = ['groups'] + sys.argv[1:]
+import groups, nsscache
+users = {{'alice': pwd.struct_passwd(['alice', 'x', 5001, 5001, '', '/home/alice', '/bin/sh'])}}
+names = {{5001: 'alice', 5003: 'zeta', 5002: 'alpha'}}
+def getpwnam(name):
+    return users[name]
+def getgrgid(gid):
+    return grp.struct_group([names[gid], 'x', gid, []])
+nsscache.getpwnam = getpwnam
+nsscache.getgrgid = getgrgid
+nsscache.getgrouplist = lambda user, gid: [5001, 5003, 5002, 5003, 4242]
+sys.exit(groups.main())
+"""
+
+def run_stubbed(args):
+    code = STUB_RUNNER.format(src=os.path.dirname(SCRIPT))
+    return subprocess.run([sys.executable, '-c', code] + list(args), capture_output=True, text=True)
+
+def current_group_names():
+    gids = [os.getgid()]
+    if os.getegid() != os.getgid():
+        gids.append(os.getegid())
+    gids += [g for g in dict.fromkeys(os.getgroups()) if g not in gids]
+    return [grp.getgrgid(g).gr_name for g in gids]
+
+def test_groups_current_process():
+    result = run_cli([])
+    assert result.returncode == 0
+    assert result.stdout.split() == current_group_names()
+
+def test_groups_named_user():
+    name = pwd.getpwuid(os.getuid()).pw_name
+    result = run_cli([name])
+    assert result.returncode == 0
+    assert result.stdout.startswith(f"{name} : ")
+    assert grp.getgrgid(pwd.getpwnam(name).pw_gid).gr_name == result.stdout.split()[2]
+
+@pytest.mark.skipif(shutil.which('groups') is None, reason='system groups not available')
+def test_groups_matches_system():
+    name = pwd.getpwuid(os.getuid()).pw_name
+    args = [name, 'root', name]
+    expected = subprocess.run(['groups'] + args, capture_output=True, text=True)
+    assert run_cli(args).stdout == expected.stdout
+
+def test_groups_database_order_and_missing_name():
+    result = run_stubbed(['alice'])
+    # Primary group first, then group database order, without duplicates;
+    # a GID without a name is printed as a number and reported.
+    assert result.stdout == 'alice : alice zeta alpha 4242\n'
+    assert 'groups: cannot find name for group ID 4242' in result.stderr
+    assert result.returncode == 1
+
+def test_groups_no_such_user():
+    name = pwd.getpwuid(os.getuid()).pw_name
+    result = run_cli(['nouserdoesnotexist', name])
+    assert "groups: 'nouserdoesnotexist': no such user" in result.stderr
+    assert result.stdout.startswith(f"{name} : ")
+    assert result.returncode == 1
+
+def test_groups_repeated_users():
+    # Many operands are looked up one by one, each answer memoized.
+    name = pwd.getpwuid(os.getuid()).pw_name
+    single = run_cli([name])
+    result = run_cli([name] * 10)
+    assert result.returncode == 0
+    assert result.stdout == single.stdout * 10
+
+COUNT_RUNNER = """
+import sys
+sys.path.insert(0, {src!r})
+sys.argv = ['groups'] + sys.argv[1:]
+import groups, nsscache
+status = groups.main()
+print(nsscache.nss_calls, file=sys.stderr)
+sys.exit(status)
+"""
+
+def test_groups_users_from_uses_one_pass(tmp_path):
+    names = [p.pw_name for p in pwd.getpwall()][:20]
+    users = tmp_path / 'users'
+    users.write_text(''.join(name + '\n' for name in names))
+    code = COUNT_RUNNER.format(src=os.path.dirname(SCRIPT))
+    result = subprocess.run([sys.executable, '-c', code, f'--users-from={users}'],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout == run_cli(names).stdout
+    # One getpwall() and one getgrall() answer everything.
+    assert int(result.stderr.splitlines()[-1]) == 2
+    result = run_cli(['--users-from=/no/such/file'])
+    assert result.returncode == 1
+    assert "groups: cannot read '/no/such/file'" in result.stderr
+
+def test_groups_help():
+    result = run_cli(['--help'])
+    assert 'Usage:' in result.stdout
+    assert result.returncode == 0
+
+def test_groups_version():
+    result = run_cli(['--version'])
+    assert 'groups (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
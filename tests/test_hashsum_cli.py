@@ -0,0 +1,138 @@
+import hashlib
+import subprocess
+import sys
+import os
+import shutil
+import pytest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+PROGRAMS = {'md5sum': 'md5', 'sha1sum': 'sha1', 'sha224sum': 'sha224', 'sha256sum': 'sha256',
+            'sha384sum': 'sha384', 'sha512sum': 'sha512'}
+
+# Spans several read blocks.
+SAMPLE = b''.join(b'line %d\n' % i for i in range(100000))
+
+
+def run_cli(prog, args, input=None, cwd=None):
+    return subprocess.run([sys.executable, os.path.join(SRC, prog + '.py')] + args, input=input,
+                          capture_output=True, cwd=cwd)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest().encode()
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / 'a').write_bytes(b'alpha\n')
+    (tmp_path / 'big').write_bytes(SAMPLE)
+    (tmp_path / 'empty').write_bytes(b'')
+    (tmp_path / 'back\\slash').write_bytes(b'x')
+    (tmp_path / 'new\nline').write_bytes(b'y')
+    return tmp_path
+
+
+@pytest.mark.parametrize('prog', sorted(PROGRAMS))
+def test_sum_digests(files, prog):
+    result = run_cli(prog, ['a', 'big', '-'], input=b'stdin', cwd=files)
+    assert result.returncode == 0
+    expected = [hashlib.new(PROGRAMS[prog], data).hexdigest().encode() + b'  ' + name
+                for data, name in ((b'alpha\n', b'a'), (SAMPLE, b'big'), (b'stdin', b'-'))]
+    assert result.stdout.splitlines() == expected
+
+
+@pytest.mark.skipif(shutil.which('sha256sum') is None, reason='system sha256sum not available')
+@pytest.mark.parametrize('prog', sorted(PROGRAMS))
+@pytest.mark.parametrize('options', [[], ['--tag'], ['-b'], ['-z']])
+def test_sum_matches_system(files, prog, options):
+    names = ['a', 'big', 'empty', 'back\\slash', 'new\nline']
+    expected = subprocess.run([prog] + options + names, capture_output=True, cwd=files)
+    assert run_cli(prog, options + names, cwd=files).stdout == expected.stdout
+
+
+def test_sum_escapes_names(files):
+    result = run_cli('sha256sum', ['back\\slash', 'new\nline'], cwd=files)
+    assert result.stdout == (b'\\' + sha256(b'x') + b'  back\\\\slash\n'
+                             + b'\\' + sha256(b'y') + b'  new\\nline\n')
+    result = run_cli('sha256sum', ['--tag', 'back\\slash'], cwd=files)
+    assert result.stdout == b'\\SHA256 (back\\\\slash) = ' + sha256(b'x') + b'\n'
+
+
+def test_sum_many_files_in_order(files):
+    names = ['a', 'big', 'empty', 'missing'] * 25
+    result = run_cli('sha256sum', ['-j', '4'] + names, cwd=files)
+    expected = run_cli('sha256sum', ['-j', '1'] + names, cwd=files)
+    assert result.returncode == 1
+    assert result.stdout == expected.stdout
+    assert result.stdout.splitlines()[:3] == [sha256(b'alpha\n') + b'  a', sha256(SAMPLE) + b'  big',
+                                              sha256(b'') + b'  empty']
+    assert result.stderr.count(b'sha256sum: missing: No such file or directory') == 25
+
+
+def test_check(files):
+    sums = run_cli('sha256sum', ['a', 'big', 'back\\slash', 'new\nline'], cwd=files).stdout
+    (files / 'SUMS').write_bytes(sums)
+    result = run_cli('sha256sum', ['-c', 'SUMS'], cwd=files)
+    assert result.returncode == 0
+    assert result.stdout == b'a: OK\nbig: OK\nback\\slash: OK\n\\new\\nline: OK\n'
+    (files / 'a').write_bytes(b'changed\n')
+    result = run_cli('sha256sum', ['-c', '-j', '3', 'SUMS'], cwd=files)
+    assert result.returncode == 1
+    assert result.stdout.splitlines()[:2] == [b'a: FAILED', b'big: OK']
+    assert result.stderr == b'sha256sum: WARNING: 1 computed checksum did NOT match\n'
+
+
+def test_check_formats(files):
+    digest = sha256(b'alpha\n')
+    listing = (b'# comment\n\n' + digest.upper() + b' *a\r\n'
+               + b'SHA256 (big) = ' + sha256(SAMPLE) + b'\n'
+               + b'not a checksum line\n')
+    result = run_cli('sha256sum', ['-c', '-w'], input=listing, cwd=files)
+    assert result.returncode == 0
+    assert result.stdout == b'a: OK\nbig: OK\n'
+    assert result.stderr == (b"sha256sum: 'standard input': 5: improperly formatted SHA256 checksum line\n"
+                             b'sha256sum: WARNING: 1 line is improperly formatted\n')
+    assert run_cli('sha256sum', ['-c', '--strict'], input=listing, cwd=files).returncode == 1
+    # The "DIGEST NAME" form of BSD's -r.
+    result = run_cli('sha256sum', ['-c'], input=digest + b' a\n', cwd=files)
+    assert result.stdout == b'a: OK\n'
+    result = run_cli('sha256sum', ['-c'], input=b'junk\n')
+    assert result.returncode == 1
+    assert b"'standard input': no properly formatted checksum lines found" in result.stderr
+
+
+def test_check_missing_files(files):
+    listing = sha256(b'alpha\n') + b'  a\n' + sha256(b'') + b'  missing\n'
+    result = run_cli('sha256sum', ['-c'], input=listing, cwd=files)
+    assert result.returncode == 1
+    assert result.stdout == b'a: OK\nmissing: FAILED open or read\n'
+    assert b'WARNING: 1 listed file could not be read' in result.stderr
+    result = run_cli('sha256sum', ['-c', '--ignore-missing', '--quiet'], input=listing, cwd=files)
+    assert result.returncode == 0
+    assert result.stdout == result.stderr == b''
+    result = run_cli('sha256sum', ['-c', '--ignore-missing'], input=listing.split(b'\n', 1)[1], cwd=files)
+    assert result.returncode == 1
+    assert b'no file was verified' in result.stderr
+    result = run_cli('sha256sum', ['-c', '--status'], input=listing, cwd=files)
+    assert result.returncode == 1
+    assert result.stdout == b''
+
+
+def test_option_errors(files):
+    for args in (['--tag', '-c'], ['-b', '-c'], ['--quiet'], ['--ignore-missing'], ['-j', 'x']):
+        result = run_cli('md5sum', args + ['a'], cwd=files)
+        assert result.returncode == 1
+        assert result.stderr.startswith(b'md5sum: ')
+
+
+def test_sum_help():
+    result = run_cli('sha512sum', ['--help'])
+    assert b'Usage: sha512sum' in result.stdout
+    assert b'SHA512 (512-bit) checksums' in result.stdout
+    assert result.returncode == 0
+
+
+def test_sum_version():
+    result = run_cli('md5sum', ['--version'])
+    assert b'md5sum (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
@@ -2,10 +2,18 @@ import subprocess
 import sys
 import os
 import re
+import time
+import pytest
 
 SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'hostid.py'))
 
 
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep every hostid run away from the real ~/.cache."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+
+
 def run_cli(args):
     """Helper to run the hostid script with arguments."""
     result = subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
@@ -39,3 +47,65 @@ def test_version():
     result = run_cli(['--version'])
     assert result.returncode == 0
     assert 'hostid (Python port of GNU coreutils)' in result.stdout
+
+
+STUB_RUNNER = """
+import os, socket, sys, time
+sys.path.insert(0, {src!r})
+import hostid
+hostid.HOSTID_FILE = os.devnull
+hostid.RESOLVE_TIMEOUT = 0.5
+if hasattr(os, 'gethostid'):
+    del os.gethostid
+
+def stub_gethostbyname(name):
+    mode = os.environ['STUB_RESOLVER']
+    if mode == 'hang':
+        time.sleep(60)
+    if mode == 'fail':
+        raise socket.gaierror('stub failure')
+    return '10.1.2.3'
+
+socket.gethostbyname = stub_gethostbyname
+sys.exit(hostid.main())
+"""
+
+
+def run_with_stub_resolver(mode, cache_home):
+    """Run hostid with no /etc/hostid, no gethostid() and a stub resolver."""
+    env = os.environ.copy()
+    env['STUB_RESOLVER'] = mode
+    env['XDG_CACHE_HOME'] = str(cache_home)
+    code = STUB_RUNNER.format(src=os.path.dirname(SCRIPT))
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+
+
+def test_resolver_fallback_is_cached(tmp_path):
+    """The address-derived ID is stored and served from the cache afterwards."""
+    result = run_with_stub_resolver('ok', tmp_path)
+    assert result.returncode == 0
+    assert result.stdout.strip() == '0a010203'
+    assert (tmp_path / 'py-coreutils' / 'hostid').exists()
+
+    # A hanging resolver is never consulted once the ID is cached.
+    start = time.monotonic()
+    result = run_with_stub_resolver('hang', tmp_path)
+    assert result.returncode == 0
+    assert result.stdout.strip() == '0a010203'
+    assert time.monotonic() - start < 5
+
+
+def test_hanging_resolver_is_bounded(tmp_path):
+    """A resolver that never answers costs the deadline, not its own timeout."""
+    start = time.monotonic()
+    result = run_with_stub_resolver('hang', tmp_path)
+    assert time.monotonic() - start < 10
+    assert result.returncode == 1
+    assert 'cannot get host id' in result.stderr
+
+
+def test_failing_resolver(tmp_path):
+    result = run_with_stub_resolver('fail', tmp_path)
+    assert result.returncode == 1
+    assert 'cannot get host id' in result.stderr
+    assert not (tmp_path / 'py-coreutils' / 'hostid').exists()
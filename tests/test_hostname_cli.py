@@ -2,6 +2,8 @@ import subprocess
 import sys
 import os
 import socket
+import ipaddress
+import time
 
 SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'hostname.py'))
 
@@ -47,3 +49,83 @@ def test_version():
     result = run_cli(['--version'])
     assert result.returncode == 0
     assert 'hostname (Python port of GNU coreutils)' in result.stdout
+
+
+def test_all_ip_addresses():
+    """-I lists interface addresses without loopback or link-local ones."""
+    result = run_cli(['-I'])
+    if not sys.platform.startswith('linux'):
+        assert result.returncode == 1
+        return
+    assert result.returncode == 0
+    for token in result.stdout.split():
+        address = ipaddress.ip_address(token)
+        assert not address.is_loopback
+        assert not address.is_link_local
+
+
+def test_query_options_exclusive():
+    result = run_cli(['-f', '-I'])
+    assert result.returncode == 1
+    assert 'mutually exclusive' in result.stderr
+
+
+STUB_RUNNER = """
+import os, socket, sys, time
+sys.path.insert(0, {src!r})
+import hostname
+hostname.RESOLVE_TIMEOUT = 0.5
+real_getaddrinfo = socket.getaddrinfo
+
+def stub_getaddrinfo(host, port, family=0, *args):
+    mode = os.environ['STUB_RESOLVER']
+    if mode == 'hang' or (mode == 'hang6' and family == socket.AF_INET6):
+        time.sleep(60)
+    if family == socket.AF_INET6:
+        return [(family, socket.SOCK_STREAM, 6, '', ('2001:db8::7', 0, 0, 0))]
+    return [(family, socket.SOCK_STREAM, 6, 'box.example.org', ('192.0.2.7', 0))]
+
+socket.getaddrinfo = stub_getaddrinfo
+socket.gethostname = lambda: 'box'
+sys.exit(hostname.main())
+"""
+
+
+def run_with_stub_resolver(args, mode, cache_home):
+    env = os.environ.copy()
+    env['STUB_RESOLVER'] = mode
+    env['XDG_CACHE_HOME'] = str(cache_home)
+    code = STUB_RUNNER.format(src=os.path.dirname(SCRIPT))
+    return subprocess.run([sys.executable, '-c', code] + args, capture_output=True, text=True, env=env)
+
+
+def test_fqdn_and_ip_address(tmp_path):
+    result = run_with_stub_resolver(['-f'], 'ok', tmp_path)
+    assert result.returncode == 0
+    assert result.stdout == 'box.example.org\n'
+    result = run_with_stub_resolver(['-i'], 'ok', tmp_path)
+    assert result.returncode == 0
+    assert result.stdout == '192.0.2.7 2001:db8::7\n'
+
+
+def test_stalled_family_does_not_block(tmp_path):
+    """A stalled AAAA lookup is cut off at the deadline; IPv4 still answers."""
+    start = time.monotonic()
+    result = run_with_stub_resolver(['-i'], 'hang6', tmp_path)
+    assert time.monotonic() - start < 10
+    assert result.returncode == 0
+    assert result.stdout == '192.0.2.7\n'
+
+
+def test_hanging_resolver_and_cache(tmp_path):
+    start = time.monotonic()
+    result = run_with_stub_resolver(['-f'], 'hang', tmp_path)
+    assert time.monotonic() - start < 10
+    assert result.returncode == 1
+    assert 'Name or service not known' in result.stderr
+
+    # Once a lookup succeeded, repeat calls are answered from the cache.
+    assert run_with_stub_resolver(['-f'], 'ok', tmp_path).returncode == 0
+    result = run_with_stub_resolver(['-f'], 'hang', tmp_path)
+    assert result.returncode == 0
+    assert result.stdout == 'box.example.org\n'
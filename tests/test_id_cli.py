@@ -73,3 +73,136 @@ def test_id_cli_conflicting_options():
     result = run_id_cli("-u", "-g")
     assert result.returncode == 1
     assert "cannot print 'only' of more than one choice" in result.stderr
+
+COUNT_RUNNER = """
+import sys
+sys.path.insert(0, {src!r})
+sys.argv = ['id'] + sys.argv[1:]
+import id as id_tool, nsscache
+status = id_tool.main()
+print(nsscache.nss_calls, file=sys.stderr)
+sys.exit(status)
+"""
+
+def run_counting(args, env=None):
+    """Run id in-process and return (result, number of NSS lookups made)."""
+    code = COUNT_RUNNER.format(src=os.path.dirname(os.path.abspath(ID_SCRIPT)))
+    result = subprocess.run([PYTHON_EXEC, '-c', code] + list(args),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+    return result, int(result.stderr.strip().splitlines()[-1])
+
+def test_id_repeated_users_are_memoized():
+    name = pwd.getpwuid(os.getuid()).pw_name
+    single, single_calls = run_counting([name])
+    triple, triple_calls = run_counting([name, name, name])
+    assert triple.returncode == 0
+    assert triple.stdout == single.stdout * 3
+    assert triple_calls == single_calls
+
+ALIAS_RUNNER = """
+import sys, pwd
+sys.path.insert(0, {src!r})
+sys.argv = ['id', 'toor']
+import id as id_tool
+root = ('root', 'x', 0, 0, 'root', '/root', '/bin/sh')
+toor = ('toor', 'x', 0, 0, 'root', '/root', '/bin/csh')
+def getpwnam(name):
+    return pwd.struct_passwd({{'root': root, 'toor': toor}}[name])
+def getpwuid(uid):
+    if uid != 0:
+        raise KeyError(uid)
+    return pwd.struct_passwd(root)
+pwd.getpwnam, pwd.getpwuid = getpwnam, getpwuid
+sys.exit(id_tool.main())
+"""
+
+def test_id_alias_keeps_uid_name():
+    # Like GNU id, the name shown for a UID is getpwuid()'s, not the alias
+    # given on the command line.
+    code = ALIAS_RUNNER.format(src=os.path.dirname(os.path.abspath(ID_SCRIPT)))
+    result = subprocess.run([PYTHON_EXEC, '-c', code], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True)
+    assert result.stdout.startswith('uid=0(root) gid=0(')
+
+GROUP_ORDER_RUNNER = """
+import sys, grp, pwd
+sys.path.insert(0, {src!r})
+sys.argv = ['id'] + sys.argv[1:]
+import id as id_tool, nsscache
+alice = pwd.struct_passwd(['alice', 'x', 5001, 5001, '', '/home/alice', '/bin/sh'])
+names = {{5001: 'alice', 5003: 'zeta', 5002: 'alpha'}}
+nsscache.getpwnam = lambda name: alice
+nsscache.getpwuid = lambda uid: alice
+nsscache.getgrgid = lambda gid: grp.struct_group([names[gid], 'x', gid, []])
+nsscache.getgrouplist = lambda user, gid: [5003, 5001, 5002, 5003]
+sys.exit(id_tool.main())
+"""
+
+def test_id_default_groups_in_database_order():
+    code = GROUP_ORDER_RUNNER.format(src=os.path.dirname(os.path.abspath(ID_SCRIPT)))
+    def run(*args):
+        return subprocess.run([PYTHON_EXEC, '-c', code] + list(args), stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, text=True).stdout
+    assert run('alice') == 'uid=5001(alice) gid=5001(alice) groups=5001(alice),5003(zeta),5002(alpha)\n'
+    assert run('-G', 'alice') == '5001 5003 5002\n'
+
+def test_id_missing_user_negative_cache():
+    result, calls = run_counting(['nouserdoesnotexist', 'nouserdoesnotexist'])
+    assert result.returncode == 1
+    assert result.stderr.count('no such user') == 2
+    assert calls == 1
+
+def test_id_disk_cache(tmp_path):
+    env = os.environ.copy()
+    env['PYCOREUTILS_NSS_CACHE_TTL'] = '60'
+    env['XDG_CACHE_HOME'] = str(tmp_path)
+    name = pwd.getpwuid(os.getuid()).pw_name
+    first, first_calls = run_counting([name], env)
+    second, second_calls = run_counting([name], env)
+    assert first_calls > 0
+    assert second_calls == 0
+    assert second.stdout == first.stdout
+
+def test_id_users_from_file(tmp_path):
+    name = pwd.getpwuid(os.getuid()).pw_name
+    users = tmp_path / 'users'
+    users.write_text(f"{name}\n\n{os.getuid()}\n")
+    single = run_id_cli(name)
+    result = run_id_cli(f"--users-from={users}")
+    assert result.returncode == 0
+    assert result.stdout == single.stdout * 2
+
+def test_id_bulk_index_matches_individual_lookups(tmp_path):
+    names = [p.pw_name for p in pwd.getpwall()][:20]
+    individual = ''.join(run_id_cli(name).stdout for name in names)
+    users = tmp_path / 'users'
+    users.write_text(''.join(name + '\n' for name in names))
+    result, calls = run_counting([f"--users-from={users}"])
+    assert result.returncode == 0
+    assert result.stdout == individual
+    # One getpwall() and one getgrall() answer everything.
+    assert calls == 2
+
+def test_id_many_operands_use_getgrouplist():
+    # Without --users-from every user gets its own getgrouplist(), which
+    # also sees groups that enumeration does not return.
+    names = [p.pw_name for p in pwd.getpwall()][:20]
+    result, calls = run_counting(names)
+    assert result.returncode == 0
+    assert calls >= 2 * len(set(names))
+
+def test_id_json_format():
+    import json
+    name = pwd.getpwuid(os.getuid()).pw_name
+    result = run_id_cli("--format=json", name, "nouserdoesnotexist")
+    assert result.returncode == 1
+    record = json.loads(result.stdout)
+    assert record['user'] == name
+    assert record['uid'] == os.getuid()
+    assert record['gid'] in [g['gid'] for g in record['groups']]
+    assert "no such user" in result.stderr
+
+def test_id_json_with_only_option():
+    result = run_id_cli("--format=json", "-u")
+    assert result.returncode == 1
+    assert "cannot be combined" in result.stderr
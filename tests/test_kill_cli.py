@@ -2,6 +2,10 @@ import subprocess
 import sys
 import os
 import signal
+import pwd
+import time
+
+import pytest
 
 KILL = [sys.executable, os.path.join(os.path.dirname(__file__), '../src/kill.py')]
 
@@ -82,3 +86,238 @@ def test_send_signal_unknown_pid():
     # Should error, but not crash
     assert result.returncode != 0
     assert 'no such process' in result.stderr or 'permission denied' in result.stderr
+
+def spawn_sleepers(count, *argv):
+    children = [subprocess.Popen(list(argv) or [sys.executable, '-c', 'import time; time.sleep(300)'])
+                for _ in range(count)]
+    # Wait until every child has exec'd, so /proc shows its final name.
+    for child in children:
+        for _ in range(200):
+            try:
+                with open(f'/proc/{child.pid}/cmdline', 'rb') as f:
+                    if f.read().startswith(os.fsencode(argv[0] if argv else sys.executable)):
+                        break
+            except OSError:
+                pass
+            time.sleep(0.01)
+    return children
+
+def reap(children):
+    status = []
+    for child in children:
+        try:
+            status.append(child.wait(timeout=5))
+        except subprocess.TimeoutExpired:
+            child.kill()
+            status.append(child.wait())
+    return status
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self'), reason='needs /proc')
+def test_name_and_parent():
+    sleepers = spawn_sleepers(3, 'sleep', '300')
+    others = spawn_sleepers(1)
+    result = run_kill('--name', '^sleep$', '--parent', str(os.getpid()))
+    assert result.returncode == 0
+    assert reap(sleepers) == [-signal.SIGTERM] * 3
+    assert others[0].poll() is None
+    others[0].kill()
+    reap(others)
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self'), reason='needs /proc')
+def test_full_command_line_and_signal():
+    marker = f'marker-{os.getpid()}-{time.monotonic_ns()}'
+    children = spawn_sleepers(2, sys.executable, '-c', 'import time; time.sleep(300)', marker)
+    # The name alone is the interpreter's, so only --full matches.
+    assert run_kill('--name', marker).returncode == 1
+    result = run_kill('-HUP', '--full', '--name', f'time.sleep.300. {marker}$')
+    assert result.returncode == 0
+    assert reap(children) == [-signal.SIGHUP] * 2
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self'), reason='needs /proc')
+def test_name_with_parenthesis_and_user():
+    # A process may name itself anything, including ") X 1 ".
+    code = "open('/proc/self/comm', 'w').write('odd) X 1 n'); print(flush=True); import time; time.sleep(300)"
+    child = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE)
+    child.stdout.readline()
+    user = pwd.getpwuid(os.geteuid()).pw_name
+    result = run_kill('--name', r'^odd\) X 1 n$', '--user', f'{user},0', '--parent', str(os.getpid()))
+    assert result.returncode == 0
+    assert reap([child]) == [-signal.SIGTERM]
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self'), reason='needs /proc')
+def test_no_process_matched():
+    result = run_kill('--name', f'^no-such-process-{os.getpid()}$')
+    assert result.returncode == 1
+    assert result.stderr == ''
+
+def test_pattern_errors():
+    assert 'invalid regular expression' in run_kill('--name', '(').stderr
+    assert '--full requires --name' in run_kill('--full').stderr
+    assert "invalid user name 'no-such-user-x'" in run_kill('--user', 'no-such-user-x').stderr
+    assert "extra operand '123'" in run_kill('--name', 'x', '123').stderr
+
+# Ignores SIGTERM, or with a delay argument exits that long after it.
+STUBBORN = """
+import signal, sys, time
+if len(sys.argv) > 1:
+    signal.signal(signal.SIGTERM, lambda *_: (time.sleep(float(sys.argv[1])), sys.exit(3)))
+else:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print(flush=True)
+time.sleep(300)
+"""
+
+def spawn_stubborn(count, *args):
+    children = [subprocess.Popen([sys.executable, '-c', STUBBORN] + list(args), stdout=subprocess.PIPE)
+                for _ in range(count)]
+    for child in children:
+        child.stdout.readline()
+    return children
+
+def test_wait_blocks_until_exit():
+    children = spawn_stubborn(3, '0.3')
+    start = time.monotonic()
+    result = run_kill('--wait', *[str(child.pid) for child in children])
+    assert result.returncode == 0
+    assert time.monotonic() - start >= 0.3
+    # Exited on their own (status 3), not killed.
+    assert reap(children) == [3, 3, 3]
+
+def test_timeout_escalates_to_sigkill():
+    children = spawn_stubborn(2)
+    start = time.monotonic()
+    result = run_kill('--timeout', '0.2', *[str(child.pid) for child in children])
+    assert result.returncode == 0
+    assert 0.2 <= time.monotonic() - start < 5
+    assert reap(children) == [-signal.SIGKILL] * 2
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self'), reason='needs /proc')
+def test_wait_with_name():
+    children = spawn_stubborn(2)
+    result = run_kill('--timeout', '0.1', '--name', '^python', '--parent', str(os.getpid()))
+    assert result.returncode == 0
+    assert reap(children) == [-signal.SIGKILL] * 2
+
+# Waits for children that the runner itself reaps, without pidfds.
+POLLING_RUNNER = """
+import subprocess, sys, threading, time
+sys.path.insert(0, {src!r})
+import kill
+children = [subprocess.Popen([sys.executable, '-c', {stubborn!r}, '0.2'], stdout=subprocess.PIPE)
+            for _ in range(2)]
+for child in children:
+    child.stdout.readline()
+    threading.Thread(target=child.wait).start()
+waiter = kill.ExitWaiter()
+waiter.use_pidfd = False
+start = time.monotonic()
+for child in children:
+    waiter.signal(child.pid, 15)
+print(waiter.wait(5), time.monotonic() - start >= 0.2, [child.wait() for child in children])
+"""
+
+def test_wait_without_pidfd():
+    code = POLLING_RUNNER.format(src=os.path.dirname(KILL[1]), stubborn=STUBBORN)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.stdout == "True True [3, 3]\n", result.stderr
+
+def test_wait_errors():
+    assert "invalid time interval 'soon'" in run_kill('--timeout', 'soon', '1').stderr
+    result = run_kill('--wait', '0')
+    assert 'cannot wait for a process group' in result.stderr
+    result = run_kill('--wait', '999999')
+    assert result.returncode == 1
+    assert 'no such process' in result.stderr
+
+def fake_cgroup(tmp_path, layout, extra=None):
+    """A fake cgroupfs: layout maps cgroup paths to the children in them."""
+    root = tmp_path / 'cgroup'
+    for path, children in layout.items():
+        directory = root / path
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / 'cgroup.procs').write_text(''.join(f'{child.pid}\n' for child in children))
+    for name, content in (extra or {}).items():
+        (root / name).write_text(content)
+    return root
+
+def run_kill_cgroup(root, *args):
+    env = dict(os.environ, _PYCOREUTILS_TEST_CGROUP_ROOT=str(root))
+    return subprocess.run(KILL + list(args), capture_output=True, text=True, env=env)
+
+def test_cgroup_signals_subtree(tmp_path):
+    top, below = spawn_sleepers(2, 'sleep', '300'), spawn_sleepers(1, 'sleep', '300')
+    root = fake_cgroup(tmp_path, {'app': top, 'app/worker': below})
+    result = run_kill_cgroup(root, '-INT', '--cgroup', '/app')
+    assert result.returncode == 0, result.stderr
+    assert reap(top + below) == [-signal.SIGINT] * 3
+
+def test_cgroup_kill_file(tmp_path):
+    children = spawn_sleepers(2, 'sleep', '300')
+    root = fake_cgroup(tmp_path, {'app': children}, {'app/cgroup.kill': ''})
+    result = run_kill_cgroup(root, '-KILL', '--cgroup', str(root / 'app'))
+    assert result.returncode == 0
+    # One write to cgroup.kill, which the kernel turns into the SIGKILLs.
+    assert (root / 'app' / 'cgroup.kill').read_text() == '1'
+    assert all(child.poll() is None for child in children)
+    for child in children:
+        child.kill()
+    reap(children)
+
+def test_cgroup_freeze_signal_thaw(tmp_path):
+    children = spawn_sleepers(2, 'sleep', '300')
+    root = fake_cgroup(tmp_path, {'app': children}, {
+        'app/cgroup.freeze': '0\n', 'app/cgroup.events': 'populated 1\nfrozen 1\n'})
+    result = run_kill_cgroup(root, '--freeze', '--cgroup', 'app')
+    assert result.returncode == 0, result.stderr
+    assert reap(children) == [-signal.SIGTERM] * 2
+    assert (root / 'app' / 'cgroup.freeze').read_text() == '0'
+
+def test_cgroup_errors(tmp_path):
+    root = fake_cgroup(tmp_path, {'v1': []})
+    assert "'nowhere': not a cgroup" in run_kill_cgroup(root, '--cgroup', 'nowhere').stderr
+    result = run_kill_cgroup(root, '--freeze', '--cgroup', 'v1')
+    assert result.returncode == 1
+    assert 'cannot freeze' in result.stderr
+    assert '--freeze requires --cgroup' in run_kill('--freeze', '1').stderr
+    assert 'cannot be combined' in run_kill_cgroup(root, '--cgroup', 'v1', '--name', 'x').stderr
+    # An empty cgroup is not an error.
+    assert run_kill_cgroup(root, '--cgroup', 'v1').returncode == 0
+
+CGROUP_PROCS_RUNNER = """
+import os, sys
+sys.path.insert(0, {src!r})
+import kill
+root = sys.argv[1]
+os.makedirs(os.path.join(root, 'gone'))
+with open(os.path.join(root, 'cgroup.procs'), 'w') as f:
+    f.write(f'{{os.getpid()}}\\n4242\\n')
+print(list(kill._cgroup_procs(root)))
+real_scandir = os.scandir
+def vanished(path):
+    raise FileNotFoundError(2, 'No such file or directory', path)
+# The cgroup is removed between reading cgroup.procs and listing it.
+os.scandir = vanished
+print(list(kill._cgroup_procs(root)))
+"""
+
+def test_cgroup_skips_self_and_removed_cgroups(tmp_path):
+    code = CGROUP_PROCS_RUNNER.format(src=os.path.dirname(KILL[1]))
+    result = subprocess.run([sys.executable, '-c', code, str(tmp_path)], capture_output=True, text=True)
+    assert result.stdout == "[4242]\n[4242]\n", result.stderr
+
+def test_cgroup_refuses_to_freeze_itself(tmp_path):
+    # Every cgroup, kill's own included, is below the root.
+    root = fake_cgroup(tmp_path, {'': []}, {'cgroup.freeze': '0\n', 'cgroup.events': 'frozen 0\n'})
+    result = run_kill_cgroup(root, '--freeze', '--cgroup', str(root))
+    assert result.returncode == 1
+    assert 'cannot freeze a cgroup that kill itself is in' in result.stderr
+    assert (root / 'cgroup.freeze').read_text() == '0\n'
+
+def test_cgroup_kill_file_not_used_on_own_cgroup(tmp_path):
+    # kill is below the root, so cgroup.kill would kill it too.
+    children = spawn_sleepers(2, 'sleep', '300')
+    root = fake_cgroup(tmp_path, {'': children}, {'cgroup.kill': ''})
+    result = run_kill_cgroup(root, '-KILL', '--cgroup', str(root))
+    assert result.returncode == 0, result.stderr
+    assert (root / 'cgroup.kill').read_text() == ''
+    assert reap(children) == [-signal.SIGKILL] * 2
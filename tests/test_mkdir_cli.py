@@ -3,6 +3,7 @@ import sys
 import os
 import tempfile
 import shutil
+import json
 
 SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'mkdir.py'))
 
@@ -62,3 +63,161 @@ def test_mkdir_invalid_mode():
         result = run_cli(['-m', 'badmode', d])
         assert 'invalid mode' in result.stderr
         assert result.returncode == 1
+
+def test_mkdir_parents_verbose_and_existing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.mkdir(os.path.join(tmpdir, 'a'))
+        result = run_cli(['-pv', os.path.join(tmpdir, 'a/b//c/d'), os.path.join(tmpdir, 'a')])
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == [
+            f"mkdir: created directory '{tmpdir}/a/b'",
+            f"mkdir: created directory '{tmpdir}/a/b//c'",
+            f"mkdir: created directory '{tmpdir}/a/b//c/d'",
+        ]
+        assert os.path.isdir(os.path.join(tmpdir, 'a/b/c/d'))
+
+def test_mkdir_parents_errors():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        f = os.path.join(tmpdir, 'file')
+        open(f, 'w').close()
+        result = run_cli(['-p', f, os.path.join(f, 'sub/dir')])
+        assert result.returncode == 1
+        assert f"cannot create directory '{f}': File exists" in result.stderr
+        # As in GNU mkdir, the ancestor that is not a directory is named.
+        assert f"cannot create directory '{f}': Not a directory" in result.stderr
+        result = run_cli([os.path.join(f, 'sub/dir')])
+        assert f"cannot create directory '{f}/sub/dir': Not a directory" in result.stderr
+        result = run_cli([os.path.join(tmpdir, 'x/y')])
+        assert result.returncode == 1
+        assert 'No such file or directory' in result.stderr
+
+def test_mkdir_parents_modes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        d = os.path.join(tmpdir, 'p/q/r')
+        result = run_cli(['-p', '-m', '700', d])
+        assert result.returncode == 0
+        old_umask = os.umask(0o022)
+        os.umask(old_umask)
+        assert os.stat(os.path.join(tmpdir, 'p')).st_mode & 0o777 == 0o777 & ~old_umask | 0o300
+        assert os.stat(d).st_mode & 0o777 == 0o700
+
+# Counts the calls mkdir.py makes into os for each directory operand.
+SYSCALL_RUNNER = f"""
+import json, os, sys
+sys.path.insert(0, {os.path.dirname(SCRIPT)!r})
+counts = {{}}
+def counting(name, function):
+    def wrapper(*args, **kwargs):
+        counts[name] = counts.get(name, 0) + 1
+        return function(*args, **kwargs)
+    return wrapper
+for name in ('mkdir', 'open', 'close', 'stat', 'lstat', 'access', 'umask', 'chdir'):
+    setattr(os, name, counting(name, getattr(os, name)))
+import mkdir
+sys.argv = ['mkdir'] + sys.argv[1:]
+with open(os.devnull, 'w') as sys.stdout:
+    status = mkdir.main()
+sys.stdout = sys.__stdout__
+print(json.dumps(counts))
+"""
+
+def count_syscalls(args):
+    result = subprocess.run([sys.executable, '-c', SYSCALL_RUNNER] + args, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+def test_mkdir_parents_syscall_count():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'deep/' * 20)
+        os.makedirs(base)
+        # Existing parents: the leaf mkdir() is all it takes.
+        leaves = [base + f'leaf{i}' for i in range(10)]
+        assert count_syscalls(['-p'] + leaves) == {'umask': 2, 'mkdir': 10}
+        # Existing leaves: one failed mkdir() and one stat() each.
+        assert count_syscalls(['-p'] + leaves) == {'umask': 2, 'mkdir': 10, 'stat': 10}
+        # Three missing components: back off twice, then create the rest
+        # from the deepest existing ancestor.
+        assert count_syscalls(['-p', base + 'a/b/c']) == {'umask': 2, 'mkdir': 5, 'open': 1, 'close': 1}
+        assert os.path.isdir(base + 'a/b/c')
+        # -m: the umask is cleared once, not around every mkdir().
+        counts = count_syscalls(['-p', '-m', '700'] + [base + f'm{i}/n' for i in range(10)])
+        assert counts['umask'] == 1
+
+def test_mkdir_from_file_lines_and_nuls():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'dirs')
+        with open(manifest, 'w') as f:
+            f.write('r/aa/bb\nr/aa/cc\n\nr/ab/x\nr/ab\n')
+        result = subprocess.run([sys.executable, SCRIPT, '-pv', '--from-file', manifest],
+                                cwd=tmpdir, capture_output=True, text=True)
+        assert result.returncode == 1
+        assert 'invalid zero-length directory name' in result.stderr
+        assert result.stdout.splitlines() == [
+            "mkdir: created directory 'r'",
+            "mkdir: created directory 'r/aa'",
+            "mkdir: created directory 'r/aa/bb'",
+            "mkdir: created directory 'r/aa/cc'",
+            "mkdir: created directory 'r/ab'",
+            "mkdir: created directory 'r/ab/x'",
+        ]
+        # NUL-separated names may contain newlines; '-' reads stdin.
+        result = subprocess.run([sys.executable, SCRIPT, '--from-file=-'], cwd=tmpdir,
+                                input=b'q\0q/a\nb\0', capture_output=True)
+        assert result.returncode == 0
+        assert os.listdir(os.path.join(tmpdir, 'q')) == ['a\nb']
+
+def test_mkdir_from_file_parallel():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        names = [f'{tmpdir}/t/{a:02x}/{b:02x}' for a in range(32) for b in range(20)]
+        result = subprocess.run([sys.executable, SCRIPT, '-pv', '-j', '8', '--from-file=-'],
+                                input='\n'.join(names), capture_output=True, text=True)
+        assert result.returncode == 0
+        created = [f'{tmpdir}/t'] + [name for a in range(32) for name in
+                                      [f'{tmpdir}/t/{a:02x}'] + names[a * 20:(a + 1) * 20]]
+        assert result.stdout.splitlines() == [f"mkdir: created directory '{name}'" for name in created]
+        assert all(os.path.isdir(name) for name in names)
+        # Without -p, existing directories and missing parents are errors.
+        result = subprocess.run([sys.executable, SCRIPT, '-j', '8', '--from-file=-'],
+                                input=f'{names[0]}\n{tmpdir}/none/x\n', capture_output=True, text=True)
+        assert result.returncode == 1
+        assert f"cannot create directory '{names[0]}': File exists" in result.stderr
+        assert f"cannot create directory '{tmpdir}/none/x': No such file or directory" in result.stderr
+
+def test_mkdir_from_file_errors():
+    result = run_cli(['--from-file=/no/such/manifest'])
+    assert result.returncode == 1
+    assert "cannot open '/no/such/manifest' for reading" in result.stderr
+    result = run_cli(['--from-file=-', 'dir'])
+    assert result.returncode == 1
+    assert "extra operand 'dir'" in result.stderr
+    result = run_cli(['-j', '0', '--from-file=-'])
+    assert result.returncode == 1
+    assert "invalid number of jobs: '0'" in result.stderr
+    result = run_cli(['-j', '4', 'dir'])
+    assert result.returncode == 1
+    assert "option --jobs requires --from-file" in result.stderr
+    assert not os.path.exists('dir')
+
+def test_mkdir_from_file_errors_match_operands():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        f = os.path.join(tmpdir, 'file')
+        open(f, 'w').close()
+        for names in ([f, f'{f}/x/y'], [f'{f}/x'], [f'{f}/x/y/z']):
+            for parents in (['-p'], []):
+                plain = run_cli(parents + names)
+                bulk = subprocess.run([sys.executable, SCRIPT, '--from-file=-'] + parents,
+                                      input='\n'.join(names), capture_output=True, text=True)
+                assert plain.returncode == bulk.returncode == 1
+                assert bulk.stderr == plain.stderr
+
+def test_mkdir_from_file_checks_each_ancestor_once():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'dirs')
+        with open(manifest, 'w') as f:
+            f.writelines(f'{tmpdir}/r/{a}/{b}\n' for a in range(4) for b in range(5))
+        # r, the 4 middle directories and the 20 leaves, one mkdir() each.
+        counts = count_syscalls(['-p', '-j', '1', '--from-file', manifest])
+        assert counts == {'umask': 2, 'mkdir': 25}
+        # Again, now that they exist: plus one stat() each.
+        counts = count_syscalls(['-p', '-j', '1', '--from-file', manifest])
+        assert counts == {'umask': 2, 'mkdir': 25, 'stat': 25}
@@ -61,3 +61,133 @@ def test_unrecognized_option():
     result = run_cli(['--notanoption'])
     assert result.returncode == 1
     assert 'unrecognized option' in result.stderr
+
+def run_cli_cgroup(args, tmp_path, proc_cgroup, files):
+    """Run nproc against a fake /proc/self/cgroup and cgroup file system."""
+    cgroup_file = tmp_path / 'cgroup'
+    cgroup_file.write_text(proc_cgroup)
+    root = tmp_path / 'sys_fs_cgroup'
+    root.mkdir(exist_ok=True)
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    env = os.environ.copy()
+    env['_PYCOREUTILS_TEST_PROC_CGROUP'] = str(cgroup_file)
+    env['_PYCOREUTILS_TEST_CGROUP_ROOT'] = str(root)
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True, env=env)
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def test_cgroup_v2_quota(tmp_path):
+    result = run_cli_cgroup([], tmp_path, '0::/app\n', {
+        'cgroup.controllers': 'cpu\n',
+        'app/cpu.max': '50000 100000\n',
+    })
+    assert result.returncode == 0
+    assert result.stdout.strip() == '1'
+
+def test_cgroup_v2_parent_quota_and_rounding(tmp_path):
+    # The tighter limit on the parent applies; 1.5 CPUs rounds up to 2.
+    result = run_cli_cgroup([], tmp_path, '0::/outer/inner\n', {
+        'cgroup.controllers': 'cpu\n',
+        'outer/cpu.max': '150000 100000\n',
+        'outer/inner/cpu.max': 'max 100000\n',
+    })
+    assert result.returncode == 0
+    assert result.stdout.strip() == str(min(2, available_cpus()))
+
+def test_cgroup_v1_quota(tmp_path):
+    result = run_cli_cgroup([], tmp_path, '3:cpu,cpuacct:/docker/abc\n', {
+        'cpu,cpuacct/docker/abc/cpu.cfs_quota_us': '100000\n',
+        'cpu,cpuacct/docker/abc/cpu.cfs_period_us': '100000\n',
+    })
+    assert result.returncode == 0
+    assert result.stdout.strip() == '1'
+
+def test_cgroup_v1_unlimited(tmp_path):
+    result = run_cli_cgroup([], tmp_path, '3:cpu,cpuacct:/\n', {
+        'cpu,cpuacct/cpu.cfs_quota_us': '-1\n',
+        'cpu,cpuacct/cpu.cfs_period_us': '100000\n',
+    })
+    assert result.returncode == 0
+    assert result.stdout.strip() == str(available_cpus())
+
+def test_no_quota_and_all_ignore_cgroup(tmp_path):
+    files = {'cgroup.controllers': 'cpu\n', 'cpu.max': '50000 100000\n'}
+    result = run_cli_cgroup(['--no-quota'], tmp_path, '0::/\n', files)
+    assert result.stdout.strip() == str(available_cpus())
+    result = run_cli_cgroup(['--all'], tmp_path, '0::/\n', files)
+    assert result.stdout.strip() == str(os.cpu_count() or 1)
+
+def test_effective_cpus_importable():
+    code = 'import nproc; print(nproc.effective_cpus())'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(SCRIPT))
+    assert result.returncode == 0
+    assert int(result.stdout) >= 1
+
+def make_fake_sysfs(root, nodes, cores_per_node, smt):
+    """Build a sysfs tree: CPUs are numbered core-major within the first thread,
+    with SMT siblings offset by the total core count (as on x86)."""
+    total_cores = nodes * cores_per_node
+    cpu_dir = root / 'cpu'
+    cpu_dir.mkdir(parents=True)
+    (cpu_dir / 'online').write_text(f'0-{total_cores * smt - 1}\n')
+    for node in range(nodes):
+        node_dir = root / 'node' / f'node{node}'
+        node_dir.mkdir(parents=True)
+        node_cpus = []
+        for core in range(node * cores_per_node, (node + 1) * cores_per_node):
+            node_cpus.extend(core + t * total_cores for t in range(smt))
+        (node_dir / 'cpulist').write_text(','.join(map(str, sorted(node_cpus))) + '\n')
+    (root / 'node' / 'online').write_text(f'0-{nodes - 1}\n')
+    for core in range(total_cores):
+        threads = [core + t * total_cores for t in range(smt)]
+        for cpu in threads:
+            topo = cpu_dir / f'cpu{cpu}' / 'topology'
+            topo.mkdir(parents=True)
+            (topo / 'core_cpus_list').write_text(','.join(map(str, threads)) + '\n')
+            (topo / 'core_id').write_text(f'{core % cores_per_node}\n')
+            (topo / 'physical_package_id').write_text(f'{core // cores_per_node}\n')
+
+def test_topology_json(tmp_path):
+    import json
+    make_fake_sysfs(tmp_path, nodes=2, cores_per_node=2, smt=2)
+    env = os.environ.copy()
+    env['_PYCOREUTILS_TEST_SYSFS_SYSTEM'] = str(tmp_path)
+    result = subprocess.run([sys.executable, SCRIPT, '--topology=json'],
+                            capture_output=True, text=True, env=env)
+    assert result.returncode == 0
+    data = json.loads(result.stdout)
+    assert [n['cpus'] for n in data['nodes']] == [[0, 1, 4, 5], [2, 3, 6, 7]]
+    assert [c['cpus'] for c in data['cores']] == [[0, 4], [1, 5], [2, 6], [3, 7]]
+    assert [(c['package'], c['core'], c['node']) for c in data['cores']] == [
+        (0, 0, 0), (0, 1, 0), (1, 0, 1), (1, 1, 1)]
+
+def test_topology_text(tmp_path):
+    make_fake_sysfs(tmp_path, nodes=1, cores_per_node=2, smt=2)
+    env = os.environ.copy()
+    env['_PYCOREUTILS_TEST_SYSFS_SYSTEM'] = str(tmp_path)
+    result = subprocess.run([sys.executable, SCRIPT, '--topology'],
+                            capture_output=True, text=True, env=env)
+    assert result.returncode == 0
+    assert 'cores: 2  threads: 4' in result.stdout
+    assert 'node 0: cpus 0-3' in result.stdout
+    assert 'package 0 core 1: threads 1,3' in result.stdout
+
+def test_topology_unavailable(tmp_path):
+    env = os.environ.copy()
+    env['_PYCOREUTILS_TEST_SYSFS_SYSTEM'] = str(tmp_path)
+    result = subprocess.run([sys.executable, SCRIPT, '--topology'],
+                            capture_output=True, text=True, env=env)
+    assert result.returncode == 1
+    assert 'not available' in result.stderr
+
+def test_topology_invalid_format():
+    result = run_cli(['--topology=xml'])
+    assert result.returncode == 1
+    assert 'invalid topology format' in result.stderr
@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import os
+import time
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'sleep.py'))
+
+
+def run_cli(args):
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
+
+
+def test_basic_sleep():
+    start = time.monotonic()
+    result = run_cli(['0.2'])
+    assert result.returncode == 0
+    assert time.monotonic() - start >= 0.2
+
+
+def test_invalid_interval():
+    result = run_cli(['abc'])
+    assert result.returncode == 1
+    assert "invalid time interval 'abc'" in result.stderr
+
+
+def test_missing_operand():
+    result = run_cli([])
+    assert result.returncode == 1
+    assert 'missing operand' in result.stderr
+
+
+def test_until_epoch():
+    deadline = time.time() + 0.3
+    result = run_cli([f'--until=@{deadline}'])
+    assert result.returncode == 0
+    assert time.time() >= deadline
+
+
+def test_until_past_returns_immediately():
+    start = time.monotonic()
+    result = run_cli(['--until=@0'])
+    assert result.returncode == 0
+    assert time.monotonic() - start < 5
+
+
+def test_until_invalid():
+    result = run_cli(['--until=not a time'])
+    assert result.returncode == 1
+    assert 'invalid time' in result.stderr
+
+
+def test_until_with_operand():
+    result = run_cli(['--until=@0', '5'])
+    assert result.returncode == 1
+    assert "extra operand '5'" in result.stderr
+
+
+def test_every_aligned_ticks():
+    deadline = time.time() + 0.55
+    result = run_cli(['--every=0.1', f'--until=@{deadline}'])
+    assert result.returncode == 0
+    ticks = [float(line) for line in result.stdout.split()]
+    assert 3 <= len(ticks) <= 6
+    for tick in ticks:
+        # Every tick sits on a multiple of the interval.
+        assert abs(tick * 10 - round(tick * 10)) < 1e-3
+        assert tick <= deadline
+    # On the realtime clock, exactly: no offset shifts the printed value.
+    assert all(line.endswith('00000') for line in result.stdout.split())
+
+
+def test_every_monotonic_stops_on_closed_pipe():
+    proc = subprocess.Popen([sys.executable, SCRIPT, '--every=0.05', '--clock=monotonic'],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    first = float(proc.stdout.readline())
+    second = float(proc.stdout.readline())
+    proc.stdout.close()
+    assert proc.wait(timeout=5) == 0
+    assert abs(second - first - 0.05) < 1e-6
+    assert proc.stderr.read() == ''
+
+
+def test_every_invalid_interval():
+    result = run_cli(['--every=0'])
+    assert result.returncode == 1
+    assert "invalid time interval '0'" in result.stderr
+
+
+def test_help():
+    result = run_cli(['--help'])
+    assert result.returncode == 0
+    assert 'Usage: sleep' in result.stdout
+
+
+def test_version():
+    result = run_cli(['--version'])
+    assert result.returncode == 0
+    assert 'sleep (Python port of GNU coreutils)' in result.stdout
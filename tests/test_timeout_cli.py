@@ -0,0 +1,111 @@
+import subprocess
+import sys
+import os
+import shutil
+import signal
+import time
+
+import pytest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'timeout.py'))
+
+# Ignores SIGTERM, so only SIGKILL ends it.
+STUBBORN = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(30)"
+
+
+def run_cli(args, **kwargs):
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True, **kwargs)
+
+
+def test_timeout_expires():
+    start = time.monotonic()
+    result = run_cli(['0.2', 'sleep', '10'])
+    assert result.returncode == 124
+    assert time.monotonic() - start < 5
+
+
+def test_command_status_passed_through():
+    assert run_cli(['5', 'sh', '-c', 'exit 7']).returncode == 7
+    assert run_cli(['0', 'true']).returncode == 0
+
+
+def test_command_output_and_input():
+    result = run_cli(['5', 'cat'], input='hello\n')
+    assert result.stdout == 'hello\n'
+    assert result.returncode == 0
+
+
+def test_signal_option_and_preserve_status():
+    assert run_cli(['-s', 'HUP', '0.1', 'sleep', '10']).returncode == 124
+    assert run_cli(['--signal=INT', '--preserve-status', '0.1', 'sleep', '10']).returncode == 128 + signal.SIGINT
+    # SIGKILL reaches timeout itself too, as with GNU timeout.
+    assert run_cli(['-s', '9', '0.1', 'sleep', '10']).returncode == -signal.SIGKILL
+
+
+def test_kill_after():
+    start = time.monotonic()
+    result = run_cli(['-v', '-k', '0.2', '0.1', sys.executable, '-c', STUBBORN])
+    assert result.returncode == -signal.SIGKILL
+    assert time.monotonic() - start < 10
+    assert result.stderr.splitlines() == [
+        f"timeout: sending signal TERM to command '{sys.executable}'",
+        f"timeout: sending signal KILL to command '{sys.executable}'",
+    ]
+
+
+def test_foreground_kill_after_status():
+    result = run_cli(['--foreground', '--kill-after=0.2', '0.1', sys.executable, '-c', STUBBORN])
+    assert result.returncode == 128 + signal.SIGKILL
+
+
+def test_signal_is_forwarded():
+    process = subprocess.Popen([sys.executable, SCRIPT, '10', 'sh', '-c', 'echo ready; sleep 10'],
+                               stdout=subprocess.PIPE, text=True)
+    assert process.stdout.readline() == 'ready\n'
+    process.send_signal(signal.SIGTERM)
+    # Not a timeout: timeout dies of the command's signal.
+    assert process.wait(timeout=10) == -signal.SIGTERM
+
+
+def test_command_not_found_or_not_executable(tmp_path):
+    result = run_cli(['1', 'no-such-command-here'])
+    assert result.returncode == 127
+    assert "failed to run command 'no-such-command-here': No such file or directory" in result.stderr
+    script = tmp_path / 'script'
+    script.write_text('#!/bin/sh\n')
+    assert run_cli(['1', str(script)]).returncode == 126
+
+
+@pytest.mark.parametrize('args, message', [
+    (['-s', 'NOPE', '1', 'true'], "NOPE: invalid signal"),
+    (['soon', 'true'], "invalid time interval 'soon'"),
+    (['-k', '-1', '1', 'true'], "invalid time interval '-1'"),
+    (['1'], "missing operand after '1'"),
+    ([], "missing operand"),
+    (['--bogus', '1', 'true'], "unrecognized option '--bogus'"),
+    (['-x', '1', 'true'], "invalid option -- 'x'"),
+])
+def test_usage_errors(args, message):
+    result = run_cli(args)
+    assert result.returncode == 125
+    assert message in result.stderr
+
+
+@pytest.mark.skipif(shutil.which('timeout') is None, reason='system timeout not available')
+@pytest.mark.parametrize('args', [['0.1', 'sleep', '5'], ['5', 'sh', '-c', 'exit 3'],
+                                  ['--preserve-status', '0.1', 'sleep', '5'], ['1', 'no-such-command-here']])
+def test_matches_system(args):
+    expected = subprocess.run(['timeout'] + args, capture_output=True)
+    assert run_cli(args).returncode == expected.returncode
+
+
+def test_help():
+    result = run_cli(['--help'])
+    assert result.returncode == 0
+    assert 'Usage: timeout [OPTION] DURATION COMMAND [ARG]...' in result.stdout
+
+
+def test_version():
+    result = run_cli(['--version'])
+    assert result.returncode == 0
+    assert 'timeout (Python port of GNU coreutils)' in result.stdout
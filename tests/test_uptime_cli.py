@@ -57,12 +57,11 @@ def test_uptime_extra_operand():
 @pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
 def test_uptime_unix_format_days(tmp_path, monkeypatch):
     """Test the full output format on UNIX for uptime > 24 hours."""
-    # 1. Mock boot time: 2 days, 3 hours, 5 minutes ago
-    boot_timestamp = time.time() - (2 * 86400 + 3 * 3600 + 5 * 60)
-    fake_proc_stat = tmp_path / "stat"
-    fake_proc_stat.write_text(f"btime {int(boot_timestamp)}\n")
+    # 1. Mock uptime: 2 days, 3 hours, 5 minutes
+    fake_proc_uptime = tmp_path / "uptime"
+    fake_proc_uptime.write_text(f"{2 * 86400 + 3 * 3600 + 5 * 60}.42 1234.56\n")
     test_env = {
-        '_PYCOREUTILS_TEST_PROC_STAT': str(fake_proc_stat),
+        '_PYCOREUTILS_TEST_PROC_UPTIME': str(fake_proc_uptime),
         '_PYCOREUTILS_TEST_LOAD_AVG': '1.23,4.56,7.89'
     }
 
@@ -82,12 +81,11 @@ def test_uptime_unix_format_days(tmp_path, monkeypatch):
 @pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
 def test_uptime_unix_format_hours(tmp_path, monkeypatch):
     """Test the full output format on UNIX for uptime < 24 hours."""
-    # 1. Mock boot time: 4 hours, 15 minutes ago
-    boot_timestamp = time.time() - (4 * 3600 + 15 * 60)
-    fake_proc_stat = tmp_path / "stat"
-    fake_proc_stat.write_text(f"btime {int(boot_timestamp)}\n")
+    # 1. Mock uptime: 4 hours, 15 minutes
+    fake_proc_uptime = tmp_path / "uptime"
+    fake_proc_uptime.write_text(f"{4 * 3600 + 15 * 60}.42 1234.56\n")
     test_env = {
-        '_PYCOREUTILS_TEST_PROC_STAT': str(fake_proc_stat),
+        '_PYCOREUTILS_TEST_PROC_UPTIME': str(fake_proc_uptime),
         '_PYCOREUTILS_TEST_LOAD_AVG': '0.10,0.20,0.30'
     }
 
@@ -103,6 +101,195 @@ def test_uptime_unix_format_hours(tmp_path, monkeypatch):
     assert "load average: 0.10, 0.20, 0.30" in output
 
 
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_unix_large_wtmp(tmp_path):
+    """A wtmp large enough to be memory-mapped is counted correctly."""
+    DEAD_PROCESS = 8
+    wtmp = tmp_path / "wtmp"
+    login = struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 1, b'pts/0', b'ts/0', b'alice\0', b'host', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    logout = struct.pack(UTMP_STRUCT_FORMAT, DEAD_PROCESS, 1, b'pts/0', b'ts/0', b'\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    nameless = struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 2, b'pts/1', b'ts/1', b'\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    pairs = (1 << 20) // (2 * UTMP_STRUCT_SIZE) + 7
+    wtmp.write_bytes((login + logout) * pairs + nameless + login[:10])
+    result = run_cli([str(wtmp)], env={'_PYCOREUTILS_TEST_LOAD_AVG': '0.10,0.20,0.30'})
+    assert result.returncode == 0
+    assert f"{pairs} users" in result.stdout
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_unix_missing_file():
+    """An unreadable utmp file counts as no users."""
+    result = run_cli(['/no/such/utmp'], env={'_PYCOREUTILS_TEST_LOAD_AVG': '0.10,0.20,0.30'})
+    assert result.returncode == 0
+    assert "0 users" in result.stdout
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_unix_watch(tmp_path):
+    """--watch prints a new line only when the number of users changes."""
+    utmp = create_fake_utmp_file(tmp_path / "utmp", 1)
+    env = os.environ.copy()
+    env['_PYCOREUTILS_TEST_LOAD_AVG'] = '0.10,0.20,0.30'
+    watcher = subprocess.Popen([sys.executable, SCRIPT, '--watch', '0.02', utmp],
+                               stdout=subprocess.PIPE, text=True, env=env)
+    try:
+        assert "1 user," in watcher.stdout.readline()
+        with open(utmp, 'ab') as f:
+            f.write(struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 9, b'tty2', b'id2', b'late\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0))
+        assert "2 users," in watcher.stdout.readline()
+    finally:
+        watcher.terminate()
+        watcher.wait()
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Linux-specific test")
+def test_uptime_linux_proc_files(tmp_path):
+    """Uptime and load averages come from /proc/uptime and /proc/loadavg."""
+    (tmp_path / "uptime").write_text("93784.00 10.00\n")
+    (tmp_path / "loadavg").write_text("0.50 1.25 2.00 3/456 7890\n")
+    result = run_cli([create_fake_utmp_file(tmp_path / "utmp", 2)], env={
+        '_PYCOREUTILS_TEST_PROC_UPTIME': str(tmp_path / "uptime"),
+        '_PYCOREUTILS_TEST_PROC_LOADAVG': str(tmp_path / "loadavg")})
+    assert result.returncode == 0
+    assert "up 1 day,  2:03,  2 users,  load average: 0.50, 1.25, 2.00" in result.stdout
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Linux-specific test")
+def test_uptime_linux_falls_back_to_proc_stat(tmp_path):
+    """Without /proc/uptime the boot time is taken from /proc/stat."""
+    (tmp_path / "stat").write_text(f"cpu  1 2 3\nbtime {int(time.time()) - 3 * 3600 - 60}\n")
+    result = run_cli([create_fake_utmp_file(tmp_path / "utmp", 1)], env={
+        '_PYCOREUTILS_TEST_PROC_UPTIME': str(tmp_path / "missing"),
+        '_PYCOREUTILS_TEST_PROC_STAT': str(tmp_path / "stat"),
+        '_PYCOREUTILS_TEST_LOAD_AVG': '0.10,0.20,0.30'})
+    assert result.returncode == 0
+    assert "up  3:01" in result.stdout
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Linux-specific test")
+def test_uptime_linux_imports_no_fallbacks():
+    """A plain run on Linux does not import subprocess or datetime."""
+    code = ("import sys; sys.path.insert(0, {src!r}); sys.argv = ['uptime', '/no/such/utmp']\n"
+            "import uptime; uptime.main()\n"
+            "print('subprocess' in sys.modules, 'datetime' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code.format(src=os.path.dirname(SCRIPT))],
+                            capture_output=True, text=True)
+    assert result.stdout.splitlines()[-1] == "False False"
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_unix_interval(tmp_path):
+    """--interval prints COUNT lines, re-reading the proc files each time."""
+    utmp = create_fake_utmp_file(tmp_path / "utmp", 2)
+    result = run_cli(['--interval', '0.01', '--count', '3', utmp], env={'_PYCOREUTILS_TEST_LOAD_AVG': '0.10,0.20,0.30'})
+    assert result.returncode == 0
+    lines = result.stdout.splitlines()
+    assert len(lines) == 3
+    assert all("2 users,  load average: 0.10, 0.20, 0.30" in line for line in lines)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_unix_record_and_history(tmp_path):
+    """--record keeps the newest SLOTS samples; --history summarizes them."""
+    utmp = create_fake_utmp_file(tmp_path / "utmp", 2)
+    ring = tmp_path / "ring"
+    env = {'_PYCOREUTILS_TEST_LOAD_AVG': '0.50,1.00,1.50'}
+    result = run_cli(['--record', str(ring), '--interval', '0.01', '--count', '5', '--slots', '3', utmp], env=env)
+    assert result.returncode == 0
+    assert result.stdout == ""
+    # Header, then three 32-byte slots, allocated up front.
+    assert ring.stat().st_size == 32 + 3 * 32
+    # An existing ring keeps its size and is appended to.
+    env['_PYCOREUTILS_TEST_LOAD_AVG'] = '2.50,3.00,3.50'
+    assert run_cli(['--record', str(ring), '--interval', '0.01', '--count', '1', utmp], env=env).returncode == 0
+
+    result = run_cli(['--history', str(ring)])
+    assert result.returncode == 0
+    lines = result.stdout.splitlines()
+    assert lines[0].startswith("samples: 3 from ")
+    assert lines[1:] == [
+        "              min      max      avg",
+        "load1        0.50     2.50     1.17",
+        "load5        1.00     3.00     1.67",
+        "load15       1.50     3.50     2.17",
+        "users           2        2     2.00",
+    ]
+
+
+# Creates rings where preallocation is not supported.
+RING_RUNNER = """
+import errno, os, struct, sys
+sys.path.insert(0, {src!r})
+import ringfile
+def unsupported(fd, offset, length):
+    raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+os.posix_fallocate = unsupported
+for path in sys.argv[1:]:
+    with ringfile.RingFile(path, struct.Struct('<d3fI'), create=True, slots=4) as ring:
+        ring.append(1.0, 2.0, 3.0, 4.0, 5)
+"""
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_uptime_ring_created_without_fallocate(tmp_path):
+    """Rings are built under a temporary name; an empty file is replaced."""
+    (tmp_path / "empty").touch()
+    code = RING_RUNNER.format(src=os.path.dirname(SCRIPT))
+    result = subprocess.run([sys.executable, '-c', code, str(tmp_path / "new"), str(tmp_path / "empty")],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert sorted(os.listdir(tmp_path)) == ["empty", "new"]
+    for name in ("new", "empty"):
+        assert (tmp_path / name).stat().st_size == 32 + 4 * 32
+        result = run_cli(['--history', str(tmp_path / name), '--window', '0'])
+        assert result.returncode == 0
+
+
+def write_ring(path, samples):
+    """A ring file of (time, load1, load5, load15, users) samples."""
+    header = struct.pack('<8sIIQ8x', b'PYRING01', 32, 8, len(samples))
+    path.write_bytes(header + b''.join(struct.pack('<Qd3fI', n, *sample) for n, sample in enumerate(samples))
+                     + bytes(32 * (8 - len(samples))))
+    return str(path)
+
+
+def test_uptime_history_window(tmp_path):
+    now = time.time()
+    ring = write_ring(tmp_path / "ring", [(now - 7200, 9.0, 9.0, 9.0, 9), (now - 60, 1.0, 2.0, 3.0, 4)])
+    result = run_cli(['--history', ring, '--window', '1h'])
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[0].startswith("samples: 1 from ")
+    assert "load1        1.00     1.00     1.00" in result.stdout
+    assert run_cli(['--history', ring, '--window', '1s']).stdout == "samples: 0\n"
+
+
+def test_uptime_history_not_a_ring(tmp_path):
+    bogus = tmp_path / "bogus"
+    bogus.write_bytes(b"x" * 100)
+    result = run_cli(['--history', str(bogus)])
+    assert result.returncode == 1
+    assert "not a ring file" in result.stderr
+    result = run_cli(['--history', str(tmp_path / "missing")])
+    assert result.returncode == 1
+    assert "No such file or directory" in result.stderr
+
+
+@pytest.mark.parametrize('args, message', [
+    (['--count', '2'], "--count requires --interval"),
+    (['--slots', '2'], "--slots requires --record"),
+    (['--window', '1h'], "--window requires --history"),
+    (['--record', 'r', '--history', 'r'], "--record and --history are mutually exclusive"),
+    (['--record', 'r', '--slots', '0'], "invalid number of slots '0'"),
+    (['--interval', '1', '--count', '0'], "invalid count '0'"),
+    (['--interval', 'soon'], "invalid time interval 'soon'"),
+    (['--interval', '1', '--watch', '1'], "mutually exclusive"),
+])
+def test_uptime_interval_errors(args, message):
+    result = run_cli(args)
+    assert result.returncode == 1
+    assert message in result.stderr
+
+
 # --- Windows-specific Tests ---
 
 @pytest.mark.skipif(sys.platform != 'win32', reason="Windows-specific test")
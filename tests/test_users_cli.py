@@ -13,9 +13,9 @@ UTMP_STRUCT_FORMAT = 'hi32s4s32s256shhiii4i20x'
 UTMP_STRUCT_SIZE = struct.calcsize(UTMP_STRUCT_FORMAT)
 
 
-def run_cli(args):
+def run_cli(args, env=None):
     """Helper to run the users script with arguments."""
-    env = os.environ.copy()
+    env = dict(os.environ, **(env or {}))
     return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True, env=env)
 
 
@@ -78,6 +78,175 @@ def test_users_unix_permission_denied(tmp_path):
     os.chmod(no_access_file, 0o644)
 
 
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_large_wtmp(tmp_path):
+    """A wtmp large enough to be memory-mapped gives the same answer."""
+    wtmp = tmp_path / "wtmp"
+    block = open(create_fake_utmp_file(tmp_path / "utmp"), 'rb').read()
+    copies = (1 << 20) // len(block) + 1
+    # A non-UTF-8 name and a trailing partial record must not break decoding.
+    extra = struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 1, b'pts/9', b'id9', b'b\xffad\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    wtmp.write_bytes(block * copies + extra + extra[:100])
+    result = run_cli([str(wtmp)])
+    assert result.returncode == 0
+    names = result.stdout.split()
+    assert len(names) == 4 * copies + 1
+    assert names[0] == 'a_very_long_username_here'
+    assert names.count('bad') == 1
+    assert names.count('root') == 2 * copies
+    assert names == sorted(names)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_skips_empty_names(tmp_path):
+    """USER_PROCESS records without a user name are not counted."""
+    utmp = tmp_path / "utmp"
+    utmp.write_bytes(struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 1, b'tty1', b'id1', b'\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+                     # Nothing left once the invalid UTF-8 is dropped.
+                     + struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 2, b'tty2', b'id2', b'\xff\xfe\0', b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+                     + open(create_fake_utmp_file(tmp_path / "fake"), 'rb').read())
+    result = run_cli([str(utmp)])
+    assert result.stdout == "a_very_long_username_here guest root root\n"
+
+
+def _watch_record(ut_type, user):
+    return struct.pack(UTMP_STRUCT_FORMAT, ut_type, 1, b'pts/1', b'x', user, b'', 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_watch(tmp_path):
+    """--watch prints a line per change: in-place rewrites, appends, removal and re-creation."""
+    utmp = tmp_path / "utmp"
+    utmp.write_bytes(_watch_record(USER_PROCESS, b'alice') + _watch_record(DEAD_PROCESS, b''))
+    watcher = subprocess.Popen([sys.executable, SCRIPT, '--watch', '0.02', str(utmp)],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        assert watcher.stdout.readline() == "alice\n"
+        with open(utmp, 'r+b') as f:
+            f.seek(UTMP_STRUCT_SIZE)
+            f.write(_watch_record(USER_PROCESS, b'bob'))
+        assert watcher.stdout.readline() == "alice bob\n"
+        # A change that leaves the user set alone prints nothing.
+        with open(utmp, 'r+b') as f:
+            f.write(_watch_record(USER_PROCESS, b'alice'))
+        with open(utmp, 'ab') as f:
+            f.write(_watch_record(USER_PROCESS, b'carol'))
+        assert watcher.stdout.readline() == "alice bob carol\n"
+        utmp.unlink()
+        assert watcher.stdout.readline() == "\n"
+        utmp.write_bytes(_watch_record(USER_PROCESS, b'dave'))
+        assert watcher.stdout.readline() == "dave\n"
+    finally:
+        watcher.terminate()
+        watcher.wait()
+
+
+# Polls a large watched log in-process.
+WATCHER_RUNNER = """
+import sys
+sys.path.insert(0, {src!r})
+import utmp
+opened = []
+class RecordingUtmpFile(utmp.UtmpFile):
+    def __init__(self, filename):
+        opened.append(filename)
+        super().__init__(filename)
+utmp.UtmpFile = RecordingUtmpFile
+watcher = utmp.UtmpWatcher(sys.argv[1])
+print(sorted(watcher.sessions.items()))
+# The mapping is made from the descriptor the watcher holds.
+print([type(filename).__name__ for filename in opened])
+def no_counter(*args):
+    raise AssertionError('unchanged file was recounted')
+utmp.Counter = no_counter
+print(watcher.poll())
+"""
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_watcher_large_file(tmp_path):
+    wtmp = tmp_path / "wtmp"
+    records = [_watch_record(USER_PROCESS, b'alice'), _watch_record(DEAD_PROCESS, b''),
+               _watch_record(USER_PROCESS, b'bob')]
+    wtmp.write_bytes(b''.join(records) * 1200)
+    code = WATCHER_RUNNER.format(src=os.path.dirname(SCRIPT))
+    result = subprocess.run([sys.executable, '-c', code, str(wtmp)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == ["[('alice', 1200), ('bob', 1200)]", "['int']", 'False']
+
+
+def test_users_watch_invalid_interval():
+    result = run_cli(['--watch', 'soon'])
+    assert result.returncode == 1
+    assert "invalid time interval 'soon'" in result.stderr
+
+
+BOOT_TIME, RUN_LVL = 2, 1
+BASE = 1760000000  # 2025-10-09 08:53:20 UTC
+
+
+def create_fake_wtmp_file(file_path):
+    """Sessions with known ends: logout, reboot, shutdown and still open."""
+    def entry(ut_type, line, ut_id, user, when):
+        return struct.pack(UTMP_STRUCT_FORMAT, ut_type, 0, line, ut_id, user, b'', 0, 0, 0, when, 0, 0, 0, 0, 0)
+    records = [
+        entry(USER_PROCESS, b'tty1', b'1', b'alice', BASE),
+        entry(USER_PROCESS, b'pts/0', b'ts/0', b'bob', BASE + 600),
+        entry(USER_PROCESS, b'pts/1', b'ts/1', b'alice', BASE + 1800),
+        entry(DEAD_PROCESS, b'tty1', b'1', b'', BASE + 3600),
+        entry(BOOT_TIME, b'~', b'~~', b'reboot', BASE + 7200),
+        entry(USER_PROCESS, b'pts/0', b'ts/0', b'carol', BASE + 86400),
+        entry(RUN_LVL, b'~', b'~~', b'shutdown', BASE + 88200),
+        # No line: the session is keyed by its id
+        entry(USER_PROCESS, b'', b'x1', b'dave', BASE + 90000),
+        entry(DEAD_PROCESS, b'', b'x1', b'', BASE + 90360),
+        entry(USER_PROCESS, b'pts/5', b'ts/5', b'erin', BASE + 100000),
+    ]
+    file_path.write_bytes(b''.join(records))
+    return str(file_path)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_stats(tmp_path):
+    result = run_cli(['--stats', create_fake_wtmp_file(tmp_path / "wtmp")], env={'TZ': 'UTC'})
+    assert result.returncode == 0
+    lines = result.stdout.splitlines()
+    assert lines[:5] == [
+        "USER   SESSIONS     HOURS",
+        "alice         2      2.50",
+        "bob           1      1.83",
+        "carol         1      0.50",
+        "dave          1      0.10",
+    ]
+    assert lines[5].split()[:2] == ['erin', '1']
+    assert lines[7:] == [
+        "",
+        "peak concurrent sessions: 3 at 2025-10-09 09:23:20",
+        "sessions still open: 1",
+        "",
+        "DAY         SESSIONS",
+        "2025-10-09         3",
+        "2025-10-10         3",
+    ]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="UNIX-specific test")
+def test_users_unix_stats_skip_undecodable_names(tmp_path):
+    wtmp = tmp_path / "wtmp"
+    create_fake_wtmp_file(wtmp)
+    expected = run_cli(['--stats', str(wtmp)], env={'TZ': 'UTC'}).stdout
+    with open(wtmp, 'ab') as f:
+        f.write(struct.pack(UTMP_STRUCT_FORMAT, USER_PROCESS, 0, b'pts/9', b'ts/9', b'\xff\xfe', b'',
+                            0, 0, 0, BASE + 100, 0, 0, 0, 0, 0))
+    assert run_cli(['--stats', str(wtmp)], env={'TZ': 'UTC'}).stdout == expected
+
+
+def test_users_stats_and_watch():
+    result = run_cli(['--stats', '--watch', '1'])
+    assert result.returncode == 1
+    assert "--stats and --watch are mutually exclusive" in result.stderr
+
+
 # --- Windows-specific Tests ---
 
 @pytest.mark.skipif(sys.platform != 'win32', reason="Windows-specific test")
@@ -0,0 +1,165 @@
+import subprocess
+import sys
+import os
+import shutil
+import pytest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'wc.py'))
+
+# Spans several read blocks, with multibyte characters, tabs and a word cut
+# at block boundaries, and no final newline.
+SAMPLE = (b''.join(b'line %d\tw\xc3\xa9rd  \xe6\x97\xa5\xe6\x9c\xac\xe2\x80\x83x\r\n' % i for i in range(60000))
+          + b'a' * 300000 + b'\n\n\xff\xfe  tail')
+
+
+def run_cli(args, input=None, locale='C.UTF-8', cwd=None):
+    env = dict(os.environ, LC_ALL=locale)
+    return subprocess.run([sys.executable, SCRIPT] + args, input=input, capture_output=True, env=env,
+                          cwd=cwd)
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / 'a').write_bytes(b'one two\nthree\n')
+    (tmp_path / 'b').write_bytes(b'  four\tfive six ')
+    (tmp_path / 'big').write_bytes(SAMPLE)
+    (tmp_path / 'empty').write_bytes(b'')
+    return tmp_path
+
+
+def test_wc_default_counts(files):
+    result = run_cli([str(files / 'a'), str(files / 'b')])
+    assert result.returncode == 0
+    assert result.stdout.decode().splitlines() == [
+        f" 2  3 14 {files / 'a'}", f" 0  3 16 {files / 'b'}", " 2  6 30 total"]
+
+
+def test_wc_stdin(files):
+    assert run_cli(['-l'], input=b'a\nb\n').stdout == b'2\n'
+    assert run_cli([], input=b'a b\n').stdout == b'      1       2       4\n'
+    assert run_cli(['-w', '-'], input=b'a b\n').stdout == b'2 -\n'
+
+
+def test_wc_characters_and_words():
+    # Ends in a no-break space, which separates words in UTF-8.
+    text = b'caf\xc3\xa9 \xe6\x97\xa5\xe6\x9c\xac\xe8\xaa\x9e\xc2\xa0x\n'
+    assert run_cli(['-mw'], input=text).stdout == b'      3      11\n'
+    assert run_cli(['-mw'], input=text, locale='C').stdout == b'      2      19\n'
+    # Bytes that do not decode are not characters and do not make words.
+    assert run_cli(['-mw'], input=b'\xff a\xfeb \xff').stdout == b'      1       4\n'
+    # A U+FFFD in the input is a character like any other.
+    assert run_cli(['-mw'], input=b'\xef\xbf\xbd').stdout == b'      1       1\n'
+
+
+def test_wc_max_line_length():
+    assert run_cli(['-L'], input=b'ab\tc\r\n\xe6\x97\xa5\xe6\x9c\xac\xe8\xaa\x9e\n').stdout == b'9\n'
+    assert run_cli(['-L'], input=b'\xe6\x97\xa5\xe6\x9c\xac\xe8\xaa\x9e').stdout == b'6\n'
+    # Invalid bytes take no columns; U+FFFD takes one.
+    assert run_cli(['-L'], input=b'a\xffb').stdout == b'2\n'
+    assert run_cli(['-L'], input=b'a\xef\xbf\xbdb').stdout == b'3\n'
+
+
+@pytest.mark.skipif(shutil.which('wc') is None, reason='system wc not available')
+# GNU wc 9.1 does not count bytes above 127 as word characters in the C
+# locale, so words are only compared in UTF-8.
+@pytest.mark.parametrize('locale, options', [('C.UTF-8', []), ('C.UTF-8', ['-w']), ('C.UTF-8', ['-lwmcL'])]
+                         + [(locale, [option]) for locale in ('C', 'C.UTF-8')
+                            for option in ('-l', '-c', '-m', '-L')])
+def test_wc_matches_system(files, locale, options):
+    names = [str(files / name) for name in ('a', 'big', 'b', 'empty')]
+    env = dict(os.environ, LC_ALL=locale)
+    expected = subprocess.run(['wc'] + options + names, capture_output=True, env=env)
+    result = run_cli(options + names, locale=locale)
+    assert result.returncode == expected.returncode
+    assert result.stdout == expected.stdout
+
+
+# Runs wc.py with small split sizes, recording which files it reads.
+RUNNER = f"""
+import sys
+sys.path.insert(0, {os.path.dirname(SCRIPT)!r})
+import wc
+opened = []
+def recording_open(file, *args, **kwargs):
+    opened.append(file)
+    return open(file, *args, **kwargs)
+wc.open = recording_open
+wc.SPLIT_SIZE = wc.RANGE_SIZE = 1 << 16
+sys.argv = ['wc'] + sys.argv[1:]
+status = wc.main()
+print(len(opened), file=sys.stderr)
+sys.exit(status)
+"""
+
+
+def run_recorded(args, **kwargs):
+    result = subprocess.run([sys.executable, '-c', RUNNER] + args, capture_output=True, **kwargs)
+    assert result.returncode == 0, result.stderr
+    return result.stdout, int(result.stderr)
+
+
+def test_wc_bytes_from_size(files):
+    stdout, opened = run_recorded(['-c', str(files / 'big')])
+    assert stdout == b'%d %s\n' % (len(SAMPLE), os.fsencode(files / 'big'))
+    assert opened == 0
+    stdout, _ = run_recorded(['-c', '/proc/self/stat'])
+    assert int(stdout.split()[0]) > 0
+
+
+def test_wc_splits_large_file(files):
+    lines, size = SAMPLE.count(b'\n'), len(SAMPLE)
+    stdout, _ = run_recorded(['-lc', '-j', '3', str(files / 'big'), str(files / 'a')])
+    assert stdout.split() == [b'%d' % lines, b'%d' % size, os.fsencode(files / 'big'),
+                              b'2', b'14', os.fsencode(files / 'a'),
+                              b'%d' % (lines + 2), b'%d' % (size + 14), b'total']
+
+
+def test_wc_many_files_in_order(files):
+    names = [str(files / name) for name in ('a', 'b', 'empty', 'big')] * 20
+    result = run_cli(['-lw', '-j', '4'] + names)
+    expected = run_cli(['-lw', '-j', '1'] + names)
+    assert result.returncode == 0
+    assert result.stdout == expected.stdout
+    assert result.stdout.splitlines()[1].endswith(b'/b')
+
+
+def test_wc_files0_from(files):
+    (files / 'list').write_bytes(b'a\0b\0\0')
+    result = run_cli(['--files0-from=list'], cwd=files)
+    assert result.returncode == 1
+    assert result.stdout == b' 2  3 14 a\n 0  3 16 b\n 2  6 30 total\n'
+    assert b'wc: list:3: invalid zero-length file name' in result.stderr
+    result = run_cli(['-l', '--files0-from=-'], input=os.fsencode(files / 'a') + b'\0-\0')
+    assert result.returncode == 1
+    assert result.stdout == b'2 %s\n' % os.fsencode(files / 'a')
+    assert b"no file name of '-' allowed" in result.stderr
+
+
+def test_wc_total_modes(files):
+    names = [str(files / 'a'), str(files / 'b')]
+    assert run_cli(['-l', '--total=only'] + names).stdout == b'2\n'
+    assert run_cli(['-l', '--total=never'] + names).stdout.count(b'\n') == 2
+    assert run_cli(['-l', '--total=always', names[0]]).stdout.endswith(b'2 total\n')
+    assert run_cli(['--total=sometimes']).returncode == 1
+
+
+def test_wc_errors(files):
+    result = run_cli([str(files / 'a'), '/no/such/file', str(files)])
+    assert result.returncode == 1
+    assert b'wc: /no/such/file: No such file or directory' in result.stderr
+    assert b': Is a directory' in result.stderr
+    assert result.stdout.splitlines()[1] == b'      0       0       0 %s' % os.fsencode(files)
+    assert run_cli(['-j', '0', str(files / 'a')]).returncode == 1
+    assert run_cli(['--files0-from=-', 'x']).returncode == 1
+
+
+def test_wc_help():
+    result = run_cli(['--help'])
+    assert b'Usage: wc' in result.stdout
+    assert result.returncode == 0
+
+
+def test_wc_version():
+    result = run_cli(['--version'])
+    assert b'wc (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
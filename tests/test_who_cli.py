@@ -0,0 +1,179 @@
+import subprocess
+import sys
+import os
+import shutil
+import struct
+import pytest
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'who.py'))
+
+# Record layout and types from utmp.h
+UTMP_STRUCT_FORMAT = 'hi32s4s32s256shhiii4i20x'
+UTMP_STRUCT_SIZE = struct.calcsize(UTMP_STRUCT_FORMAT)
+RUN_LVL, BOOT_TIME, NEW_TIME, INIT_PROCESS, LOGIN_PROCESS, USER_PROCESS, DEAD_PROCESS = 1, 2, 3, 5, 6, 7, 8
+BASE = 1760000000  # 2025-10-09 08:53:20 UTC
+
+
+def run_cli(args, env=None):
+    process_env = os.environ.copy()
+    process_env.update({'TZ': 'UTC', 'LANG': 'C', 'LC_ALL': 'C'})
+    if env:
+        process_env.update(env)
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True, env=process_env)
+
+
+def record(ut_type, pid, line, ut_id, user, host, when, term=0, exit_status=0, addr=(0, 0, 0, 0)):
+    return struct.pack(UTMP_STRUCT_FORMAT, ut_type, pid, line, ut_id, user, host,
+                       term, exit_status, 0, when, 0, *addr)
+
+
+def create_fake_utmp_file(file_path):
+    ip = struct.unpack('i', bytes([10, 1, 2, 3]))[0]
+    records = [
+        record(BOOT_TIME, 0, b'~', b'~~', b'reboot', b'6.1.0', BASE),
+        record(RUN_LVL, ord('N') * 256 + ord('5'), b'~', b'~~', b'runlevel', b'6.1.0', BASE + 5),
+        record(NEW_TIME, 0, b'', b'', b'', b'', BASE + 8),
+        record(INIT_PROCESS, 300, b'', b'si', b'', b'', BASE + 10),
+        record(LOGIN_PROCESS, 400, b'tty1', b'tty1', b'LOGIN', b'', BASE + 20),
+        record(USER_PROCESS, 1234, b'pts/100', b'ts/0', b'alice', b'10.1.2.3', BASE + 30, addr=(ip, 0, 0, 0)),
+        record(USER_PROCESS, 1235, b'pts/101', b'ts/1', b'bob', b'host.example:0', BASE + 90),
+        record(DEAD_PROCESS, 500, b'pts/102', b'ts/2', b'', b'', BASE + 150, exit_status=1),
+    ]
+    file_path.write_bytes(b''.join(records))
+    return str(file_path)
+
+
+def create_fake_wtmp_file(file_path, count, step=60):
+    """One login per step seconds, in time order, as wtmp is written."""
+    with open(file_path, 'wb') as f:
+        for i in range(count):
+            f.write(record(USER_PROCESS, 1000 + i, b'pts/%d' % (100 + i % 7), b'ts',
+                           b'user%d' % i, b'', BASE + i * step))
+    return str(file_path)
+
+
+def test_who_default(tmp_path):
+    result = run_cli([create_fake_utmp_file(tmp_path / 'utmp')])
+    assert result.returncode == 0
+    assert result.stdout == ("alice    pts/100      Oct  9 08:53 (10.1.2.3)\n"
+                             "bob      pts/101      Oct  9 08:54 (host.example:0)\n")
+
+
+def test_who_all(tmp_path):
+    result = run_cli(['-a', create_fake_utmp_file(tmp_path / 'utmp')])
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [
+        "           system boot  Oct  9 08:53",
+        "           run-level 5  Oct  9 08:53                   last=S",
+        "           clock change Oct  9 08:53",
+        "                        Oct  9 08:53               300 id=si",
+        "LOGIN      tty1         Oct  9 08:53               400 id=tty1",
+        "alice    ? pts/100      Oct  9 08:53   ?          1234 (10.1.2.3)",
+        "bob      ? pts/101      Oct  9 08:54   ?          1235 (host.example:0)",
+        "           pts/102      Oct  9 08:55               500 id=ts/2  term=0 exit=1",
+    ]
+
+
+def test_who_boot_and_heading(tmp_path):
+    result = run_cli(['-bH', create_fake_utmp_file(tmp_path / 'utmp')])
+    assert result.stdout == ("NAME     LINE         TIME                PID COMMENT\n"
+                             "         system boot  Oct  9 08:53\n")
+
+
+def test_who_count(tmp_path):
+    result = run_cli(['-q', create_fake_utmp_file(tmp_path / 'utmp')])
+    assert result.stdout == "alice bob\n# users=2\n"
+
+
+def test_who_ips(tmp_path):
+    result = run_cli(['--ips', create_fake_utmp_file(tmp_path / 'utmp')])
+    assert result.stdout.splitlines()[0] == "alice    pts/100      Oct  9 08:53 10.1.2.3"
+
+
+def test_who_iso_time_in_other_locales(tmp_path):
+    result = run_cli([create_fake_utmp_file(tmp_path / 'utmp')], env={'LC_ALL': 'C.UTF-8'})
+    assert "2025-10-09 08:53" in result.stdout
+
+
+@pytest.mark.skipif(shutil.which('who') is None, reason='system who not available')
+@pytest.mark.parametrize('options', [[], ['-a'], ['-q'], ['-d'], ['-uT'], ['-s', '-H']])
+def test_who_matches_system(tmp_path, options):
+    fake = create_fake_utmp_file(tmp_path / 'utmp')
+    env = dict(os.environ, TZ='UTC', LANG='C', LC_ALL='C')
+    expected = subprocess.run(['who'] + options + [fake], capture_output=True, text=True, env=env)
+    assert run_cli(options + [fake]).stdout == expected.stdout
+
+
+def test_who_since_until(tmp_path):
+    # 3000 logins, one a minute; ask for 08:53 + 100..110 minutes
+    wtmp = create_fake_wtmp_file(tmp_path / 'wtmp', 3000)
+    result = run_cli(['-q', f'--since=@{BASE + 100 * 60}', f'--until=@{BASE + 110 * 60}', wtmp])
+    assert result.returncode == 0
+    assert result.stdout == ' '.join(f'user{i}' for i in range(100, 110)) + "\n# users=10\n"
+
+
+def test_who_since_only(tmp_path):
+    wtmp = create_fake_wtmp_file(tmp_path / 'wtmp', 50)
+    result = run_cli(['-q', f'--since=@{BASE + 47 * 60 - 1}', wtmp])
+    assert result.stdout == "user47 user48 user49\n# users=3\n"
+
+
+def test_who_since_large_mapped_file(tmp_path):
+    # Large enough to be memory-mapped.
+    count = (1 << 20) // UTMP_STRUCT_SIZE + 100
+    wtmp = create_fake_wtmp_file(tmp_path / 'wtmp', count, step=1)
+    result = run_cli(['-q', f'--since=@{BASE + count - 2}', wtmp])
+    assert result.stdout == f"user{count - 2} user{count - 1}\n# users=2\n"
+
+
+def test_who_since_relative_and_words(tmp_path):
+    wtmp = create_fake_wtmp_file(tmp_path / 'wtmp', 10)
+    for since in ['yesterday', 'today', '-2days', '-5 hours', 'now', '00:00', '20251009085320']:
+        result = run_cli(['-q', f'--since={since}', wtmp])
+        assert result.returncode == 0, since
+
+
+def test_who_since_separate_argument(tmp_path):
+    wtmp = create_fake_wtmp_file(tmp_path / 'wtmp', 10)
+    for since in ['-2hours', '-5 hours', f'@{BASE}']:
+        result = run_cli(['-q', '--since', since, '--until', 'now', wtmp])
+        assert result.returncode == 0, since
+        assert result.stdout == run_cli(['-q', f'--since={since}', '--until=now', wtmp]).stdout
+    assert run_cli(['--since']).returncode == 1
+
+
+def test_who_invalid_time(tmp_path):
+    result = run_cli(['--since=not a time', str(tmp_path / 'wtmp')])
+    assert result.returncode == 1
+    assert "invalid time value 'not a time'" in result.stderr
+
+
+def test_who_missing_file():
+    result = run_cli(['-q', '/no/such/utmp'])
+    assert result.returncode == 0
+    assert result.stdout == "\n# users=0\n"
+
+
+def test_who_am_i_without_terminal(tmp_path):
+    result = subprocess.run([sys.executable, SCRIPT, 'am', 'i'], stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout == ""
+
+
+def test_who_extra_operand():
+    result = run_cli(['a', 'b', 'c'])
+    assert result.returncode == 1
+    assert "extra operand 'c'" in result.stderr
+
+
+def test_who_help():
+    result = run_cli(['--help'])
+    assert 'Usage: who' in result.stdout
+    assert result.returncode == 0
+
+
+def test_who_version():
+    result = run_cli(['--version'])
+    assert 'who (Python port of GNU coreutils)' in result.stdout
+    assert result.returncode == 0
@@ -29,3 +29,14 @@ def test_whoami_extra_operand():
     result = run_cli(['extra'])
     assert 'extra operand' in result.stderr
     assert result.returncode == 1
+
+
+def test_whoami_disk_cache(tmp_path):
+    env = os.environ.copy()
+    env['PYCOREUTILS_NSS_CACHE_TTL'] = '60'
+    env['XDG_CACHE_HOME'] = str(tmp_path)
+    first = subprocess.run([sys.executable, SCRIPT], capture_output=True, text=True, env=env)
+    second = subprocess.run([sys.executable, SCRIPT], capture_output=True, text=True, env=env)
+    assert first.returncode == 0
+    assert second.stdout == first.stdout
+    assert (tmp_path / 'py-coreutils' / 'nss').exists()